@@ -0,0 +1,136 @@
+"""Write, read and cleanup times of the layer stores with each chunk layout.
+
+A t, z sequence (z innermost) is written frame by frame in acquisition order, as
+the handler does, then read back by single frame (2D view) and by z-stack (3D
+view).  The layouts are the "frame" and "stack" chunking policies, and "sharded"
+(one chunk per frame, in shards).  Each benchmark reports (in `extra_info`) the
+number of files.  The cleanup benchmark deletes a long time-lapse of small frames.
+
+Run with `pytest benchmarks/test_bench_chunking.py` (requires `pytest-benchmark`).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pytest
+
+from napari_micromanager._chunk_buffer import ChunkBuffer
+from napari_micromanager._storage import (
+    ZARR_V3,
+    chunk_shape,
+    compression_kwargs,
+    create_temp_zarr_array,
+    shard_shape,
+)
+
+if TYPE_CHECKING:
+    import tempfile
+    from collections.abc import Iterator
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+SHAPE = (10, 30)  # (t, z)
+FRAME = (512, 512)
+LAYOUTS = ["frame", "stack", "sharded"] if ZARR_V3 else ["frame", "stack"]
+# the time-lapse of the cleanup benchmark
+TIMELAPSE = (20_000, 64, 64)
+
+
+def _create(
+    layout: str, shape: tuple[int, ...] = (*SHAPE, *FRAME)
+) -> tuple[Any, tempfile.TemporaryDirectory]:
+    n_index = len(shape) - 2
+    chunking = "stack" if layout == "stack" else "frame"
+    chunks = chunk_shape("tz"[-n_index:], shape[:n_index], shape[n_index:], chunking, 2)
+    shards = shard_shape(shape, chunks, n_index, 2) if layout == "sharded" else None
+    z, tmp = create_temp_zarr_array(
+        shape, "uint16", chunks, shards, **compression_kwargs("lz4")
+    )
+    return (z if layout == "frame" else ChunkBuffer(z, n_index)), tmp
+
+
+def _frames() -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    return [rng.normal(1000, 50, FRAME).astype("uint16") for _ in range(4)]
+
+
+def _n_files(path: str) -> int:
+    return sum(len(files) for _, _, files in os.walk(path))
+
+
+@pytest.fixture(params=LAYOUTS)
+def written(request: pytest.FixtureRequest) -> Iterator[tuple[str, Any]]:
+    arr, tmp = _create(request.param)
+    frames = _frames()
+    for i, idx in enumerate(np.ndindex(*SHAPE)):
+        arr[idx] = frames[i % len(frames)]
+    yield request.param, arr
+    tmp.cleanup()
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_bench_chunking_write(benchmark: BenchmarkFixture, layout: str) -> None:
+    frames = _frames()
+    stores: list[tempfile.TemporaryDirectory] = []
+
+    def _setup() -> tuple[tuple, dict]:
+        arr, tmp = _create(layout)
+        stores.append(tmp)
+        return (arr,), {}
+
+    def _write(arr: Any) -> None:
+        for i, idx in enumerate(np.ndindex(*SHAPE)):
+            arr[idx] = frames[i % len(frames)]
+        if isinstance(arr, ChunkBuffer):
+            arr.flush()
+
+    benchmark.pedantic(_write, setup=_setup, rounds=3, iterations=1)
+    files = benchmark.extra_info["files"] = _n_files(stores[-1].name)
+    if benchmark.stats:  # (None with --benchmark-disable)
+        fps = np.prod(SHAPE) / benchmark.stats["mean"]
+        print(f"\n{layout}: {fps:.0f} frames/s, {files} files")
+    for tmp in stores:
+        tmp.cleanup()
+
+
+@pytest.mark.parametrize("view", ["frame", "z_stack"])
+def test_bench_chunking_read(
+    benchmark: BenchmarkFixture, written: tuple[str, Any], view: str
+) -> None:
+    layout, arr = written
+    count = iter(range(10**9))
+
+    def _read() -> None:
+        t = next(count) % SHAPE[0]
+        if view == "frame":
+            arr[t, SHAPE[1] // 2]
+        else:
+            arr[t]
+
+    benchmark(_read)
+    if benchmark.stats:  # (None with --benchmark-disable)
+        print(f"\n{layout} {view}: {benchmark.stats['mean'] * 1000:.1f} ms")
+
+
+@pytest.mark.parametrize("layout", ["frame", "sharded"] if ZARR_V3 else ["frame"])
+def test_bench_cleanup(benchmark: BenchmarkFixture, layout: str) -> None:
+    frame = np.ones(TIMELAPSE[1:], dtype="uint16")
+    files: list[int] = []
+
+    def _setup() -> tuple[tuple, dict]:
+        arr, tmp = _create(layout, TIMELAPSE)
+        for t in range(TIMELAPSE[0]):
+            arr[(t,)] = frame
+        if isinstance(arr, ChunkBuffer):
+            arr.flush()
+        files.append(_n_files(tmp.name))
+        return (tmp,), {}
+
+    benchmark.pedantic(lambda tmp: tmp.cleanup(), setup=_setup, rounds=3)
+    benchmark.extra_info["files"] = files[-1]
+    if benchmark.stats:  # (None with --benchmark-disable)
+        ms = benchmark.stats["mean"] * 1000
+        print(f"\n{layout} cleanup: {ms:.0f} ms, {files[-1]} files")
@@ -0,0 +1,79 @@
+"""Main-thread time spent showing one live frame in the preview layer.
+
+Run with `pytest benchmarks/test_bench_preview.py` (requires `pytest-benchmark`).
+"""
+
+from __future__ import annotations
+
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import napari
+import numpy as np
+import pytest
+from pymmcore_plus import CMMCorePlus
+
+from napari_micromanager._core_link import CoreViewerLink
+from napari_micromanager._preview import set_preview_data
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+CONFIG = Path(__file__).parent.parent / "tests" / "test_config.cfg"
+
+
+@pytest.fixture
+def link(qapp: Any) -> Iterator[CoreViewerLink]:
+    core = CMMCorePlus()
+    core.loadSystemConfiguration(str(CONFIG))
+    viewer = napari.Viewer(show=False)
+    link = CoreViewerLink(viewer, core)
+    yield link
+    link.cleanup()
+    with suppress(RuntimeError):
+        viewer.close()
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["uncached", "cached"])
+def test_bench_preview_frame(
+    benchmark: BenchmarkFixture, link: CoreViewerLink, cached: bool
+) -> None:
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 4096, (2048, 2048), dtype=np.uint16) for _ in range(2)]
+    link._update_viewer(frames[0])
+    count = iter(range(10**9))
+
+    def _show_frame() -> None:
+        if not cached:
+            # what each frame did before the layer and scale were cached
+            link._preview_layer = None
+        link._update_viewer(frames[next(count) % 2])
+
+    benchmark(_show_frame)
+    if benchmark.stats:  # (None with --benchmark-disable)
+        benchmark.extra_info["ms_per_frame"] = benchmark.stats["mean"] * 1e3
+
+
+@pytest.mark.parametrize("mode", ["replace", "in_place"])
+def test_bench_preview_data(
+    benchmark: BenchmarkFixture, link: CoreViewerLink, mode: str
+) -> None:
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 4096, (2048, 2048), dtype=np.uint16) for _ in range(2)]
+    link._update_viewer(frames[0])
+    layer = link.viewer.layers["preview"]
+    count = iter(range(10**9))
+
+    def _set_data() -> None:
+        frame = frames[next(count) % 2]
+        if mode == "replace":
+            layer.data = frame
+        else:
+            set_preview_data(layer, frame)
+
+    benchmark(_set_data)
+    if benchmark.stats:  # (None with --benchmark-disable)
+        benchmark.extra_info["ms_per_frame"] = benchmark.stats["mean"] * 1e3
@@ -0,0 +1,67 @@
+"""Per-frame overhead of routing an MDAEvent to the array backing its layer.
+
+Run with `pytest benchmarks/test_bench_routing.py` (requires `pytest-benchmark`).
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+
+import numpy as np
+import pytest
+import useq
+
+from napari_micromanager._mda_handler import (
+    _determine_sequence_layers,
+    _FrameRouter,
+    _id_idx_layer,
+)
+from napari_micromanager._util import NMM_METADATA_KEY
+
+if TYPE_CHECKING:
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+
+def _make_sequence(split: bool) -> useq.MDASequence:
+    return useq.MDASequence(
+        time_plan={"interval": 0, "loops": 10},
+        stage_positions=[(0, 0, 0), (10, 10, 0)],
+        channels=["DAPI", "FITC", "Cy5"],
+        z_plan={"range": 4, "step": 1},
+        metadata={NMM_METADATA_KEY: {"split_channels": split}},
+    )
+
+
+def _id_idx_layer_route(
+    targets: dict[str, tuple[Any, str]],
+) -> Callable[[useq.MDAEvent], tuple]:
+    # the per-frame routing that was used before _FrameRouter
+    def route(event: useq.MDAEvent) -> tuple:
+        _id, im_idx, layer_name = _id_idx_layer(event)
+        return targets[_id][0], im_idx, layer_name
+
+    return route
+
+
+@pytest.mark.parametrize("split", [False, True], ids=["no_splitC", "splitC"])
+@pytest.mark.parametrize("method", ["id_idx_layer", "router"])
+def test_bench_routing(benchmark: BenchmarkFixture, method: str, split: bool) -> None:
+    sequence = _make_sequence(split)
+    events = list(sequence)
+    _, layers = _determine_sequence_layers(sequence)
+    targets = {id_: (np.empty(shape), f"Exp_{id_}") for id_, shape, _ in layers}
+
+    if method == "router":
+        route = _FrameRouter(sequence, targets).route
+    else:
+        route = _id_idx_layer_route(targets)
+
+    def _route_all() -> None:
+        for event in events:
+            route(event)
+
+    benchmark(_route_all)
+    benchmark.extra_info["frames"] = len(events)
+    if benchmark.stats:  # (None with --benchmark-disable)
+        mean = benchmark.stats["mean"]
+        benchmark.extra_info["us_per_frame"] = mean / len(events) * 1e6
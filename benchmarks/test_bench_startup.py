@@ -0,0 +1,63 @@
+"""Time to import the package and to create the MainWindow.
+
+The import is timed in a fresh interpreter (`python -c "import ..."`), so that it
+includes everything pulled in at import time.
+
+Run with `QT_QPA_PLATFORM=offscreen pytest benchmarks/test_bench_startup.py`
+(requires `pytest-benchmark`).
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import napari
+import pytest
+from pymmcore_plus import CMMCorePlus
+
+from napari_micromanager.main_window import MainWindow
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+CONFIG = Path(__file__).parent.parent / "tests" / "test_config.cfg"
+
+
+@pytest.fixture
+def viewer(qapp: Any, monkeypatch: pytest.MonkeyPatch) -> Iterator[napari.Viewer]:
+    core = CMMCorePlus()
+    core.loadSystemConfiguration(str(CONFIG))
+    monkeypatch.setattr("pymmcore_plus.core._mmcore_plus._instance", core)
+    viewer = napari.Viewer(show=False)
+    yield viewer
+    with suppress(RuntimeError):
+        viewer.close()
+
+
+@pytest.mark.parametrize(
+    "module", ["napari_micromanager", "napari_micromanager.main_window"]
+)
+def test_bench_import(benchmark: BenchmarkFixture, module: str) -> None:
+    cmd = [sys.executable, "-c", f"import {module}"]
+    benchmark.pedantic(subprocess.run, args=(cmd,), kwargs={"check": True}, rounds=3)
+    if benchmark.stats:  # (None with --benchmark-disable)
+        print(f"\nimport {module}: {benchmark.stats['mean']:.2f} s")
+
+
+def test_bench_main_window(benchmark: BenchmarkFixture, viewer: napari.Viewer) -> None:
+    windows: list[MainWindow] = []
+
+    def _create() -> None:
+        windows.append(MainWindow(viewer))
+
+    benchmark.pedantic(_create, rounds=3)
+    if benchmark.stats:  # (None with --benchmark-disable)
+        print(f"\nMainWindow(): {benchmark.stats['mean'] * 1000:.0f} ms")
+    for win in windows:
+        win._cleanup()
@@ -0,0 +1,303 @@
+"""Sustained MDA ingest throughput, from `frameReady` to the viewer.
+
+Frames are pushed into the `_NapariMDAHandler` of a `CoreViewerLink` (set up with
+the demo configuration of the tests) from a producer thread, as fast as the handler
+accepts them, while the Qt event loop runs the viewer updates.  Each benchmark
+reports (in `extra_info`) the sustained frames/s and MB/s, the peak RSS, and the
+percentiles of the frameReady -> written and written -> displayed latencies.
+
+Run with `QT_QPA_PLATFORM=offscreen pytest benchmarks/test_bench_throughput.py`
+(requires `pytest-benchmark` and `pytest-qt`), and e.g.
+`--benchmark-json=out.json` to keep the extra info.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import napari
+import numpy as np
+import pytest
+import useq
+from pymmcore_plus import CMMCorePlus
+
+from napari_micromanager._core_link import CoreViewerLink
+from napari_micromanager._util import NMM_METADATA_KEY, PYMMCW_METADATA_KEY
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+    from pytestqt.qtbot import QtBot
+
+CONFIG = Path(__file__).parent.parent / "tests" / "test_config.cfg"
+ROUNDS = 3
+# the sequence shapes to sweep, all with 50 frames
+SHAPES: dict[str, dict[str, Any]] = {
+    "t": {"time_plan": {"interval": 0, "loops": 50}},
+    "tcz": {
+        "time_plan": {"interval": 0, "loops": 5},
+        "channels": ["DAPI", "FITC"],
+        "z_plan": {"range": 4, "step": 1},
+    },
+}
+PERCENTILES = (50, 95, 99)
+
+
+@pytest.fixture
+def core() -> CMMCorePlus:
+    core = CMMCorePlus()
+    core.loadSystemConfiguration(str(CONFIG))
+    return core
+
+
+@pytest.fixture
+def viewer(qapp: Any) -> Iterator[napari.Viewer]:
+    viewer = napari.Viewer(show=False)
+    yield viewer
+    with suppress(RuntimeError):
+        viewer.close()
+
+
+def _rss() -> int:
+    """Return the current (Linux) or peak (elsewhere) resident set size in bytes."""
+    with contextlib.suppress(OSError):
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(maxrss if sys.platform == "darwin" else maxrss * 1024)
+
+
+class _RSSSampler(threading.Thread):
+    """Record the peak RSS of the process while running."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        super().__init__(daemon=True)
+        self.peak = _rss()
+        self._interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self._interval):
+            self.peak = max(self.peak, _rss())
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        return self.peak
+
+
+def _run_sequence(
+    link: CoreViewerLink, qtbot: QtBot, seq: useq.MDASequence, frame: np.ndarray
+) -> dict[str, Any]:
+    """Push one frame per event of `seq` through the handler of `link`."""
+    handler = link._mda_handler
+    events = list(seq)
+    n = len(events)
+    position = {id(e): i for i, e in enumerate(events)}
+    enqueued, written, displayed = np.zeros(n), np.zeros(n), np.zeros(n)
+
+    process_frame = handler._process_frame
+
+    def _process(image: np.ndarray, event: useq.MDAEvent, **kwargs: Any) -> Any:
+        result = process_frame(image, event, **kwargs)
+        written[position[id(event)]] = time.perf_counter()
+        return result
+
+    update_dims = handler._update_viewer_dims
+    n_displayed = 0
+
+    def _update(args: Any) -> None:
+        nonlocal n_displayed
+        update_dims(args)
+        # frames are written in order: everything written so far is now shown
+        now = time.perf_counter()
+        while n_displayed < n and written[n_displayed]:
+            displayed[n_displayed] = now
+            n_displayed += 1
+
+    handler._process_frame = _process  # type: ignore[method-assign]
+    handler._update_viewer_dims = _update  # type: ignore[method-assign]
+
+    def _produce() -> None:
+        for i, event in enumerate(events):
+            enqueued[i] = time.perf_counter()
+            handler._on_mda_frame(frame, event)
+
+    sampler = _RSSSampler()
+    rss0 = _rss()
+    sampler.start()
+    handler._on_mda_started(seq)
+    producer = threading.Thread(target=_produce)
+    producer.start()
+    qtbot.waitUntil(lambda: n_displayed == n, timeout=120_000)
+    producer.join()
+    handler._on_mda_finished(seq)
+    peak = sampler.stop()
+
+    elapsed = written.max() - enqueued.min()
+    to_written = (written - enqueued) * 1e3
+    to_displayed = (displayed - written) * 1e3
+    return {
+        "fps": n / elapsed,
+        "mb_per_s": n * frame.nbytes / elapsed / 1e6,
+        "peak_rss_mb": peak / 1e6,
+        "peak_rss_delta_mb": (peak - rss0) / 1e6,
+        **{
+            f"ready_to_written_ms_p{p}": v
+            for p, v in zip(PERCENTILES, np.percentile(to_written, PERCENTILES))
+        },
+        **{
+            f"written_to_displayed_ms_p{p}": v
+            for p, v in zip(PERCENTILES, np.percentile(to_displayed, PERCENTILES))
+        },
+    }
+
+
+@pytest.mark.parametrize("storage", ["memory", "zarr", "memmap"])
+@pytest.mark.parametrize("split", [False, True], ids=["no_splitC", "splitC"])
+@pytest.mark.parametrize("shape", list(SHAPES))
+@pytest.mark.parametrize("dtype", ["uint8", "uint16"])
+@pytest.mark.parametrize("size", [512, 2048])
+def test_bench_throughput(
+    benchmark: BenchmarkFixture,
+    core: CMMCorePlus,
+    viewer: napari.Viewer,
+    qtbot: QtBot,
+    size: int,
+    dtype: str,
+    shape: str,
+    split: bool,
+    storage: str,
+) -> None:
+    if split and shape == "t":
+        pytest.skip("nothing to split without channels")
+    core.setProperty("Camera", "OnCameraCCDXSize", size)
+    core.setProperty("Camera", "OnCameraCCDYSize", size)
+    core.setProperty("Camera", "PixelType", "8bit" if dtype == "uint8" else "16bit")
+    seq = useq.MDASequence(
+        **SHAPES[shape],
+        metadata={NMM_METADATA_KEY: {"split_channels": split, "storage": storage}},
+    )
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, np.iinfo(dtype).max, (size, size), dtype=dtype)
+
+    results: list[dict[str, Any]] = []
+
+    def _setup() -> tuple[tuple, dict]:
+        viewer.layers.clear()
+        return (CoreViewerLink(viewer, core),), {}
+
+    def _run(link: CoreViewerLink) -> None:
+        try:
+            results.append(_run_sequence(link, qtbot, seq, frame))
+        finally:
+            link.cleanup()
+
+    benchmark.pedantic(_run, setup=_setup, rounds=ROUNDS, iterations=1)
+    for key in results[0]:
+        benchmark.extra_info[key] = float(np.median([r[key] for r in results]))
+
+
+@pytest.mark.parametrize("writer", ["thread", "process"])
+@pytest.mark.parametrize("compression", ["lz4", "zstd"])
+def test_bench_writer(
+    benchmark: BenchmarkFixture,
+    core: CMMCorePlus,
+    viewer: napari.Viewer,
+    qtbot: QtBot,
+    compression: str,
+    writer: str,
+) -> None:
+    """Stress test of the writer backends: large compressed frames in zarr."""
+    size = 2048
+    core.setProperty("Camera", "OnCameraCCDXSize", size)
+    core.setProperty("Camera", "OnCameraCCDYSize", size)
+    core.setProperty("Camera", "PixelType", "16bit")
+    seq = useq.MDASequence(
+        **SHAPES["tcz"],
+        metadata={NMM_METADATA_KEY: {"storage": "zarr", "compression": compression}},
+    )
+    # (noisy frames, which are slow to compress)
+    rng = np.random.default_rng(0)
+    frame = rng.normal(1000, 50, (size, size)).astype("uint16")
+
+    results: list[dict[str, Any]] = []
+
+    def _setup() -> tuple[tuple, dict]:
+        viewer.layers.clear()
+        link = CoreViewerLink(viewer, core)
+        link._mda_handler.writer = writer
+        return (link,), {}
+
+    def _run(link: CoreViewerLink) -> None:
+        try:
+            results.append(_run_sequence(link, qtbot, seq, frame))
+        finally:
+            link.cleanup()
+
+    benchmark.pedantic(_run, setup=_setup, rounds=ROUNDS, iterations=1)
+    for key in results[0]:
+        benchmark.extra_info[key] = float(np.median([r[key] for r in results]))
+    if benchmark.stats:  # (None with --benchmark-disable)
+        print(f"\n{writer} writer: {benchmark.extra_info['fps']:.1f} frames/s")
+
+
+@pytest.mark.parametrize("combine_runs", [False, True], ids=["frames", "runs"])
+@pytest.mark.parametrize("storage", ["zarr", "ome_zarr"])
+def test_bench_burst(
+    benchmark: BenchmarkFixture,
+    core: CMMCorePlus,
+    viewer: napari.Viewer,
+    qtbot: QtBot,
+    tmp_path: Path,
+    storage: str,
+    combine_runs: bool,
+) -> None:
+    """Hardware-sequenced z-stacks of small frames, arriving in bursts."""
+    size = 256
+    core.setProperty("Camera", "OnCameraCCDXSize", size)
+    core.setProperty("Camera", "OnCameraCCDYSize", size)
+    core.setProperty("Camera", "PixelType", "16bit")
+    meta: dict[str, Any] = {NMM_METADATA_KEY: {"storage": "zarr"}}
+    if storage == "ome_zarr":
+        meta = {
+            NMM_METADATA_KEY: {"direct_to_disk": True},
+            PYMMCW_METADATA_KEY: {"save_dir": str(tmp_path), "save_name": "burst"},
+        }
+    seq = useq.MDASequence(
+        time_plan={"interval": 0, "loops": 10},
+        z_plan={"range": 49, "step": 1},
+        metadata=meta,
+    )
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 1000, (size, size), dtype="uint16")
+
+    results: list[dict[str, Any]] = []
+
+    def _setup() -> tuple[tuple, dict]:
+        viewer.layers.clear()
+        link = CoreViewerLink(viewer, core)
+        link._mda_handler.combine_runs = combine_runs
+        return (link,), {}
+
+    def _run(link: CoreViewerLink) -> None:
+        try:
+            results.append(_run_sequence(link, qtbot, seq, frame))
+        finally:
+            link.cleanup()
+
+    benchmark.pedantic(_run, setup=_setup, rounds=ROUNDS, iterations=1)
+    for key in results[0]:
+        benchmark.extra_info[key] = float(np.median([r[key] for r in results]))
+    if benchmark.stats:  # (None with --benchmark-disable)
+        fps = benchmark.extra_info["fps"]
+        print(f"\n{storage}, combine_runs={combine_runs}: {fps:.0f} frames/s")
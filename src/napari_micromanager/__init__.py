@@ -1,6 +1,9 @@
 """Napari-based GUI for MicroManager."""
 
+from __future__ import annotations
+
 from importlib.metadata import PackageNotFoundError, version
+from typing import TYPE_CHECKING, Any
 
 try:
     __version__ = version("napari-micromanager")
@@ -12,6 +15,16 @@ except PackageNotFoundError:
 # https://github.com/micro-manager/pymmcore/issues/119
 import pymmcore  # noqa: F401
 
-from .main_window import MainWindow
+if TYPE_CHECKING:
+    from .main_window import MainWindow
 
 __all__ = ["MainWindow", "__version__"]
+
+
+def __getattr__(name: str) -> Any:
+    # napari, Qt and the widgets are only imported when the window is first needed
+    if name == "MainWindow":
+        from .main_window import MainWindow
+
+        return MainWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
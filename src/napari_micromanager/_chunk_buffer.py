@@ -0,0 +1,160 @@
+"""Write-combining buffer for zarr arrays with chunks (or shards) of several frames."""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from ._growable import _clip_key
+
+if TYPE_CHECKING:
+    import zarr
+
+
+class ChunkBuffer:
+    """Array-like collecting the frames of a chunk in memory before writing it.
+
+    The first `n_index` dimensions of `array` index the frames, and its chunks may
+    hold several frames along them (see `chunk_shape`).  Writing such a chunk frame
+    by frame would compress and write the whole chunk again for every frame, so
+    the frames are collected in an in-memory block instead, which is written in
+    one go once all the frames of the chunk have been written.  `flush` writes the
+    incomplete chunks (e.g. at the end of an aborted acquisition).  For sharded
+    arrays, the frames are collected by shard (which is rewritten as a whole when
+    any of its chunks is written).
+
+    Frames written to a chunk that was already written are written through.
+    Reads include the frames waiting in memory, so this can be used as napari
+    layer data.  Frames of a chunk must be written from a single thread, but reads
+    may happen from any thread.
+
+    Parameters
+    ----------
+    array : zarr.Array
+        The array to write to.
+    n_index : int
+        The number of index dimensions.
+    """
+
+    def __init__(self, array: zarr.Array, n_index: int) -> None:
+        self._array = array
+        self._n_index = n_index
+        self._shape = tuple(array.shape)
+        blocks = getattr(array, "shards", None) or array.chunks
+        self._index_chunks = tuple(blocks[:n_index])
+        # chunk coordinates -> (block, written frame indices within the block)
+        self._pending: dict[tuple[int, ...], tuple[np.ndarray, set]] = {}
+        # chunks that were written to the array
+        self._written: set[tuple[int, ...]] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def array(self) -> zarr.Array:
+        """The array the chunks are written to."""
+        return self._array
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self._shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self._array.dtype)
+
+    @property
+    def ndim(self) -> int:
+        return len(self._shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self._shape))
+
+    def __len__(self) -> int:
+        return self._shape[0]
+
+    @property
+    def n_pending(self) -> int:
+        """Number of chunks waiting in memory to be completed."""
+        return len(self._pending)
+
+    def __setitem__(self, index: tuple[int, ...], frame: np.ndarray) -> None:
+        """Write `frame` at the (index dimensions) `index`."""
+        coords = tuple(i // c for i, c in zip(index, self._index_chunks))
+        if coords in self._written:
+            self._array[index] = frame
+            return
+        with self._lock:
+            if (pending := self._pending.get(coords)) is None:
+                block_shape = [
+                    min(c, n - k * c)
+                    for k, c, n in zip(coords, self._index_chunks, self._shape)
+                ]
+                block = np.zeros(
+                    (*block_shape, *self._shape[self._n_index :]), dtype=self.dtype
+                )
+                pending = self._pending[coords] = (block, set())
+            block, frames = pending
+            local = tuple(
+                i - k * c for i, k, c in zip(index, coords, self._index_chunks)
+            )
+            block[local] = frame
+            frames.add(local)
+            complete = len(frames) == math.prod(block.shape[: self._n_index])
+        if complete:
+            self._write(coords)
+
+    def flush(self) -> None:
+        """Write the chunks that are still waiting for frames."""
+        for coords in list(self._pending):
+            self._write(coords)
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        key = _clip_key(key, self._shape)
+        data = np.asarray(self._array[key])
+        if not self._pending:
+            return data
+        index_key, frame_key = key[: self._n_index], key[self._n_index :]
+        with self._lock:
+            for coords, (block, frames) in self._pending.items():
+                start = [k * c for k, c in zip(coords, self._index_chunks)]
+                for local in frames:
+                    index = [s + i for s, i in zip(start, local)]
+                    if (out := _position(index, index_key)) is not None:
+                        data[out] = block[local][frame_key]
+        return data
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        data = self[...]
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    def _write(self, coords: tuple[int, ...]) -> None:
+        block, _ = self._pending[coords]
+        key = tuple(
+            slice(k * c, k * c + n)
+            for k, c, n in zip(coords, self._index_chunks, block.shape)
+        )
+        self._array[key] = block
+        # (the block is only dropped once written, so that reads still see it)
+        with self._lock:
+            del self._pending[coords]
+            self._written.add(coords)
+
+
+def _position(index: list[int], key: tuple[Any, ...]) -> tuple[int, ...] | None:
+    """Return the position of (index dimensions) `index` in the result of `key`.
+
+    Returns None if `key` doesn't select `index`.
+    """
+    out = []
+    for i, k in zip(index, key):
+        if isinstance(k, slice):
+            r = range(k.start, k.stop, k.step)
+            if i not in r:
+                return None
+            out.append(r.index(i))
+        elif i != k:
+            return None
+    return tuple(out)
@@ -1,24 +1,38 @@
 from __future__ import annotations
 
 import contextlib
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
 import napari
 import napari.layers
 from pymmcore_plus import CMMCorePlus
-from qtpy.QtCore import QObject, Qt, QTimerEvent
+from qtpy.QtCore import QObject, Qt, QTimerEvent, Signal  # type: ignore [attr-defined]
 from superqt.utils import ensure_main_thread
 
 from ._mda_handler import _NapariMDAHandler
+from ._preview import new_preview_buffer, set_preview_data
 
 if TYPE_CHECKING:
     import napari.viewer
     import numpy as np
     from pymmcore_plus.core.events._protocol import PSignalInstance
 
+# maximum rate (Hz) at which the preview layer is refreshed in live mode
+DEFAULT_LIVE_FPS = 30.0
+
 
 class CoreViewerLink(QObject):
-    """QObject linking events in a napari viewer to events in a CMMCorePlus instance."""
+    """QObject linking events in a napari viewer to events in a CMMCorePlus instance.
+
+    In live mode, the preview layer is refreshed by a display clock running at
+    `live_fps`, independently of the camera exposure. Each tick shows the newest
+    image in the circular buffer, so camera frames arriving faster than the display
+    rate are skipped. `frames_received` and `frames_displayed` count the camera
+    frames and the displayed frames since live mode was started, and
+    `liveFramesChanged` is emitted with both counts whenever a frame is displayed.
+    """
+
+    liveFramesChanged = Signal(int, int)  # (frames received, frames displayed)
 
     def __init__(
         self,
@@ -31,6 +45,19 @@ class CoreViewerLink(QObject):
         self.viewer = viewer
         self._mda_handler = _NapariMDAHandler(self._mmc, viewer)
         self._live_timer_id: int | None = None
+        self._live_fps = DEFAULT_LIVE_FPS
+        self._frames_received = 0
+        self._frames_displayed = 0
+        # ImageNumber and arrival time (in the image metadata) of the last displayed
+        # image, to tell whether there is a new one
+        self._last_image: tuple[int | None, str | None] = (None, None)
+
+        # The preview layer and its scale are cached so that displaying a frame
+        # doesn't need a layer lookup or a pixel size query.  They are refreshed
+        # when the layer is removed or when the pixel size may have changed.
+        self._preview_layer: napari.layers.Image | None = None
+        self._preview_scale: tuple[float, float] | None = None
+        self._objective_devices = set(self._mmc.guessObjectiveDevices())
 
         # Add all core connections to this list.  This makes it easy to disconnect
         # from core when this widget is closed.
@@ -41,6 +68,10 @@ class CoreViewerLink(QObject):
             (self._mmc.events.sequenceAcquisitionStopped, self._stop_live),
             (self._mmc.events.exposureChanged, self._restart_live),
             (self._mmc.events.configSet, self._restart_live),
+            (self._mmc.events.pixelSizeChanged, self._invalidate_preview_scale),
+            (self._mmc.events.systemConfigurationLoaded, self._on_config_loaded),
+            (self._mmc.events.propertyChanged, self._on_property_changed),
+            (self.viewer.layers.events.removed, self._on_layer_removed),
         ]
         for signal, slot in self._connections:
             signal.connect(slot)
@@ -52,8 +83,56 @@ class CoreViewerLink(QObject):
         # Clean up temporary files we opened.
         self._mda_handler._cleanup()
 
+    @property
+    def live_fps(self) -> float:
+        """Maximum rate (Hz) at which the preview layer is refreshed in live mode."""
+        return self._live_fps
+
+    @live_fps.setter
+    def live_fps(self, fps: float) -> None:
+        if fps <= 0:
+            raise ValueError("live_fps must be positive")
+        self._live_fps = float(fps)
+        if self._live_timer_id is not None:
+            self.killTimer(self._live_timer_id)
+            self._live_timer_id = self._start_display_clock()
+
+    @property
+    def frames_received(self) -> int:
+        """Number of camera frames acquired since live mode was started."""
+        return self._frames_received
+
+    @property
+    def frames_displayed(self) -> int:
+        """Number of frames shown in the viewer since live mode was started."""
+        return self._frames_displayed
+
     def timerEvent(self, a0: QTimerEvent | None) -> None:
-        self._update_viewer()
+        self._on_display_tick()
+
+    def _on_display_tick(self) -> None:
+        """Show the newest image in the circular buffer, if there is a new one."""
+        try:
+            data, md = self._mmc.getLastImageAndMD()
+        except (RuntimeError, IndexError):
+            # circular buffer empty
+            return
+        # Images are identified by the number the core gives them in a sequence
+        # acquisition (or, failing that, by the time they were received), which
+        # also tells how many camera frames arrived since the last displayed one.
+        image = (_image_number(md), md.get("TimeReceivedByCore"))
+        if image == self._last_image and image != (None, None):
+            return
+        number, last = image[0], self._last_image[0]
+        new = 1
+        if number is not None:
+            # (image numbers start at 0, and restart with each sequence acquisition)
+            new = number - last if last is not None and number > last else number + 1
+        self._last_image = image
+        self._frames_received += new
+        self._frames_displayed += 1
+        self._update_viewer(data)
+        self.liveFramesChanged.emit(self._frames_received, self._frames_displayed)
 
     def _image_snapped(self) -> None:
         # If we are in the middle of an MDA, don't update the preview viewer.
@@ -61,19 +140,44 @@ class CoreViewerLink(QObject):
             self._update_viewer(self._mmc.getImage())
 
     def _start_live(self) -> None:
-        interval = int(self._mmc.getExposure())
-        self._live_timer_id = self.startTimer(interval, Qt.TimerType.PreciseTimer)
+        self._frames_received = self._frames_displayed = 0
+        self._last_image = (None, None)
+        self.liveFramesChanged.emit(0, 0)
+        self._live_timer_id = self._start_display_clock()
+
+    def _start_display_clock(self) -> int:
+        interval = max(1, round(1000 / self._live_fps))
+        return self.startTimer(interval, Qt.TimerType.PreciseTimer)
 
     def _stop_live(self) -> None:
         if self._live_timer_id is not None:
             self.killTimer(self._live_timer_id)
             self._live_timer_id = None
+            # live frames skip the thumbnail update
+            if self._preview_layer is not None:
+                self._preview_layer.refresh()
 
     def _restart_live(self, camera: str, exposure: float) -> None:
         if self._live_timer_id:
             self._mmc.stopSequenceAcquisition()
             self._mmc.startContinuousSequenceAcquisition()
 
+    def _invalidate_preview_scale(self, *_: Any) -> None:
+        self._preview_scale = None
+
+    def _on_config_loaded(self) -> None:
+        self._objective_devices = set(self._mmc.guessObjectiveDevices())
+        self._preview_scale = None
+
+    def _on_property_changed(self, device: str, prop: str, value: str) -> None:
+        # changing the objective changes the pixel size without `pixelSizeChanged`
+        if device in self._objective_devices:
+            self._preview_scale = None
+
+    def _on_layer_removed(self, event: Any) -> None:
+        if event.value is self._preview_layer:
+            self._preview_layer = None
+
     @ensure_main_thread  # type: ignore [misc]
     def _update_viewer(self, data: np.ndarray | None = None) -> None:
         """Update viewer with the latest image from the circular buffer."""
@@ -85,19 +189,33 @@ class CoreViewerLink(QObject):
             except (RuntimeError, IndexError):
                 # circular buffer empty
                 return
-        try:
-            preview_layer = self.viewer.layers["preview"]
-            preview_layer.data = data
-        except KeyError:
-            preview_layer = self.viewer.add_image(data, name="preview")
-
-        preview_layer.metadata["mode"] = "preview"
-
-        if (pix_size := self._mmc.getPixelSizeUm()) != 0:
-            preview_layer.scale = (pix_size, pix_size)
+        if (preview_layer := self._preview_layer) is not None:
+            set_preview_data(preview_layer, data)
         else:
-            # return to default
-            preview_layer.scale = [1.0, 1.0]
+            try:
+                preview_layer = self.viewer.layers["preview"]
+                set_preview_data(preview_layer, data)
+            except KeyError:
+                preview_layer = self.viewer.add_image(
+                    new_preview_buffer(data), name="preview"
+                )
+            preview_layer.metadata["mode"] = "preview"
+            self._preview_layer = preview_layer
+            self._preview_scale = None
+
+        if self._preview_scale is None:
+            # 0 means no pixel size is defined: return to default
+            pix_size = self._mmc.getPixelSizeUm() or 1.0
+            self._preview_scale = (pix_size, pix_size)
+            preview_layer.scale = self._preview_scale
 
         if self._live_timer_id is None:
             self.viewer.reset_view()
+
+
+def _image_number(md: Any) -> int | None:
+    """Return the "ImageNumber" of the image metadata `md`, if it has one."""
+    try:
+        return int(md.get("ImageNumber"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,137 @@
+"""Export of MDA layer data to OME-Zarr or OME-TIFF files."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+
+from ._ngff import OmeZarrLayerArray
+from ._ome_tiff import OME_TIFF_AXES
+from ._storage import OME_TIFF_EXTS, OME_ZARR_EXT
+from ._util import NMM_METADATA_KEY, get_full_sequence_axes
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+    from napari.layers import Image
+
+
+def export_layer(layer: Image, path: str | Path, **kwargs: Any) -> Path:
+    """Export the (full resolution) data of an MDA `layer` to `path`.
+
+    The format is chosen from the extension of `path` (see `export_array`).  This
+    is how layers with the "memmap" storage are meant to be saved, but it works
+    for any layer created by napari-micromanager.  Returns the path written.
+    """
+    meta = cast("dict", layer.metadata[NMM_METADATA_KEY])
+    axes = list(get_full_sequence_axes(meta["useq_sequence"]))
+    if "ch_id" in meta:  # (split channels: one layer per channel)
+        axes.remove("c")
+    data = layer.data[0] if layer.multiscale else layer.data
+    return export_array(data, path, axes, list(layer.scale), **kwargs)
+
+
+def export_array(
+    data: Any,
+    path: str | Path,
+    index_axes: Sequence[str],
+    scale: Sequence[float] | None = None,
+    **kwargs: Any,
+) -> Path:
+    """Export `data` (index axes, then y, x and optionally RGB) to `path`.
+
+    Parameters
+    ----------
+    data : array-like
+        The data to export, read one frame at a time.
+    path : str | Path
+        The path to write: an OME-Zarr store (".ome.zarr") or an OME-TIFF file
+        (".ome.tif" or ".ome.tiff").
+    index_axes : Sequence[str]
+        The labels of the index axes of `data` (e.g. "t", "p", "c", "z").
+    scale : Sequence[float] | None
+        The scale of the index axes and of y, x (1 for all axes if None).
+    **kwargs
+        Passed to `OmeZarrLayerArray` (e.g. from `compression_kwargs`) or to
+        `tifffile.TiffWriter.write` (e.g. `compression`).
+    """
+    path = Path(path)
+    name = path.name.lower()
+    scale = list(scale) if scale is not None else [1.0] * (len(index_axes) + 2)
+    if name.endswith(OME_ZARR_EXT):
+        _export_ome_zarr(data, path, index_axes, scale, **kwargs)
+    elif name.endswith(OME_TIFF_EXTS):
+        _export_ome_tiff(data, path, index_axes, scale, **kwargs)
+    else:
+        raise ValueError(
+            f"Cannot export to {path.name!r}: the extension must be one of "
+            f"{(OME_ZARR_EXT, *OME_TIFF_EXTS)}"
+        )
+    return path
+
+
+def _export_ome_zarr(
+    data: Any,
+    path: Path,
+    index_axes: Sequence[str],
+    scale: Sequence[float],
+    **kwargs: Any,
+) -> None:
+    n = len(index_axes)
+    out = OmeZarrLayerArray(
+        path,
+        "0",
+        index_axes,
+        data.shape[:n],
+        data.shape[n:],
+        np.dtype(data.dtype).str,
+        **kwargs,
+    )
+    for idx in np.ndindex(*data.shape[:n]):
+        out[idx] = np.asarray(data[idx])
+    out.write_metadata(scale)
+
+
+def _export_ome_tiff(
+    data: Any,
+    path: Path,
+    index_axes: Sequence[str],
+    scale: Sequence[float],
+    **kwargs: Any,
+) -> None:
+    import tifffile
+
+    n = len(index_axes)
+    rgb = data.ndim - n == 3
+    sizes = dict(zip(index_axes, data.shape[:n]))
+    split = [ax for ax in index_axes if ax not in OME_TIFF_AXES]
+    image_axes = [ax for ax in OME_TIFF_AXES if ax in index_axes]
+    shape = [sizes[ax] for ax in image_axes] + list(data.shape[n:])
+    scales = dict(zip([*index_axes, "y", "x"], scale))
+    metadata: dict[str, Any] = {
+        "axes": "".join(image_axes).upper() + ("YXS" if rgb else "YX"),
+        "PhysicalSizeX": scales["x"],
+        "PhysicalSizeY": scales["y"],
+    }
+    if "z" in scales:
+        metadata["PhysicalSizeZ"] = scales["z"]
+
+    def _frames(split_idx: tuple[int, ...]) -> Iterator[np.ndarray]:
+        fixed = dict(zip(split, split_idx))
+        for image_idx in np.ndindex(*shape[: len(image_axes)]):
+            fixed.update(zip(image_axes, image_idx))
+            yield np.asarray(data[tuple(fixed[ax] for ax in index_axes)])
+
+    # (one OME image per index along the other axes, e.g. per position)
+    with tifffile.TiffWriter(path, bigtiff=True, ome=True) as tif:
+        for split_idx in np.ndindex(*(sizes[ax] for ax in split)):
+            tif.write(
+                _frames(split_idx),
+                shape=tuple(shape),
+                dtype=data.dtype,
+                photometric="rgb" if rgb else "minisblack",
+                metadata=metadata,
+                **kwargs,
+            )
@@ -0,0 +1,87 @@
+"""Per-frame statistics computed as frames are written, to avoid reading them back."""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# number of bins of the coarse per-frame histograms
+HIST_BINS = 64
+# histograms are computed from a strided subsample of at most ~this many pixels
+HIST_SAMPLES = 2**18
+
+
+class FrameStats:
+    """Min, max, mean and a coarse histogram of each frame of a layer.
+
+    The statistics are stored in compact arrays indexed like the layer data
+    without its frame (yx, and RGB) dimensions, so that looking up the
+    statistics of the displayed frame doesn't require reading the frame.
+
+    Parameters
+    ----------
+    index_shape : Sequence[int]
+        The shape of the layer data without the frame dimensions.
+    dtype : np.dtype | str
+        The dtype of the frames.
+    """
+
+    def __init__(self, index_shape: Sequence[int], dtype: np.dtype | str) -> None:
+        self.dtype = np.dtype(dtype)
+        shape = tuple(index_shape)
+        self.written = np.zeros(shape, dtype=bool)
+        self.min = np.zeros(shape, dtype=self.dtype)
+        self.max = np.zeros(shape, dtype=self.dtype)
+        self.mean = np.zeros(shape, dtype=np.float32)
+        # Histograms are only computed for unsigned integer frames (as produced by
+        # cameras), with bins spanning the whole dtype range.  They count the pixels
+        # of a subsample of the frame (see `HIST_SAMPLES`).
+        self._shift: int | None = None
+        if self.dtype.kind == "u":
+            self._shift = self.dtype.itemsize * 8 - int(np.log2(HIST_BINS))
+        self.hist = np.zeros((*shape, HIST_BINS), dtype=np.uint32)
+
+    @property
+    def ndim(self) -> int:
+        """Number of index dimensions."""
+        return self.written.ndim
+
+    @property
+    def bin_edges(self) -> np.ndarray | None:
+        """Edges of the histogram bins, None if no histograms are computed."""
+        if self._shift is None:
+            return None
+        return np.arange(HIST_BINS + 1, dtype=np.float64) * (1 << self._shift)
+
+    def record(self, index: tuple[int, ...], frame: np.ndarray) -> None:
+        """Compute and store the statistics of `frame`, written at `index`."""
+        self.min[index] = frame.min()
+        self.max[index] = frame.max()
+        self.mean[index] = frame.mean(dtype=np.float64)
+        if self._shift is not None:
+            step = max(1, math.isqrt(frame.shape[0] * frame.shape[1] // HIST_SAMPLES))
+            sample = frame[::step, ::step].ravel()
+            self.hist[index] = np.bincount(sample >> self._shift, minlength=HIST_BINS)
+        self.written[index] = True
+
+    def range(self, index: Sequence[int]) -> tuple[float, float] | None:
+        """Return the `(min, max)` of the frame at `index`, None if not written."""
+        index = tuple(index)
+        if len(index) != self.ndim or any(
+            not 0 <= i < n for i, n in zip(index, self.written.shape)
+        ):
+            return None
+        if not self.written[index]:
+            return None
+        return float(self.min[index]), float(self.max[index])
+
+    def data_range(self) -> tuple[float, float] | None:
+        """Return the `(min, max)` over all written frames, None if none written."""
+        if not self.written.any():
+            return None
+        return float(self.min[self.written].min()), float(self.max[self.written].max())
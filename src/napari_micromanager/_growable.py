@@ -0,0 +1,127 @@
+"""Arrays that grow as the frames of a sequence of unknown length are written."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import zarr
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# the capacity of a full index dimension is multiplied by this factor
+GROWTH_FACTOR = 2
+# initial capacity of the first index dimension (the others start at 1)
+INITIAL_CAPACITY = 16
+
+
+class GrowableArray:
+    """Array-like that grows along its index dimensions as frames are written.
+
+    The first `n_index` dimensions index the frames, the remaining ones hold a
+    frame.  `shape` is the smallest shape holding all frames written so far (at
+    least 1 along each index dimension). The backing numpy or zarr array (see
+    `array`) is over-allocated by `GROWTH_FACTOR` whenever a frame is written
+    outside of it, so that resizes are amortized.
+
+    Reads are limited to `shape`, so that this can be used as napari layer data.
+    Frames must be written from a single thread.
+
+    Parameters
+    ----------
+    array : np.ndarray | zarr.Array
+        The backing array, whose shape is the initial capacity.  zarr arrays are
+        resized in place, and should be chunked by frame.
+    n_index : int
+        The number of index dimensions.
+    """
+
+    def __init__(self, array: np.ndarray | zarr.Array, n_index: int) -> None:
+        self._array = array
+        self._n_index = n_index
+        self._shape: tuple[int, ...] = (1,) * n_index + tuple(array.shape[n_index:])
+
+    @property
+    def array(self) -> np.ndarray | zarr.Array:
+        """The backing array (may be larger than `shape`)."""
+        return self._array
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self._shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self._array.dtype)
+
+    @property
+    def ndim(self) -> int:
+        return len(self._shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self._shape))
+
+    def __len__(self) -> int:
+        return self._shape[0]
+
+    def __setitem__(self, index: tuple[int, ...], frame: np.ndarray) -> None:
+        """Write `frame` at the (index dimensions) `index`, growing if needed."""
+        if any(i >= n for i, n in zip(index, self._shape)):
+            capacity = self._array.shape[: self._n_index]
+            if any(i >= n for i, n in zip(index, capacity)):
+                self._grow([_grown(n, i) for i, n in zip(index, capacity)])
+            self._shape = (
+                *(max(i + 1, n) for i, n in zip(index, self._shape)),
+                *self._shape[self._n_index :],
+            )
+        self._array[index] = frame
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(self._array, np.ndarray):
+            return self._array[self._view()][key]
+        return self._array[_clip_key(key, self._shape)]
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        data = np.asarray(self[...])
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    def _view(self) -> tuple[slice, ...]:
+        return tuple(slice(0, n) for n in self._shape)
+
+    def _grow(self, index_capacity: Sequence[int]) -> None:
+        new_shape = (*index_capacity, *self._array.shape[self._n_index :])
+        if isinstance(self._array, zarr.Array):
+            self._array.resize(new_shape)
+            return
+        grown = np.zeros(new_shape, dtype=self._array.dtype)
+        old = tuple(slice(0, n) for n in self._array.shape)
+        grown[old] = self._array
+        self._array = grown
+
+
+def _grown(capacity: int, index: int) -> int:
+    """Return `capacity` multiplied by `GROWTH_FACTOR` until it holds `index`."""
+    while index >= capacity:
+        capacity *= GROWTH_FACTOR
+    return capacity
+
+
+def _clip_key(key: Any, shape: Sequence[int]) -> Any:
+    """Return `key` with its slices limited to `shape`."""
+    if not isinstance(key, tuple):
+        key = (key,)
+    if any(k is Ellipsis for k in key):
+        i = next(i for i, k in enumerate(key) if k is Ellipsis)
+        fill = (slice(None),) * (len(shape) - len(key) + 1)
+        key = (*key[:i], *fill, *key[i + 1 :])
+    key = key + (slice(None),) * (len(shape) - len(key))
+    clipped = []
+    for k, n in zip(key, shape):
+        if isinstance(k, slice):
+            k = slice(*k.indices(n))
+        elif isinstance(k, (int, np.integer)) and k < 0:
+            k = int(k) + n
+        clipped.append(k)
+    return tuple(clipped)
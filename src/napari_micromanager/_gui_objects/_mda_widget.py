@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from pymmcore_widgets.mda import MDAWidget
 from qtpy.QtWidgets import (
+    QBoxLayout,
     QCheckBox,
+    QComboBox,
+    QGridLayout,
+    QHBoxLayout,
+    QLabel,
     QVBoxLayout,
     QWidget,
 )
@@ -14,6 +19,7 @@ if TYPE_CHECKING:
     from useq import MDASequence
 
 
+from napari_micromanager._storage import CHUNKINGS, COMPRESSIONS, DISK_FORMATS
 from napari_micromanager._util import NMM_METADATA_KEY
 
 
@@ -25,11 +31,76 @@ class MultiDWidget(MDAWidget):
     ) -> None:
         # add split channel checkbox
         self.checkBox_split_channels = QCheckBox(text="Split channels in viewer")
+        # add direct to disk checkbox
+        self.checkBox_direct_to_disk = QCheckBox(
+            text="Write viewer layers directly to disk as"
+        )
+        self.checkBox_direct_to_disk.setToolTip(
+            "Back the viewer layers with an OME-Zarr store (or OME-TIFF files) in the "
+            "save directory, so that each frame is only written once."
+        )
+        self.disk_format_combo = QComboBox()
+        self.disk_format_combo.addItems(list(DISK_FORMATS))
+        self.disk_format_combo.setToolTip(
+            "ome-zarr: compressed, chunked store.\n"
+            "ome-tiff: uncompressed BigTIFF files, complete as soon as the "
+            "acquisition ends."
+        )
+        # add mosaic checkbox
+        self.checkBox_mosaic = QCheckBox(text="Show stitched overview in viewer")
+        self.checkBox_mosaic.setToolTip(
+            "Add a layer where each frame (of the first channel) is placed at its "
+            "stage position, downsampled."
+        )
+        # napari-micromanager options of the last `setValue` (including the ones
+        # without a widget, e.g. "pyramid_levels" or "storage")
+        self._nmm_meta: dict[str, Any] = {}
         super().__init__(parent=parent, mmcore=mmcore)
 
+        save_layout = cast("QGridLayout", self.save_info.layout())
+        direct_wdg = QWidget()
+        direct_layout = QHBoxLayout(direct_wdg)
+        direct_layout.setContentsMargins(0, 0, 0, 0)
+        direct_layout.addWidget(self.checkBox_direct_to_disk)
+        direct_layout.addWidget(self.disk_format_combo)
+        direct_layout.addStretch()
+        save_layout.addWidget(direct_wdg, save_layout.rowCount(), 0, 1, -1)
+        self.save_info.setFixedHeight(self.save_info.minimumSizeHint().height())
+
+        # add compression combo below the save box
+        self.compression_combo = QComboBox()
+        self.compression_combo.addItems(list(COMPRESSIONS))
+        self.compression_combo.setToolTip(
+            "Compression of the data backing the viewer layers (Blosc, multithreaded)."
+        )
+        self.chunking_combo = QComboBox()
+        self.chunking_combo.addItems(list(CHUNKINGS))
+        self.chunking_combo.setToolTip(
+            "frame: one chunk (file) per frame, for the fastest writes.\n"
+            "stack: one chunk per stack along the innermost axis (e.g. z), for "
+            "fewer files and faster reads along it.\n"
+            "auto: stack if z is the innermost axis, frame otherwise."
+        )
+        self.checkBox_sharding = QCheckBox(text="Shards")
+        self.checkBox_sharding.setToolTip(
+            "Store many chunks in each file (zarr v3 sharding), for far fewer files "
+            "in long acquisitions."
+        )
+        compression_wdg = QWidget()
+        compression_layout = QHBoxLayout(compression_wdg)
+        compression_layout.setContentsMargins(10, 0, 10, 0)
+        compression_layout.addWidget(QLabel("Layer compression:"))
+        compression_layout.addWidget(self.compression_combo)
+        compression_layout.addWidget(QLabel("Chunks:"))
+        compression_layout.addWidget(self.chunking_combo)
+        compression_layout.addWidget(self.checkBox_sharding)
+        compression_layout.addStretch()
+        cast("QBoxLayout", self.layout()).insertWidget(1, compression_wdg)
+
         # setContentsMargins
         pos_layout = cast("QVBoxLayout", self.stage_positions.layout())
         pos_layout.setContentsMargins(10, 10, 10, 10)
+        pos_layout.addWidget(self.checkBox_mosaic)
         time_layout = cast("QVBoxLayout", self.time_plan.layout())
         time_layout.setContentsMargins(10, 10, 10, 10)
         ch_layout = cast("QVBoxLayout", self.channels.layout())
@@ -41,14 +112,52 @@ class MultiDWidget(MDAWidget):
         # Overriding the value method to add the metadata necessary for the handler.
         sequence = super().value()
         split = self.checkBox_split_channels.isChecked() and len(sequence.channels) > 1
-        sequence.metadata[NMM_METADATA_KEY] = {"split_channels": split}
+        nmm_meta = {
+            **self._nmm_meta,
+            **cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {})),
+        }
+        nmm_meta.update(
+            split_channels=split,
+            direct_to_disk=self._direct_to_disk(),
+            disk_format=self.disk_format_combo.currentText(),
+            compression=self.compression_combo.currentText(),
+            chunking=self.chunking_combo.currentText(),
+            sharding=self.checkBox_sharding.isChecked(),
+            mosaic=self.checkBox_mosaic.isChecked(),
+        )
+        sequence.metadata[NMM_METADATA_KEY] = nmm_meta
         return sequence  # type: ignore[no-any-return]
 
     def setValue(self, value: MDASequence) -> None:
         """Set the current value of the widget."""
+        self._nmm_meta = dict(value.metadata.get(NMM_METADATA_KEY) or {})
         # set split_channels checkbox
-        if nmm_meta := value.metadata.get(NMM_METADATA_KEY):
+        if nmm_meta := self._nmm_meta:
             self.checkBox_split_channels.setChecked(
                 nmm_meta.get("split_channels", False)
             )
+            self.checkBox_direct_to_disk.setChecked(
+                nmm_meta.get("direct_to_disk", False)
+            )
+            self.checkBox_mosaic.setChecked(nmm_meta.get("mosaic", False))
+            self.checkBox_sharding.setChecked(nmm_meta.get("sharding", False))
+            if disk_format := nmm_meta.get("disk_format"):
+                self.disk_format_combo.setCurrentText(disk_format)
+            if compression := nmm_meta.get("compression"):
+                self.compression_combo.setCurrentText(compression)
+            if chunking := nmm_meta.get("chunking"):
+                self.chunking_combo.setCurrentText(chunking)
         super().setValue(value)
+
+    def execute_mda(self, output: Any) -> None:
+        """Execute the MDA experiment corresponding to the current value."""
+        # in direct to disk mode the viewer layers *are* the saved data,
+        # so we don't want pymmcore-widgets to write everything a second time.
+        if self._direct_to_disk():
+            output = None
+        super().execute_mda(output)
+
+    def _direct_to_disk(self) -> bool:
+        return bool(
+            self.save_info.isChecked() and self.checkBox_direct_to_disk.isChecked()
+        )
@@ -3,35 +3,63 @@ from __future__ import annotations
 import warnings
 from typing import TYPE_CHECKING
 
-from qtpy.QtGui import QColor
+from qtpy.QtCore import Signal  # type: ignore [attr-defined]
+from qtpy.QtGui import QColor, QShowEvent
 from qtpy.QtWidgets import QLabel, QScrollArea, QWidget
 
+from napari_micromanager._util import NMM_METADATA_KEY
+
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Sequence
 
     from napari.layers import Image
 
+    from napari_micromanager._frame_stats import FrameStats
+
 QCOLORS = set(QColor.colorNames())
 
 
 class MinMax(QScrollArea):
     """A Widget to display min and max layer grey values."""
 
+    shown = Signal()
+
     def __init__(self, *, parent: QWidget | None = None) -> None:
         super().__init__(parent=parent)
         self.setWidgetResizable(True)
         self._label = QLabel()
         self.setWidget(self._label)
 
-    def update_from_layers(self, layers: Iterable[Image]) -> None:
-        """Update the minmax label based on data from layers."""
+    def showEvent(self, a0: QShowEvent | None) -> None:
+        super().showEvent(a0)
+        self.shown.emit()
+
+    def update_from_layers(
+        self, layers: Iterable[Image], point: Sequence[float] | None = None
+    ) -> None:
+        """Update the minmax label based on data from layers.
+
+        If the world `point` of the displayed (yx) frame is given, the range of MDA
+        layers is looked up in the statistics computed when the frames were written,
+        instead of being computed from the layer data.
+        """
         min_max_txt = "(min, max):  "
         for layer in layers:
             col = col if (col := layer.colormap.name) in QCOLORS else "gray"
             try:
-                minmax = tuple(layer._calc_data_range(mode="slice"))
+                if point is None or (minmax := _cached_range(layer, point)) is None:
+                    minmax = tuple(layer._calc_data_range(mode="slice"))
                 min_max_txt += f' <font color="{col}">{minmax}</font>'
             except Exception:
                 warnings.warn("cannot update minmax. napari api changed?", stacklevel=2)
 
         self._label.setText(min_max_txt)
+
+
+def _cached_range(layer: Image, point: Sequence[float]) -> tuple[float, float] | None:
+    meta = layer.metadata.get(NMM_METADATA_KEY) or {}
+    stats: FrameStats | None = meta.get("frame_stats")
+    if stats is None:
+        return None
+    coords = layer.world_to_data(point)
+    return stats.range([round(c) for c in coords[: stats.ndim]])
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+from qtpy.QtCore import QTimer
+from qtpy.QtWidgets import (
+    QFileDialog,
+    QFormLayout,
+    QHBoxLayout,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from napari_micromanager._telemetry import Telemetry
+
+if TYPE_CHECKING:
+    from pymmcore_plus import CMMCorePlus
+
+# the labels are refreshed this often (in ms) while the widget is visible
+REFRESH_MS = 500
+
+# latency rows: label -> key of the `Telemetry.summary` percentiles
+LATENCIES = {
+    "Queued (p50 / p95)": "queued_ms",
+    "Write (p50 / p95)": "write_ms",
+    "To display (p50 / p95)": "display_ms",
+}
+ROWS = [
+    "Frames received",
+    "Frames written",
+    "Frames displayed",
+    "Dropped / late",
+    "Queue depth (max)",
+    "Written",
+    "Write rate",
+    *LATENCIES,
+]
+
+
+class TelemetryWidget(QWidget):
+    """Live view of the telemetry of the MDA pipeline.
+
+    The telemetry is taken from the `telemetry` attribute of `parent` (the
+    `MainWindow`); an empty one is used if the parent doesn't have one.  The fill
+    level of the frame queue is shown if the parent has a `queue_fill` attribute.
+    """
+
+    def __init__(
+        self, *, parent: QWidget | None = None, mmcore: CMMCorePlus | None = None
+    ) -> None:
+        super().__init__(parent=parent)
+        self._source = parent
+        telemetry = getattr(parent, "telemetry", None)
+        self.telemetry: Telemetry = telemetry or Telemetry()
+
+        form = QFormLayout()
+        self._labels: dict[str, QLabel] = {}
+        for name in ROWS:
+            self._labels[name] = QLabel()
+            form.addRow(f"{name}:", self._labels[name])
+        self._queue_fill = QProgressBar()
+        self._queue_fill.setToolTip("Frames waiting to be written, in % of the budget")
+        form.addRow("Queue fill:", self._queue_fill)
+
+        save_btn = QPushButton("Save trace...")
+        save_btn.setToolTip("Save the per-frame timings as a Chrome trace or CSV")
+        save_btn.clicked.connect(self._save)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self._reset)
+        btns = QHBoxLayout()
+        btns.addWidget(save_btn)
+        btns.addWidget(reset_btn)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(form)
+        layout.addLayout(btns)
+        layout.addStretch()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event: object) -> None:
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)  # type: ignore [arg-type]
+
+    def hideEvent(self, event: object) -> None:
+        self._timer.stop()
+        super().hideEvent(event)  # type: ignore [arg-type]
+
+    def refresh(self) -> None:
+        """Update the labels from the telemetry summary."""
+        s = self.telemetry.summary()
+        values = {
+            "Frames received": f"{s['enqueued']:d}",
+            "Frames written": f"{s['written']:d}",
+            "Frames displayed": f"{s['displayed']:d}",
+            "Dropped / late": f"{s['dropped']:d} / {s['late']:d}",
+            "Queue depth (max)": f"{s['queue_depth']:d} ({s['max_queue_depth']:d})",
+            "Written": f"{s['bytes_written'] / 1e6:.1f} MB",
+            "Write rate": f"{s['write_fps']:.1f} fps, {s['write_mb_per_s']:.1f} MB/s",
+        }
+        for name, key in LATENCIES.items():
+            values[name] = _format_ms(s[key])
+        for name, text in values.items():
+            self._labels[name].setText(text)
+        fill = getattr(self._source, "queue_fill", None)
+        self._queue_fill.setEnabled(fill is not None)
+        self._queue_fill.setValue(min(round((fill or 0) * 100), 100))
+
+    def _reset(self) -> None:
+        self.telemetry.reset()
+        self.refresh()
+
+    def _save(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save acquisition trace",
+            "trace.json",
+            "Chrome trace (*.json);;CSV (*.csv)",
+        )
+        if path:
+            self.telemetry.dump(path)
+
+
+def _format_ms(p: dict[str, float]) -> str:
+    if math.isnan(p["p50"]):
+        return "-"
+    return f"{p['p50']:.1f} / {p['p95']:.1f} ms"
@@ -1,29 +1,20 @@
 from __future__ import annotations
 
 import contextlib
+import importlib
 from typing import TYPE_CHECKING, cast
 
 from fonticon_mdi6 import MDI6
 from pymmcore_plus import CMMCorePlus
 from pymmcore_widgets import (
-    CameraRoiWidget,
     ChannelGroupWidget,
     ChannelWidget,
     ConfigurationWidget,
     DefaultCameraExposureWidget,
-    GroupPresetTableWidget,
     LiveButton,
     ObjectivesWidget,
-    PropertyBrowser,
     SnapButton,
 )
-
-try:
-    # this was renamed
-    from pymmcore_widgets import ObjectivesPixelConfigurationWidget
-except ImportError:
-    from pymmcore_widgets import PixelSizeWidget as ObjectivesPixelConfigurationWidget
-
 from qtpy.QtCore import QEvent, QObject, QSize, Qt
 from qtpy.QtWidgets import (
     QDockWidget,
@@ -39,27 +30,41 @@ from qtpy.QtWidgets import (
 )
 from superqt.fonticon import icon
 
-from ._illumination_widget import IlluminationWidget
-from ._mda_widget import MultiDWidget
 from ._min_max_widget import MinMax
 from ._shutters_widget import MMShuttersWidget
-from ._stages_widget import MMStagesWidget
 
 if TYPE_CHECKING:
     import napari.viewer
+    from pymmcore_widgets import PropertyBrowser
 
 TOOL_SIZE = 35
 
 
-# Dict for QObject and its QPushButton icon
-DOCK_WIDGETS: dict[str, tuple[type[QWidget], str | None]] = {
-    "Device Property Browser": (PropertyBrowser, MDI6.table_large),
-    "Groups and Presets Table": (GroupPresetTableWidget, MDI6.table_large_plus),
-    "Illumination Control": (IlluminationWidget, MDI6.lightbulb_on),
-    "Stages Control": (MMStagesWidget, MDI6.arrow_all),
-    "Camera ROI": (CameraRoiWidget, MDI6.crop),
-    "Pixel Size Table": (ObjectivesPixelConfigurationWidget, MDI6.ruler),
-    "MDA": (MultiDWidget, None),
+# Dict for the import path ("module:class") of a QWidget and its QPushButton icon.
+# The widgets are only imported (and created) when they are first shown.
+# Alternative class names (e.g. widgets renamed in pymmcore-widgets) are separated
+# by "|".
+DOCK_WIDGETS: dict[str, tuple[str, str | None]] = {
+    "Device Property Browser": ("pymmcore_widgets:PropertyBrowser", MDI6.table_large),
+    "Groups and Presets Table": (
+        "pymmcore_widgets:GroupPresetTableWidget",
+        MDI6.table_large_plus,
+    ),
+    "Illumination Control": (
+        f"{__package__}._illumination_widget:IlluminationWidget",
+        MDI6.lightbulb_on,
+    ),
+    "Stages Control": (f"{__package__}._stages_widget:MMStagesWidget", MDI6.arrow_all),
+    "Camera ROI": ("pymmcore_widgets:CameraRoiWidget", MDI6.crop),
+    "Pixel Size Table": (
+        "pymmcore_widgets:ObjectivesPixelConfigurationWidget|PixelSizeWidget",
+        MDI6.ruler,
+    ),
+    "Acquisition Telemetry": (
+        f"{__package__}._telemetry_widget:TelemetryWidget",
+        MDI6.speedometer,
+    ),
+    "MDA": (f"{__package__}._mda_widget:MultiDWidget", None),
 }
 
 
@@ -101,6 +106,7 @@ class MicroManagerToolbar(QMainWindow):
                 )
 
         self._dock_widgets: dict[str, QDockWidget] = {}
+        self._snap_live_toolbar = SnapLiveToolBar(self)
         # add toolbar items
         toolbar_items = [
             ConfigToolBar(self),
@@ -108,7 +114,7 @@ class MicroManagerToolbar(QMainWindow):
             ObjectivesToolBar(self),
             None,
             ShuttersToolBar(self),
-            SnapLiveToolBar(self),
+            self._snap_live_toolbar,
             ExposureToolBar(self),
             ToolsToolBar(self),
         ]
@@ -180,7 +186,7 @@ class MicroManagerToolbar(QMainWindow):
             # creating it for the first time
             # sourcery skip: extract-method
             try:
-                wdg_cls = DOCK_WIDGETS[key][0]
+                wdg_cls = _import_widget(DOCK_WIDGETS[key][0])
             except KeyError as e:
                 raise KeyError(
                     "Not a recognized dock widget key. "
@@ -189,11 +195,11 @@ class MicroManagerToolbar(QMainWindow):
                 ) from e
             wdg = wdg_cls(parent=self, mmcore=self._mmc)
 
-            if isinstance(wdg, PropertyBrowser):
+            if key == "Device Property Browser":
                 wdg.setSizePolicy(
                     QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
                 )
-                wdg._prop_table.setVerticalScrollBarPolicy(
+                cast("PropertyBrowser", wdg)._prop_table.setVerticalScrollBarPolicy(
                     Qt.ScrollBarPolicy.ScrollBarAlwaysOff
                 )
                 floating = True
@@ -222,6 +228,16 @@ class MicroManagerToolbar(QMainWindow):
         return dock_wdg
 
 
+def _import_widget(path: str) -> type[QWidget]:
+    """Import the widget class at `path` ("module:class", see `DOCK_WIDGETS`)."""
+    module_name, _, names = path.partition(":")
+    module = importlib.import_module(module_name)
+    for name in names.split("|"):
+        if (cls := getattr(module, name, None)) is not None:
+            return cast("type[QWidget]", cls)
+    raise ImportError(f"cannot import {names!r} from {module_name!r}")
+
+
 # -------------- Toolbars --------------------
 
 
@@ -287,6 +303,16 @@ class SnapLiveToolBar(MMToolBar):
         live_btn.setFixedSize(TOOL_SIZE, TOOL_SIZE)
         self.addSubWidget(live_btn)
 
+        self.frames_label = QLabel()
+        self.frames_label.setToolTip(
+            "Live mode: frames displayed / frames received from the camera"
+        )
+        self.addSubWidget(self.frames_label)
+
+    def set_frame_counts(self, received: int, displayed: int) -> None:
+        """Show the number of live frames `displayed` out of `received`."""
+        self.frames_label.setText(f"{displayed}/{received}")
+
 
 class ToolsToolBar(MMToolBar):
     """A QToolBar containing QPushButtons for pymmcore-widgets.
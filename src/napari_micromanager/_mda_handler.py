@@ -1,27 +1,61 @@
 from __future__ import annotations
 
 import contextlib
-import tempfile
+import logging
+import math
+import os
+import threading
 import time
 from collections import deque
-from typing import TYPE_CHECKING, Callable, cast
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, cast
 
 import napari
+import numpy as np
 import zarr
+from qtpy.QtCore import QTimer
 from superqt.utils import create_worker, ensure_main_thread
 
+from ._chunk_buffer import ChunkBuffer
+from ._frame_stats import FrameStats
+from ._growable import INITIAL_CAPACITY, GrowableArray
+from ._mosaic import Mosaic, get_mosaic, sequence_xy_positions
+from ._ngff import OmeZarrLayerArray
+from ._ome_tiff import OmeTiffLayerArray
+from ._preview import new_preview_buffer, set_preview_data
+from ._proc_writer import ProcessFrameWriter
+from ._pyramid import get_pyramid_levels, pyramid_yx_shapes, write_pyramid
+from ._scratch import ScratchFile
+from ._storage import (
+    DEFAULT_MEMORY_BUDGET,
+    ZARR_V3,
+    chunk_shape,
+    compression_kwargs,
+    create_temp_memmap,
+    create_temp_zarr_array,
+    estimate_nbytes,
+    get_chunking,
+    get_compression,
+    get_ome_tiff_path,
+    get_ome_zarr_path,
+    get_sharding,
+    get_storage,
+    nbytes_stored,
+    shard_shape,
+)
+from ._telemetry import Telemetry
 from ._util import NMM_METADATA_KEY, PYMMCW_METADATA_KEY, get_full_sequence_axes
 
 if TYPE_CHECKING:
+    import tempfile
     from collections.abc import Generator
     from uuid import UUID
 
     import napari.viewer
-    import numpy as np
     from napari.layers import Image
     from pymmcore_plus import CMMCorePlus
     from pymmcore_plus.core.events._protocol import PSignalInstance
-    from typing_extensions import TypedDict
+    from typing_extensions import TypeAlias, TypedDict, TypeGuard
     from useq import MDAEvent, MDASequence
 
     class LayerMeta(TypedDict, total=False):
@@ -30,9 +64,38 @@ if TYPE_CHECKING:
         useq_sequence: MDASequence
         uid: UUID
         ch_id: str
+        save_path: str
+        frame_stats: FrameStats
+
+    # the arrays that may back a layer (or one of its levels)
+    LayerArray: TypeAlias = (
+        "zarr.Array | np.ndarray | GrowableArray | OmeZarrLayerArray | "
+        "OmeTiffLayerArray | ChunkBuffer"
+    )
 
 
 DEFAULT_NAME = "Exp"
+# maximum number of viewer dims updates per second while following an MDA
+DEFAULT_DIMS_UPDATE_HZ = 30.0
+# index axes of the layer of a sequence of unknown length (e.g. from a generator)
+GENERATOR_AXES = ("t", "p", "g", "c", "z")
+# available values for `_NapariMDAHandler.generator_storage`
+GENERATOR_STORAGES = ("zarr", "memory", "preview")
+# available values for `_NapariMDAHandler.backpressure`
+BACKPRESSURE_POLICIES = ("block", "spill", "drop_display")
+# maximum number of bytes of frames waiting to be written (see `queue_budget`)
+DEFAULT_QUEUE_BUDGET = 1024 * 2**20
+# an acquisition paused by the "block" policy resumes below this fill level
+RESUME_FILL = 0.5
+# available values for `_NapariMDAHandler.writer`
+WRITERS = ("thread", "process")
+# defaults of `_NapariMDAHandler.writer_processes` and `writer_slots`
+DEFAULT_WRITER_PROCESSES = min(os.cpu_count() or 1, 4)
+DEFAULT_WRITER_SLOTS = 32
+# maximum number of bytes of a run of frames written at once (see `combine_runs`)
+MAX_RUN_BYTES = 64 * 2**20
+
+logger = logging.getLogger(__name__)
 
 
 def _get_file_name_from_metadata(sequence: MDASequence) -> str:
@@ -52,6 +115,64 @@ class _NapariMDAHandler:
         The Micro-Manager core instance.
     viewer : napari.viewer.Viewer
         The napari viewer instance.
+
+    Attributes
+    ----------
+    follow : bool
+        Whether the viewer dims should follow the most recently acquired frame.
+        Set to `False` to scrub freely through the data while frames arrive.
+    dims_update_hz : float
+        Maximum number of viewer dims updates per second while following an MDA.
+    memory_budget : int
+        Maximum number of bytes that in-memory MDA layers may use.  Sequences that
+        fit in the budget are (by default) acquired into preallocated numpy arrays
+        rather than temporary zarr stores, and are moved to disk if they outgrow it.
+    generator_storage : str
+        Storage of sequences of unknown length (i.e. events from a generator),
+        which are written to a layer that grows as frames arrive: "zarr" (a
+        temporary zarr store, the default) or "memory".  "preview" only shows the
+        last frame in the preview layer.
+    telemetry : Telemetry
+        Per-frame timings of the acquisition pipeline (queueing, writing and
+        display), queue depth and bytes written.
+    queue_budget : int
+        Maximum number of bytes of frames waiting (in memory) to be written.  What
+        happens when it is exceeded is set by `backpressure`.
+    backpressure : str
+        What to do when the queued frames exceed `queue_budget`: "block" pauses
+        the MDA until the queue is half empty (this takes effect between events,
+        frames of a hardware sequence still arrive), "spill" queues the frames in
+        a scratch file (see `scratch_dir`) instead of memory, and "drop_display"
+        keeps queueing every frame but skips the work only needed for display
+        (viewer updates, frame statistics and mosaic) until the queue is back
+        under budget.
+    scratch_dir : str | None
+        Directory of the scratch file of the "spill" policy and of the files of
+        layers with the "memmap" storage (ideally on a fast local disk).  The
+        default temporary directory if None.
+    writer : str
+        Where frames are written to zarr stores: "thread" (the writer thread of
+        this process, the default) or "process", which hands them to
+        `writer_processes` worker processes through a ring of `writer_slots` frames
+        in shared memory, so that compression and I/O run in parallel and don't
+        compete with the viewer for the GIL.  In-memory layers and layers of
+        sequences of unknown length are always written by the writer thread.
+    writer_processes : int
+        Number of worker processes of the "process" writer.
+    writer_slots : int
+        Number of frames that may be waiting in shared memory for the "process"
+        writer (the writer thread waits when they are all in use).
+    parallel_layers : bool
+        With the "thread" writer, whether sequences with several layers (e.g. in
+        split channels mode) write each layer from its own thread, so that their
+        compression and I/O run in parallel.  The frames of a layer are still
+        written in acquisition order.
+    combine_runs : bool
+        Whether runs of consecutive frames of a batch (e.g. the planes of a
+        hardware-sequenced z-stack, which arrive in a burst) are written to zarr
+        layers with a single slice assignment, rather than frame by frame.  Only
+        frames whose index differs along a single axis, by one from a frame to the
+        next, form a run.
     """
 
     def __init__(self, mmcore: CMMCorePlus, viewer: napari.viewer.Viewer) -> None:
@@ -59,9 +180,86 @@ class _NapariMDAHandler:
         self.viewer = viewer
         self._mda_running: bool = False
 
-        # mapping of id -> (zarr.Array, temporary directory) for each layer created
-        self._tmp_arrays: dict[str, tuple[zarr.Array, tempfile.TemporaryDirectory]] = {}
+        self.follow: bool = True
+        self.dims_update_hz: float = DEFAULT_DIMS_UPDATE_HZ
+        self.memory_budget: int = DEFAULT_MEMORY_BUDGET
+        self.generator_storage: str = "zarr"
+        self.telemetry = Telemetry()
+        self.queue_budget: int = DEFAULT_QUEUE_BUDGET
+        self.backpressure: str = "block"
+        self.scratch_dir: str | None = None
+        self.writer: str = "thread"
+        self.writer_processes: int = DEFAULT_WRITER_PROCESSES
+        self.writer_slots: int = DEFAULT_WRITER_SLOTS
+        self.parallel_layers: bool = True
+        self.combine_runs: bool = True
+        # the workers writing the frames of the current MDA (see `writer`), and
+        # the threads writing each layer (by name, see `parallel_layers`) with
+        # the writes of the current batch
+        self._proc_writer: ProcessFrameWriter | None = None
+        self._layer_writers: dict[str, ThreadPoolExecutor] = {}
+        self._layer_writes: list[Future] = []
+        # True while frames are only shown in the preview layer
+        self._preview_only: bool = False
+        # latest index written for each layer since the last dims update.
+        # (None means that a frame was written but the dims shouldn't move)
+        self._pending_dims: dict[str, tuple[int, ...] | None] = {}
+        self._dims_timer = QTimer()
+        self._dims_timer.setSingleShot(True)
+        self._dims_timer.timeout.connect(self._flush_viewer_dims)
+
+        # mapping of id -> (array, temporary directory) for each layer created
+        # (the directory is None for in-memory numpy arrays and for arrays written
+        # directly to a persistent store)
+        self._tmp_arrays: dict[
+            str,
+            tuple[
+                LayerArray,
+                tempfile.TemporaryDirectory | None,
+            ],
+        ] = {}
+        # shape last shown by napari of each growable layer, by name
+        self._growable_shapes: dict[str, tuple[int, ...]] = {}
+        # bytes written to in-memory arrays in the current MDA (by layer name), and
+        # bytes held by in-memory arrays of previous MDAs (both count towards
+        # `memory_budget`). In-memory arrays are allocated lazily, so only the frames
+        # written to them take up memory: `_memory_used` keeps these bytes for each
+        # id of `_tmp_arrays` once its MDA is finished.
+        self._memory_written: dict[str, int] = {}
+        self._memory_held: int = 0
+        self._memory_used: dict[str, int] = {}
+        self._in_memory: bool = False
+
+        # downsampled levels of each multiscale layer of the current MDA, by name.
+        # They are written by `_pyramid_pool`, concurrently with the full resolution.
+        self._pyramids: dict[str, list[LayerArray]] = {}
+        # per-frame statistics of each layer, computed as the frames are written
+        self._frame_stats: dict[str, FrameStats] = {}
+        self._pyramid_pool: ThreadPoolExecutor | None = None
+        self._pyramid_future: Future | None = None
+        # optional stitched overview of the current MDA (also written by the pool)
+        self._mosaic: Mosaic | None = None
+        self._mosaic_layer: str | None = None
+        self._mosaic_dirty: bool = False
+        # FIFO of frames waiting to be written.  `_deck_cond` guards it and wakes
+        # the writer thread as soon as `_on_mda_frame` appends a new frame.
         self._deck: deque[tuple[np.ndarray, MDAEvent]] = deque()
+        self._deck_cond = threading.Condition()
+        # True while the writer thread is writing a batch it has popped off the deck
+        self._batch_in_flight: bool = False
+        # bytes of the frames queued in memory (including the batch being written),
+        # and the state of the backpressure policy (see `backpressure`)
+        self._queued_nbytes: int = 0
+        self._queue_full: bool = False
+        self._queue_warned: bool = False
+        # True while the MDA is paused by the "block" policy (rather than the user)
+        self._paused_for_queue: bool = False
+        self._scratch: ScratchFile | None = None
+
+        # drain statistics, see `drain_rate` and `write_throughput`
+        self._frames_written: int = 0
+        self._bytes_written: int = 0
+        self._write_time: float = 0.0
 
         # Add all core connections to this list.  This makes it easy to disconnect
         # from core when this widget is closed.
@@ -69,6 +267,8 @@ class _NapariMDAHandler:
             (self._mmc.mda.events.frameReady, self._on_mda_frame),
             (self._mmc.mda.events.sequenceStarted, self._on_mda_started),
             (self._mmc.mda.events.sequenceFinished, self._on_mda_finished),
+            (self._mmc.mda.events.sequencePauseToggled, self._on_pause_toggled),
+            (self.viewer.layers.events.removed, self._on_layer_removed),
         ]
         for signal, slot in self._connections:
             signal.connect(slot)
@@ -77,27 +277,147 @@ class _NapariMDAHandler:
         for signal, slot in self._connections:
             with contextlib.suppress(TypeError, RuntimeError):
                 signal.disconnect(slot)
+        self._dims_timer.stop()
+        self._pending_dims.clear()
+        # wake up the writer thread (if any) so that it can exit
+        with self._deck_cond:
+            self._mda_running = False
+            self._deck_cond.notify_all()
+        if self._pyramid_pool is not None:
+            self._pyramid_pool.shutdown(wait=False)
+            self._pyramid_pool = None
+        if self._scratch is not None:
+            self._scratch.close()
+            self._scratch = None
+        self._stop_writers()
         # Clean up temporary files we opened.
         for z, v in self._tmp_arrays.values():
-            z.store.close()
-            with contextlib.suppress(NotADirectoryError):
-                v.cleanup()
+            _free_array(z, v)
+        self._tmp_arrays.clear()
+        self._memory_used.clear()
+
+    def _on_layer_removed(self, event: Any) -> None:
+        """Free the arrays (and temporary stores) of a removed MDA layer."""
+        layer = event.value
+        data = layer.data[0] if layer.multiscale else layer.data
+        id_ = next((k for k, (a, _) in self._tmp_arrays.items() if a is data), None)
+        if id_ is None:
+            return
+        # the arrays of the running MDA are still written to (freed on cleanup)
+        if (
+            self._mda_running
+            and not self._preview_only
+            and any(t[0] == id_ for t in self._router.targets())
+        ):
+            return
+        levels = [k for k in self._tmp_arrays if k.startswith(f"{id_}/")]
+        for key in [id_, *levels]:
+            _free_array(*self._tmp_arrays.pop(key))
+        self._memory_used.pop(id_, None)
+
+    @property
+    def queue_nbytes(self) -> int:
+        """Number of bytes of frames (in memory) waiting to be written."""
+        return self._queued_nbytes
+
+    @property
+    def queue_fill(self) -> float:
+        """Fill level of the frame queue, as a fraction of `queue_budget`.
+
+        This may exceed 1 when the acquisition outpaces the writer (see
+        `backpressure`).
+        """
+        if self.queue_budget > 0:
+            return self._queued_nbytes / self.queue_budget
+        return math.inf if self._queued_nbytes else 0.0
+
+    @property
+    def drain_rate(self) -> float:
+        """Sustained rate (frames/s) at which queued frames were written to storage.
+
+        This is measured over the time actually spent writing (not waiting for new
+        frames), so it reflects the storage throughput of the current (or last)
+        sequence.  Returns 0 if nothing has been written yet.
+        """
+        if not self._write_time:
+            return 0.0
+        return self._frames_written / self._write_time
+
+    @property
+    def write_throughput(self) -> float:
+        """Sustained rate (MB/s of raw pixel data) at which frames were written.
+
+        Like `drain_rate`, this is measured over the time spent writing (and hence
+        compressing) frames.  Returns 0 if nothing has been written yet.
+        """
+        if not self._write_time:
+            return 0.0
+        return self._bytes_written / self._write_time / 1e6
+
+    def compression_ratio(self) -> float:
+        """Return the ratio of raw to stored bytes for the current (or last) MDA.
+
+        Note that this has to look up the size of every chunk in the layer stores,
+        so it should not be called in a tight loop.  Returns 0 if nothing has been
+        written yet.
+        """
+        arrays: list[Any] = []
+        for arr in self._router.arrays() if self._frames_written else []:
+            if isinstance(arr, ChunkBuffer):
+                arr = arr.array
+            arrays.extend(arr.arrays if isinstance(arr, OmeZarrLayerArray) else [arr])
+        stored = (
+            sum(self._memory_written.values())
+            + sum(nbytes_stored(z) for z in arrays if isinstance(z, zarr.Array))
+            + sum(
+                a.nbytes
+                for a in arrays
+                if isinstance(a, (np.memmap, OmeTiffLayerArray))
+            )
+        )
+        if not (stored and self._bytes_written):
+            return 0.0
+        return self._bytes_written / stored
 
     @ensure_main_thread  # type: ignore [misc]
     def _on_mda_started(self, sequence: MDASequence) -> None:
         """Create temp folder and block gui when mda starts."""
         from pymmcore_plus.mda._runner import GeneratorMDASequence
 
-        # Generator sequences have unknown shape — we can't pre-create layers.
-        # Just mark the MDA as running so _image_snapped skips preview updates.
+        self._preview_only = False
+        if self.backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Invalid backpressure {self.backpressure!r}. "
+                f"Must be one of {BACKPRESSURE_POLICIES}"
+            )
+        if self.writer not in WRITERS:
+            raise ValueError(
+                f"Invalid writer {self.writer!r}. Must be one of {WRITERS}"
+            )
         if isinstance(sequence, GeneratorMDASequence):
-            self._mda_running = True
-            self._deck = deque()
-            return
+            if self.generator_storage not in GENERATOR_STORAGES:
+                raise ValueError(
+                    f"Invalid generator_storage {self.generator_storage!r}. "
+                    f"Must be one of {GENERATOR_STORAGES}"
+                )
+            if self.generator_storage == "preview":
+                # Just mark the MDA as running so _image_snapped skips previews.
+                self._preview_only = True
+                self._mda_running = True
+                self._clear_deck()
+                return
 
         # pause acquisition until zarr layer(s) are added
         self._mmc.mda.toggle_pause()  # TODO: can we remove this somewhow?
 
+        # Generator sequences have unknown shape: their frames are written to a
+        # single layer that grows as they arrive.
+        if isinstance(sequence, GeneratorMDASequence):
+            self._create_growable_layer(sequence)
+            self._start_writer()
+            self._mmc.mda.toggle_pause()
+            return
+
         # determine the new layers that need to be created for this experiment
         # (based on the sequence mode, and whether we're splitting C/P, etc.)
         axis_labels, layers_to_create = _determine_sequence_layers(sequence)
@@ -106,79 +426,578 @@ class _NapariMDAHandler:
         if self._mmc.getNumberOfComponents() >= 3:
             yx_shape = [*yx_shape, 3]
 
-        # now create a zarr array in a temporary directory for each layer
-        for id_, shape, kwargs in layers_to_create:
-            tmp = tempfile.TemporaryDirectory()
-            dtype = f"u{self._mmc.getBytesPerPixel()}"
-            # create the zarr array and add it to the viewer
-            z = zarr.open(
-                str(tmp.name),
-                shape=shape + yx_shape,
-                dtype=dtype,
-                chunks=tuple([1] * len(shape) + yx_shape),  # VERY IMPORTANT FOR SPEED!
+        # if requested, write the layers straight to a persistent OME-Zarr store (or
+        # OME-TIFF files) instead of a temporary directory (so that nothing has to
+        # be saved twice)
+        ome_zarr_path = get_ome_zarr_path(sequence)
+        ome_tiff_path = get_ome_tiff_path(sequence)
+        compression, clevel = get_compression(sequence)
+        zarr_kwargs = compression_kwargs(
+            compression, clevel, zarr_format=3 if ZARR_V3 else 2
+        )
+        dtype = f"u{self._mmc.getBytesPerPixel()}"
+        chunking = get_chunking(sequence)
+        sharding = get_sharding(sequence)
+        if sharding and not ZARR_V3:
+            logger.warning("sharded layer stores require zarr >= 3, not sharding")
+            sharding = False
+
+        # small sequences are kept in RAM, as long as they fit in the memory budget
+        self._memory_held = 0
+        for id_, (a, _) in self._tmp_arrays.items():
+            if isinstance(a, GrowableArray):
+                a = a.array
+            if _in_ram(a):
+                self._memory_held += self._memory_used.get(id_, a.nbytes)
+        self._memory_written = {}
+        if ome_zarr_path is None and ome_tiff_path is None:
+            storage = get_storage(sequence)
+        else:  # (for the pyramid levels of OME-TIFF layers)
+            storage = "zarr"
+        if storage == "auto":
+            nbytes = estimate_nbytes(
+                [s + yx_shape for _, s, _ in layers_to_create], dtype
             )
+            fits = nbytes + self._memory_held <= self.memory_budget
+            storage = "memory" if fits else "zarr"
+        self._in_memory = storage == "memory"
+
+        # optionally, downsampled levels are written for each layer as frames arrive
+        n_levels = get_pyramid_levels(sequence)
+        self._pyramids = {}
+        self._frame_stats = {}
+        self._mosaic = self._mosaic_layer = None
+        if get_mosaic(sequence) and (positions := sequence_xy_positions(sequence)):
+            pix_size = self._mmc.getPixelSizeUm() or 1.0
+            self._mosaic = Mosaic(positions, yx_shape, pix_size, dtype)
+        if (n_levels or self._mosaic) and self._pyramid_pool is None:
+            self._pyramid_pool = ThreadPoolExecutor(1, thread_name_prefix="nmm-pyramid")
+
+        # now create an array for each layer
+        targets: dict[str, tuple[LayerArray, str]] = {}
+        for id_, shape, kwargs in layers_to_create:
+            itemsize = np.dtype(dtype).itemsize
+            chunks = chunk_shape(axis_labels[:-2], shape, yx_shape, chunking, itemsize)
+            index_chunks = chunks[: len(shape)]
+            index_shards: list[int] | None = None
+            if sharding:
+                shards = shard_shape(shape + yx_shape, chunks, len(shape), itemsize)
+                index_shards = shards[: len(shape)]
+            # (the frames of a chunk or shard are combined in memory, see ChunkBuffer)
+            combine = any(c > 1 for c in index_shards or index_chunks)
+            # create the array and add it to the viewer
+            tmp: tempfile.TemporaryDirectory | None = None
+            z: LayerArray
+            if ome_zarr_path is not None:
+                # (split into NGFF images by position, see OmeZarrLayerArray)
+                image_name = kwargs.get("ch_id", "0")
+                z = OmeZarrLayerArray(
+                    ome_zarr_path,
+                    image_name,
+                    axis_labels,
+                    shape,
+                    yx_shape,
+                    dtype,
+                    **compression_kwargs(compression, clevel, zarr_format=2),
+                )
+                names = z.image_names
+                save_path = ome_zarr_path / names[0] if len(names) == 1 else None
+                kwargs["save_path"] = str(save_path or ome_zarr_path)
+            elif ome_tiff_path is not None:
+                # (one file per layer, split into OME images by position)
+                z = OmeTiffLayerArray(
+                    ome_tiff_path,
+                    kwargs.get("ch_id", ""),
+                    axis_labels[:-2],
+                    shape,
+                    yx_shape,
+                    dtype,
+                    self._layer_scale(sequence, len(shape) + 2),
+                    [ch.config for ch in sequence.channels],
+                )
+                kwargs["save_path"] = str(z.path)
+            elif storage == "memory":
+                # np.zeros is lazily allocated: only frames written use memory
+                z = np.zeros(shape + yx_shape, dtype=dtype)
+            elif storage == "memmap":
+                z, tmp = create_temp_memmap(shape + yx_shape, dtype, self.scratch_dir)
+            else:
+                z, tmp = create_temp_zarr_array(
+                    shape + yx_shape,
+                    dtype,
+                    chunks,
+                    None if index_shards is None else index_shards + yx_shape,
+                    **zarr_kwargs,
+                )
+                if combine:
+                    z = ChunkBuffer(z, len(shape))
+            levels: list[LayerArray] = []
+            for n, level_yx in enumerate(pyramid_yx_shapes(yx_shape, n_levels), 1):
+                level_shape = shape + level_yx
+                if ome_zarr_path is not None:
+                    levels.append(
+                        OmeZarrLayerArray(
+                            ome_zarr_path,
+                            image_name,
+                            axis_labels,
+                            shape,
+                            level_yx,
+                            dtype,
+                            level=n,
+                            **compression_kwargs(compression, clevel, zarr_format=2),
+                        )
+                    )
+                elif storage == "memory":
+                    levels.append(np.zeros(level_shape, dtype=dtype))
+                elif storage == "memmap":
+                    level_mm, level_tmp = create_temp_memmap(
+                        level_shape, dtype, self.scratch_dir
+                    )
+                    levels.append(level_mm)
+                    self._tmp_arrays[f"{id_}/{n}"] = (level_mm, level_tmp)
+                else:
+                    level_z, level_tmp = create_temp_zarr_array(
+                        level_shape,
+                        dtype,
+                        index_chunks + level_yx,
+                        None if index_shards is None else index_shards + level_yx,
+                        **zarr_kwargs,
+                    )
+                    level = ChunkBuffer(level_z, len(shape)) if combine else level_z
+                    levels.append(level)
+                    self._tmp_arrays[f"{id_}/{n}"] = (level, level_tmp)
+
+            stats = FrameStats(shape, dtype)
+            kwargs["frame_stats"] = stats
+
             # get filename from MDASequence metadata
             fname = _get_file_name_from_metadata(sequence)
-            self._create_empty_image_layer(z, f"{fname}_{id_}", sequence, kwargs)
+            layer = self._create_empty_image_layer(
+                z, f"{fname}_{id_}", sequence, kwargs, levels
+            )
+            self._frame_stats[layer.name] = stats
+            if levels:
+                self._pyramids[layer.name] = levels
+            if isinstance(z, OmeZarrLayerArray):
+                z.write_metadata(layer.scale, n_levels)
 
-            # store the zarr array and temporary directory for later cleanup
+            # store the array and temporary directory for later cleanup
             self._tmp_arrays[id_] = (z, tmp)
+            targets[id_] = (z, layer.name)
+
+        # precompute the routing of events to arrays (this is the per-frame hot path)
+        self._router: _FrameRouter | _GrowableRouter = _FrameRouter(sequence, targets)
+        self._zarr_kwargs = zarr_kwargs
+        self._stop_writers()
+        # (only zarr stores can be written from other processes: the frames of a
+        # ChunkBuffer must be combined in this process)
+        if self.writer == "process" and all(
+            isinstance(a, (zarr.Array, OmeZarrLayerArray))
+            for a in self._router.arrays()
+        ):
+            self._proc_writer = ProcessFrameWriter(
+                {name: arr for _, arr, name in self._router.targets()},
+                yx_shape,
+                dtype,
+                n_slots=self.writer_slots,
+                n_processes=self.writer_processes,
+            )
+        elif self.parallel_layers and len(targets) > 1:
+            self._layer_writers = {
+                name: ThreadPoolExecutor(1, thread_name_prefix="nmm-layer-writer")
+                for _, name in targets.values()
+            }
+
+        if self._mosaic is not None:
+            fname = _get_file_name_from_metadata(sequence)
+            canvas = self._mosaic.levels
+            self._mosaic_layer = self.viewer.add_image(
+                canvas if len(canvas) > 1 else canvas[0],
+                multiscale=len(canvas) > 1,
+                name=f"{fname}_{sequence.uid}_mosaic",
+                scale=self._mosaic.scale,
+                translate=self._mosaic.translate,
+                metadata={NMM_METADATA_KEY: {"uid": sequence.uid}},
+            ).name
 
         # set axis_labels after adding the images to ensure that the dims exist
         self.viewer.dims.axis_labels = axis_labels
 
+        self._start_writer()
+
+        # Set the viewer slider on the first layer frame
+        self._reset_viewer_dims()
+
+        # resume acquisition after zarr layer(s) is(are) added
+        self._mmc.mda.toggle_pause()
+
+    def _create_growable_layer(self, sequence: MDASequence) -> None:
+        """Create a layer that grows as the frames of `sequence` are acquired."""
+        yx_shape = [self._mmc.getImageHeight(), self._mmc.getImageWidth()]
+        if self._mmc.getNumberOfComponents() >= 3:
+            yx_shape = [*yx_shape, 3]
+        dtype = f"u{self._mmc.getBytesPerPixel()}"
+        # only the first index axis is over-allocated up front
+        capacity = [INITIAL_CAPACITY] + [1] * (len(GENERATOR_AXES) - 1)
+
+        tmp: tempfile.TemporaryDirectory | None = None
+        arr: zarr.Array | np.ndarray
+        if self.generator_storage == "memory":
+            arr = np.zeros(capacity + yx_shape, dtype=dtype)
+        else:
+            chunks = [1] * len(capacity) + yx_shape
+            arr, tmp = create_temp_zarr_array(capacity + yx_shape, dtype, chunks)
+        growable = GrowableArray(arr, len(GENERATOR_AXES))
+
+        id_ = str(sequence.uid)
+        fname = _get_file_name_from_metadata(sequence)
+        layer = self._create_empty_image_layer(growable, f"{fname}_{id_}", sequence, {})
+        self._tmp_arrays[id_] = (growable, tmp)
+        self._growable_shapes[layer.name] = growable.shape
+        self._router = _GrowableRouter(growable, id_, layer.name)
+        self._in_memory = False
+        self._memory_written = {}
+        self._pyramids = {}
+        self._frame_stats = {}
+
+        axis_labels = [*GENERATOR_AXES, "y", "x"]
+        self.viewer.dims.axis_labels = axis_labels[-self.viewer.dims.ndim :]
+
+    def _start_writer(self) -> None:
+        """Start the thread writing the frames of the sequence to the layers."""
         # init index will always be less than any event index
         self._largest_idx: tuple[int, ...] = (-1,)
 
-        self._deck = deque()
+        self._clear_deck()
+        self._frames_written = 0
+        self._bytes_written = 0
+        self._write_time = 0.0
         self._mda_running = True
         self._io_t = create_worker(
             self._watch_mda,
             _start_thread=True,
-            _connect={"yielded": self._update_viewer_dims},
+            _connect={"yielded": self._schedule_viewer_dims},
         )
 
-        # Set the viewer slider on the first layer frame
-        self._reset_viewer_dims()
-
-        # resume acquisition after zarr layer(s) is(are) added
-        self._mmc.mda.toggle_pause()
-
     def _watch_mda(
         self,
-    ) -> Generator[tuple[str | None, tuple[int, ...] | None], None, None]:
-        """Watch the MDA for new frames and process them as they come in."""
-        while self._mda_running:
-            if self._deck:
-                layer_name, im_idx = self._process_frame(*self._deck.pop())
-                yield layer_name, im_idx
+    ) -> Generator[dict[str, tuple[int, ...] | None], None, None]:
+        """Watch the MDA for new frames and process them as they come in.
+
+        The writer sleeps on `_deck_cond` until frames arrive, then drains *all*
+        pending frames in one batch, in acquisition order.  It exits once the MDA
+        has finished and the deck is empty.
+
+        Yields one `{layer_name: index}` mapping per batch, holding the newest index
+        written to each layer (see `_schedule_viewer_dims`).  Batches written while
+        display work is dropped (see `backpressure`) are merged into the next one.
+        """
+        hidden: dict[str, tuple[int, ...] | None] = {}
+        while batch := self._next_batch():
+            display = not self._dropping_display()
+            try:
+                results = self._write_batch(batch, display=display)
+            finally:
+                with self._deck_cond:
+                    self._batch_in_flight = False
+                    self._deck_cond.notify_all()
+            indices = _coalesce_indices([*hidden.items(), *results])
+            if display:
+                hidden = {}
+                yield indices
             else:
-                time.sleep(0.1)
+                hidden = indices
+        if hidden:
+            yield hidden
+
+    def _dropping_display(self) -> bool:
+        """Return True if display work is skipped (see `backpressure`)."""
+        return self.backpressure == "drop_display" and self._queue_full
+
+    def _next_batch(self) -> list[tuple[np.ndarray, MDAEvent]]:
+        """Block until frames are queued, then pop all of them (oldest first).
+
+        Returns an empty list when the MDA is no longer running and nothing is left.
+        """
+        with self._deck_cond:
+            while not self._deck and self._mda_running:
+                self._deck_cond.wait()
+            batch = list(self._deck)
+            self._deck.clear()
+            self._batch_in_flight = bool(batch)
+        return batch
+
+    def _write_batch(
+        self, batch: list[tuple[np.ndarray, MDAEvent]], display: bool = True
+    ) -> list[tuple[str | None, tuple[int, ...] | None]]:
+        """Write a batch of frames in order, updating the drain statistics.
+
+        If `display` is False, the work only needed for display is skipped (see
+        `_process_frame`).
+        """
+        if self._in_memory and (
+            sum(self._memory_written.values())
+            + self._memory_held
+            + sum(image.nbytes for image, _ in batch)
+            > self.memory_budget
+        ):
+            self._spill_to_disk()
+        telemetry = self.telemetry
+        results = []
+        t0 = time.perf_counter()
+        try:
+            for run in self._frame_runs(batch):
+                telemetry.write_started(len(run))
+                if stacked := len(run) > 1:
+                    self._write_run(run)
+                for image, event in run:
+                    results.append(
+                        self._process_frame(
+                            image, event, display=display, stacked=stacked
+                        )
+                    )
+                    telemetry.write_finished(image.nbytes)
+            if self._layer_writes:
+                writes, self._layer_writes = self._layer_writes, []
+                for future in writes:
+                    future.result()
+            if self._proc_writer is not None:
+                self._proc_writer.flush()
+            # make sure that all levels of the batch are written before it is
+            # displayed (and before the frames are released)
+            if self._pyramid_future is not None:
+                self._pyramid_future.result()
+                self._pyramid_future = None
+        finally:
+            # keep the telemetry in step with the deck if a frame failed
+            if len(results) < len(batch):
+                telemetry.drop(len(batch) - len(results))
+            self._release_frames(batch)
+        self._write_time += time.perf_counter() - t0
+        self._frames_written += len(batch)
+        self._bytes_written += sum(image.nbytes for image, _ in batch)
+        return results
+
+    def _frame_runs(
+        self, batch: list[tuple[np.ndarray, MDAEvent]]
+    ) -> list[list[tuple[np.ndarray, MDAEvent]]]:
+        """Split `batch` into runs of frames that can be written at once.
+
+        A run holds consecutive frames of a zarr layer whose indices only differ
+        along one axis, each one by one from the previous frame (see
+        `combine_runs`).  The other frames are runs of a single frame.
+        """
+        router = self._router
+        if (
+            not self.combine_runs
+            or self._proc_writer is not None
+            or not isinstance(router, _FrameRouter)
+        ):
+            return [[frame] for frame in batch]
+        runs: list[list[tuple[np.ndarray, MDAEvent]]] = []
+        run_arr: Any = None
+        run_dim: int | None = None
+        prev: tuple[int, ...] = ()
+        nbytes = 0
+        for image, event in batch:
+            arr, im_idx, _ = router.route(event)
+            if arr is run_arr and nbytes + image.nbytes <= MAX_RUN_BYTES:
+                diff = [d for d, (i, j) in enumerate(zip(prev, im_idx)) if i != j]
+                if (
+                    len(diff) == 1
+                    and im_idx[diff[0]] == prev[diff[0]] + 1
+                    and run_dim in (None, diff[0])
+                    and _can_stack(arr, diff[0])
+                ):
+                    runs[-1].append((image, event))
+                    run_dim, prev = diff[0], im_idx
+                    nbytes += image.nbytes
+                    continue
+            runs.append([(image, event)])
+            run_arr = arr if isinstance(arr, (zarr.Array, OmeZarrLayerArray)) else None
+            run_dim, prev, nbytes = None, im_idx, image.nbytes
+        return runs
+
+    def _write_run(self, run: list[tuple[np.ndarray, MDAEvent]]) -> None:
+        """Write a run of frames (see `_frame_runs`) with one slice assignment."""
+        arr, start, layer_name = self._router.route(run[0][1])
+        stop = self._router.route(run[-1][1])[1]
+        dim = next(d for d, (i, j) in enumerate(zip(start, stop)) if i != j)
+        key: tuple[int | slice, ...] = (
+            *start[:dim],
+            slice(start[dim], stop[dim] + 1),
+            *start[dim + 1 :],
+        )
+        arr = cast("zarr.Array | OmeZarrLayerArray", arr)
+        frames = np.stack([image for image, _ in run])
+        if pool := self._layer_writers.get(layer_name):
+            self._layer_writes.append(pool.submit(arr.__setitem__, key, frames))
+        else:
+            arr[key] = frames
 
     def _on_mda_frame(self, image: np.ndarray, event: MDAEvent) -> None:
         """Called on the `frameReady` event from the core."""
-        # Generator-based events have no sequence; show them in the preview layer.
-        if event.sequence is None:
+        if self._preview_only:
             self._update_preview(image)
             return
-        self._deck.append((image, event))
+        over_budget = self._queued_nbytes + image.nbytes > self.queue_budget
+        if over_budget and self.backpressure == "spill":
+            image = self._scratch_file().write(image)
+        with self._deck_cond:
+            self.telemetry.enqueue(len(self._deck))
+            self._deck.append((image, event))
+            if not isinstance(image, np.memmap):
+                self._queued_nbytes += image.nbytes
+            self._deck_cond.notify()
+        if over_budget:
+            self._on_queue_full()
+
+    def _on_queue_full(self) -> None:
+        """Apply the backpressure policy when the queue exceeds its budget."""
+        # (under the lock, so that the writer can't miss a pause and never resume)
+        with self._deck_cond:
+            # the writer may have caught up in the meantime
+            over_budget = self._queued_nbytes > self.queue_budget
+            if self.backpressure != "spill" and not over_budget:
+                return
+            self._queue_full = True
+            if not self._queue_warned:
+                self._queue_warned = True
+                logger.warning(
+                    "MDA frames are queued faster than they can be written "
+                    "(%.0f MB queued), applying the %r backpressure policy",
+                    self._queued_nbytes / 1e6,
+                    self.backpressure,
+                )
+            # (an MDA already paused by the user is left to the user)
+            mda = self._mmc.mda
+            if self.backpressure == "block" and not mda.is_paused():
+                mda.toggle_pause()
+                self._paused_for_queue = mda.is_paused()
+
+    def _on_pause_toggled(self, paused: bool) -> None:
+        """Hand a paused MDA back to the user if they resume it themselves."""
+        # (the current state is checked, as the signal may be delivered late)
+        with self._deck_cond:
+            if self._paused_for_queue and not self._mmc.mda.is_paused():
+                self._paused_for_queue = False
+
+    def _release_frames(self, batch: list[tuple[np.ndarray, MDAEvent]]) -> None:
+        """Remove the written `batch` from the queue accounting."""
+        spilled = sum(isinstance(image, np.memmap) for image, _ in batch)
+        if spilled and self._scratch is not None:
+            self._scratch.release(spilled)
+        with self._deck_cond:
+            self._queued_nbytes -= sum(
+                image.nbytes for image, _ in batch if not isinstance(image, np.memmap)
+            )
+            if self._queued_nbytes <= self.queue_budget:
+                self._queue_full = False
+            # only resume an MDA that was paused by this policy, and still is
+            if (
+                self._paused_for_queue
+                and self._queued_nbytes <= self.queue_budget * RESUME_FILL
+            ):
+                self._paused_for_queue = False
+                if self._mmc.mda.is_paused():
+                    self._mmc.mda.toggle_pause()
+
+    def _flush_layers(self) -> None:
+        """Write the incomplete chunks of the layers (see `ChunkBuffer`).
+
+        This also flushes OME-TIFF layers, which completes their files.
+        """
+        for _, arr, layer_name in self._router.targets():
+            for a in [arr, *self._pyramids.get(layer_name, [])]:
+                if isinstance(a, (ChunkBuffer, OmeTiffLayerArray)):
+                    a.flush()
+
+    def _stop_writers(self) -> None:
+        """Stop the process writer and the layer writers (see `writer`)."""
+        if self._proc_writer is not None:
+            self._proc_writer.close()
+            self._proc_writer = None
+        for pool in self._layer_writers.values():
+            pool.shutdown()
+        self._layer_writers = {}
+
+    def _scratch_file(self) -> ScratchFile:
+        if self._scratch is None:
+            self._scratch = ScratchFile(self.scratch_dir)
+        return self._scratch
+
+    def _clear_deck(self) -> None:
+        """Discard the queued frames (of a previous MDA)."""
+        with self._deck_cond:
+            self.telemetry.drop(len(self._deck))
+            self._deck.clear()
+            self._queued_nbytes = 0
+            self._queue_full = self._queue_warned = self._paused_for_queue = False
+        if self._scratch is not None:
+            self._scratch.close()
+            self._scratch = None
 
     @ensure_main_thread  # type: ignore [misc]
     def _update_preview(self, data: np.ndarray) -> None:
         """Show a single frame in the preview layer."""
         try:
-            self.viewer.layers["preview"].data = data
+            set_preview_data(self.viewer.layers["preview"], data)
         except KeyError:
-            self.viewer.add_image(data, name="preview")
+            self.viewer.add_image(new_preview_buffer(data), name="preview")
 
     def _process_frame(
-        self, image: np.ndarray, event: MDAEvent
+        self,
+        image: np.ndarray,
+        event: MDAEvent,
+        display: bool = True,
+        stacked: bool = False,
     ) -> tuple[str | None, tuple[int, ...] | None]:
-        # get info about the layer we need to update
-        _id, im_idx, layer_name = _id_idx_layer(event)
+        """Write `image` to its layer and return the index to show, if any.
 
-        # update the zarr array backing the layer
-        self._tmp_arrays[_id][0][im_idx] = image
+        If `display` is False, the frame statistics and the mosaic (which are only
+        used for display) are not updated.  If `stacked` is True, `image` was
+        already written to its layer (as part of a run, see `_write_run`).
+        """
+        # get info about the layer we need to update
+        arr, im_idx, layer_name = self._router.route(event)
+
+        # update the array backing the layer
+        if stacked:
+            pass  # (written with its run, see `_write_run`)
+        elif self._proc_writer is not None:
+            self._proc_writer.write(layer_name, im_idx, image)
+        elif pool := self._layer_writers.get(layer_name):
+            # (one thread per layer: the frames of a layer are written in order)
+            self._layer_writes.append(pool.submit(arr.__setitem__, im_idx, image))
+        else:
+            arr[im_idx] = image
+        levels = self._pyramids.get(layer_name) if self._pyramids else None
+        if levels:
+            pool = cast("ThreadPoolExecutor", self._pyramid_pool)
+            self._pyramid_future = pool.submit(write_pyramid, levels, im_idx, image)
+        # the overview shows the latest frame of the first channel at each position
+        if (
+            display
+            and self._mosaic is not None
+            and event.x_pos is not None
+            and event.y_pos is not None
+            and not event.index.get("c", 0)
+        ):
+            pool = cast("ThreadPoolExecutor", self._pyramid_pool)
+            self._pyramid_future = pool.submit(
+                self._mosaic.add, image, event.x_pos, event.y_pos
+            )
+            self._mosaic_dirty = True
+        if _in_ram(arr):
+            # (the levels of in-memory layers are in memory too)
+            nbytes = image.nbytes
+            if levels:
+                n = len(im_idx)
+                nbytes += sum(math.prod(lv.shape[n:]) for lv in levels) * image.itemsize
+            written = self._memory_written
+            written[layer_name] = written.get(layer_name, 0) + nbytes
+        if display and (stats := self._frame_stats.get(layer_name)):
+            stats.record(im_idx, image)
 
         # move the viewer step to the most recently added image
         if im_idx > self._largest_idx:
@@ -187,7 +1006,79 @@ class _NapariMDAHandler:
 
         return layer_name, None
 
+    def _spill_to_disk(self) -> None:
+        """Move the in-memory arrays of the current MDA to temporary zarr stores.
+
+        This is called from the writer thread between two batches (once the levels
+        of the previous batch are written), so no frame can be written to the old
+        arrays after they have been copied.
+        """
+        if not isinstance(self._router, _FrameRouter):
+            return  # growable layers are not moved
+        for id_, arr, layer_name in self._router.targets():
+            if not _in_ram(arr):
+                continue
+            z = self._spill_array(id_, arr)
+            self._router.replace_array(id_, z)
+            if levels := self._pyramids.get(layer_name):
+                levels = [
+                    self._spill_array(f"{id_}/{n}", level) if _in_ram(level) else level
+                    for n, level in enumerate(levels, 1)
+                ]
+                self._pyramids[layer_name] = levels
+                self._set_layer_data(layer_name, [z, *levels])
+            else:
+                self._set_layer_data(layer_name, z)
+        logger.info("MDA outgrew the memory budget, moved layers to disk")
+        self._in_memory = False
+        self._memory_written = {}
+
+    @ensure_main_thread  # type: ignore [misc]
+    def _set_layer_data(self, layer_name: str, data: zarr.Array | list) -> None:
+        with contextlib.suppress(KeyError):
+            self.viewer.layers[layer_name].data = data
+
+    def _spill_array(self, key: str, arr: np.ndarray) -> zarr.Array:
+        """Copy `arr` to a temporary zarr store, kept in `_tmp_arrays[key]`."""
+        n_frames = arr.ndim - (3 if arr.shape[-1] == 3 else 2)
+        chunks = [1] * n_frames + list(arr.shape[n_frames:])
+        z, tmp = create_temp_zarr_array(
+            arr.shape, arr.dtype.str, chunks, **self._zarr_kwargs
+        )
+        # only copy the frames that were written (the rest are still zeros)
+        for idx in np.ndindex(arr.shape[:n_frames]):
+            if (frame := arr[idx]).any():
+                z[idx] = frame
+        self._tmp_arrays[key] = (z, tmp)
+        return z
+
     @ensure_main_thread  # type: ignore [misc]
+    def _schedule_viewer_dims(self, indices: dict[str, tuple[int, ...] | None]) -> None:
+        """Queue a viewer dims update, coalescing bursts of written frames.
+
+        The viewer is updated at most `dims_update_hz` times per second, with the
+        latest index of each layer written in the meantime.
+        """
+        for layer_name, im_idx in indices.items():
+            if im_idx is not None or layer_name not in self._pending_dims:
+                self._pending_dims[layer_name] = im_idx
+        if not self._dims_timer.isActive():
+            interval = 1000 / self.dims_update_hz if self.dims_update_hz > 0 else 0
+            self._dims_timer.start(int(interval))
+
+    def _flush_viewer_dims(self) -> None:
+        """Apply all pending dims updates to the viewer."""
+        pending, self._pending_dims = self._pending_dims, {}
+        if self._mosaic_dirty and self._mosaic_layer is not None:
+            self._mosaic_dirty = False
+            with contextlib.suppress(KeyError):
+                self.viewer.layers[self._mosaic_layer].refresh()
+        for layer_name, im_idx in pending.items():
+            # the layer may have been removed since the frame was written
+            with contextlib.suppress(KeyError):
+                self._update_viewer_dims((layer_name, im_idx))
+        self.telemetry.displayed()
+
     def _update_viewer_dims(
         self, args: tuple[str | None, tuple[int, ...] | None]
     ) -> None:
@@ -195,10 +1086,16 @@ class _NapariMDAHandler:
         layer_name, im_idx = args
 
         layer: Image = self.viewer.layers[layer_name]
+        self._show_grown(layer)
         if not layer.visible:
+            # the layer was created empty: set its contrast from the written frames
+            stats = self._frame_stats.get(str(layer_name))
+            if stats is not None and (data_range := stats.data_range()) is not None:
+                lo, hi = data_range
+                layer.contrast_limits = (lo, hi if hi > lo else lo + 1)
             layer.visible = True
 
-        if im_idx is None:
+        if im_idx is None or not self.follow:
             return
 
         cs = list(self.viewer.dims.current_step)
@@ -206,51 +1103,91 @@ class _NapariMDAHandler:
             cs[a] = v
         self.viewer.dims.current_step = cs
 
+    def _show_grown(self, layer: Image) -> None:
+        """Make napari pick up the new shape of `layer` if it is a growable layer."""
+        shown = self._growable_shapes.get(layer.name)
+        if shown is not None and shown != (shape := layer.data.shape):
+            self._growable_shapes[layer.name] = shape
+            layer.data = layer.data
+
+    @ensure_main_thread  # type: ignore [misc]
+    def _show_all_grown(self) -> None:
+        for name in list(self._growable_shapes):
+            with contextlib.suppress(KeyError):
+                self._show_grown(self.viewer.layers[name])
+
     @ensure_main_thread  # type: ignore [misc]
     def _reset_viewer_dims(self) -> None:
         """Reset the viewer dims to the first image."""
         self.viewer.dims.current_step = [0] * len(self.viewer.dims.current_step)
 
     def _on_mda_finished(self, sequence: MDASequence) -> None:
-        self._mda_running = False
         self._reset_viewer_dims()
-        while self._deck:
-            self._process_frame(*self._deck.pop())
+        # stop the writer, wait for the batch it may be writing, and then write
+        # whatever is still queued here (the writer may never have been scheduled)
+        with self._deck_cond:
+            self._mda_running = False
+            self._deck_cond.notify_all()
+            while self._batch_in_flight:
+                self._deck_cond.wait()
+            remaining = list(self._deck)
+            self._deck.clear()
+        if remaining:
+            results = self._write_batch(remaining, display=not self._dropping_display())
+            self._schedule_viewer_dims(_coalesce_indices(results))
+        if not self._preview_only:
+            self._flush_layers()
+        self._clear_deck()  # (closes the scratch file)
+        self._stop_writers()
+        if not self._preview_only:
+            for id_, arr, layer_name in self._router.targets():
+                if _in_ram(arr):
+                    self._memory_used[id_] = self._memory_written.get(layer_name, 0)
+        if self._growable_shapes:
+            self._show_all_grown()
+        if self._mosaic_dirty:
+            self._schedule_viewer_dims({})  # refreshes the mosaic layer
+        if self._frames_written and logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "wrote %d frames at %.1f frames/s (%.1f MB/s, compression ratio %.2f)",
+                self._frames_written,
+                self.drain_rate,
+                self.write_throughput,
+                self.compression_ratio(),
+            )
 
     def _create_empty_image_layer(
-        self, arr: zarr.Array, name: str, sequence: MDASequence, layer_meta: LayerMeta
+        self,
+        arr: LayerArray,
+        name: str,
+        sequence: MDASequence,
+        layer_meta: LayerMeta,
+        levels: list[LayerArray] | None = None,
     ) -> Image:
-        """Create new napari layer for zarr array about to be acquired.
+        """Create new napari layer for array about to be acquired.
 
         Parameters
         ----------
-        arr : zarr.Array
-            The array to create a layer for.
+        arr : LayerArray
+            The (full resolution) array to create a layer for.
         name : str
             The name of the layer.
         sequence : MDASequence
             The sequence that will be acquired.
         layer_meta
             Extra info added to `layer.metadata`.
+        levels : list[zarr.Array | np.ndarray] | None
+            Downsampled versions of `arr`. If given, a multiscale layer is created.
         """
-        # we won't have reached this point if meta is None
-        meta = sequence.metadata.get(NMM_METADATA_KEY, {})
         is_rgb = arr.shape[-1] == 3
-        scale = [1.0] * (arr.ndim - (1 if is_rgb else 0))
-
-        # add Z to layer scale
-        if (pix_size := self._mmc.getPixelSizeUm()) != 0:
-            scale[-2:] = [pix_size, pix_size]
-            if (index := sequence.used_axes.find("z")) > -1:
-                if meta.get("split_channels") and sequence.used_axes.find("c") < index:
-                    index -= 1
-                scale[index] = getattr(sequence.z_plan, "step", 1)
+        scale = self._layer_scale(sequence, arr.ndim - (1 if is_rgb else 0))
 
         layer_meta["useq_sequence"] = sequence
         layer_meta["uid"] = sequence.uid
 
         return self.viewer.add_image(
-            arr,
+            [arr, *levels] if levels else arr,
+            multiscale=bool(levels),
             name=name,
             blending="opaque",
             visible=False,
@@ -258,6 +1195,47 @@ class _NapariMDAHandler:
             metadata={NMM_METADATA_KEY: layer_meta},
         )
 
+    def _layer_scale(self, sequence: MDASequence, ndim: int) -> list[float]:
+        """Return the scale of an `ndim` (without RGB) layer of `sequence`."""
+        # we won't have reached this point if meta is None
+        meta = sequence.metadata.get(NMM_METADATA_KEY, {})
+        scale = [1.0] * ndim
+
+        # add Z to layer scale
+        if (pix_size := self._mmc.getPixelSizeUm()) != 0:
+            scale[-2:] = [pix_size, pix_size]
+            if (index := sequence.used_axes.find("z")) > -1:
+                if meta.get("split_channels") and sequence.used_axes.find("c") < index:
+                    index -= 1
+                scale[index] = getattr(sequence.z_plan, "step", 1)
+        return scale
+
+
+def _free_array(arr: LayerArray, tmp: tempfile.TemporaryDirectory | None) -> None:
+    """Close the store of `arr` and delete its temporary directory (if any)."""
+    if isinstance(arr, (GrowableArray, ChunkBuffer)):
+        arr = arr.array
+    if isinstance(arr, zarr.Array):
+        arr.store.close()
+    elif isinstance(arr, OmeTiffLayerArray):
+        arr.close()
+    if tmp is not None:
+        # (on Windows, a memory-mapped file can't be deleted while it is mapped)
+        with contextlib.suppress(NotADirectoryError, PermissionError):
+            tmp.cleanup()
+
+
+def _can_stack(arr: LayerArray, dim: int) -> bool:
+    """Return True if a stack of frames along index `dim` can be written to `arr`."""
+    if isinstance(arr, OmeZarrLayerArray):
+        return dim in arr.stack_dims
+    return isinstance(arr, zarr.Array)
+
+
+def _in_ram(arr: Any) -> TypeGuard[np.ndarray]:
+    """Return True if `arr` is held in memory (as opposed to a file or store)."""
+    return isinstance(arr, np.ndarray) and not isinstance(arr, np.memmap)
+
 
 def _has_sub_sequences(sequence: MDASequence) -> bool:
     """Return True if any stage positions have a sub sequence."""
@@ -334,6 +1312,126 @@ def _determine_sequence_layers(
     return axis_labels, _layer_info
 
 
+def _coalesce_indices(
+    results: list[tuple[str | None, tuple[int, ...] | None]],
+) -> dict[str, tuple[int, ...] | None]:
+    """Reduce `(layer_name, index)` results to the newest index for each layer."""
+    indices: dict[str, tuple[int, ...] | None] = {}
+    for layer_name, im_idx in results:
+        if layer_name is None:
+            continue
+        if im_idx is not None or layer_name not in indices:
+            indices[layer_name] = im_idx
+    return indices
+
+
+class _FrameRouter:
+    """Precomputed mapping of the events of one sequence to their target layer.
+
+    Everything that `_id_idx_layer` derives from the sequence is constant for the
+    whole sequence, so it is computed once here. Routing a frame is then reduced to
+    building the index tuple from a fixed axis order and (in split channels mode) a
+    single dict lookup.
+
+    Parameters
+    ----------
+    sequence : MDASequence
+        The sequence whose events will be routed.
+    targets : dict[str, tuple[LayerArray, str]]
+        Mapping of layer id (as returned by `_id_idx_layer`) to
+        `(array, layer_name)` for each layer created for `sequence`.
+    """
+
+    def __init__(
+        self,
+        sequence: MDASequence,
+        targets: dict[str, tuple[LayerArray, str]],
+    ) -> None:
+        self._targets = dict(targets)
+        meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+        axis_order = list(get_full_sequence_axes(sequence))
+        self._split_channels: bool = bool(meta.get("split_channels", False))
+        # (channel config, channel index) -> layer id, in split mode
+        self._channel_ids: dict[tuple[str, int], str] = {}
+        if self._split_channels:
+            axis_order.remove("c")
+            for i, ch in enumerate(sequence.channels):
+                id_ = f"{ch.config}_{i:03d}_{sequence.uid}"
+                if id_ in targets:
+                    self._channel_ids[(ch.config, i)] = id_
+        self._axes = tuple(axis_order)
+        self._default_id = str(sequence.uid)
+
+    def route(self, event: MDAEvent) -> tuple[LayerArray, tuple[int, ...], str]:
+        """Return the `(array, index, layer_name)` that `event` should be written to."""
+        index = event.index
+        im_idx = tuple([index.get(k, 0) for k in self._axes])
+        if self._split_channels and event.channel:
+            key = (event.channel.config, index.get("c", 0))
+            target = self._targets.get(self._channel_ids.get(key, ""))
+        else:
+            target = self._targets.get(self._default_id)
+        if target is None:
+            # not part of the precomputed table, fall back to the slow path
+            # (raises a KeyError if there is no layer for this event)
+            _id, im_idx, _ = _id_idx_layer(event)
+            target = self._targets[_id]
+        arr, layer_name = target
+        return arr, im_idx, layer_name
+
+    def targets(self) -> list[tuple[str, LayerArray, str]]:
+        """Return `(id, array, layer_name)` for each layer of the sequence."""
+        return [(id_, arr, name) for id_, (arr, name) in self._targets.items()]
+
+    def arrays(self) -> list[LayerArray]:
+        """Return the arrays backing the layers of the sequence."""
+        return [arr for arr, _ in self._targets.values()]
+
+    def replace_array(self, id_: str, arr: LayerArray) -> None:
+        """Route all future frames of layer `id_` to `arr`."""
+        self._targets[id_] = (arr, self._targets[id_][1])
+
+
+class _GrowableRouter:
+    """Routes the events of a sequence of unknown length to a growable array.
+
+    Events are placed by their index along `GENERATOR_AXES` (other index keys are
+    ignored).  Events without an index are appended along the first axis.
+
+    Parameters
+    ----------
+    array : GrowableArray
+        The array backing the layer of the sequence.
+    id_ : str
+        The id of the layer.
+    layer_name : str
+        The name of the layer.
+    """
+
+    def __init__(self, array: GrowableArray, id_: str, layer_name: str) -> None:
+        self._array = array
+        self._id = id_
+        self._layer_name = layer_name
+        self._appended = 0
+
+    def route(self, event: MDAEvent) -> tuple[GrowableArray, tuple[int, ...], str]:
+        """Return the `(array, index, layer_name)` that `event` should be written to."""
+        if index := event.index:
+            im_idx = tuple([index.get(k, 0) for k in GENERATOR_AXES])
+        else:
+            im_idx = (self._appended,) + (0,) * (len(GENERATOR_AXES) - 1)
+            self._appended += 1
+        return self._array, im_idx, self._layer_name
+
+    def targets(self) -> list[tuple[str, GrowableArray, str]]:
+        """Return `(id, array, layer_name)` for the layer of the sequence."""
+        return [(self._id, self._array, self._layer_name)]
+
+    def arrays(self) -> list[zarr.Array | np.ndarray]:
+        """Return the array backing the layer of the sequence."""
+        return [self._array.array]
+
+
 def _id_idx_layer(event: MDAEvent) -> tuple[str, tuple[int, ...], str]:
     """Get the tmp_path id, index, and layer name for a given event.
 
@@ -0,0 +1,123 @@
+"""Stitched overview of the stage positions of an MDA, built as frames arrive."""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, cast
+
+import numpy as np
+
+from ._pyramid import downsample
+from ._util import NMM_METADATA_KEY
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from useq import MDASequence
+
+# the downsampling factor of a mosaic is chosen to keep its canvas below this size
+MOSAIC_MAX_SIZE = 8192
+# pyramid levels are added until the smallest one is below this size
+MOSAIC_MIN_LEVEL_SIZE = 1024
+
+
+def get_mosaic(sequence: MDASequence) -> bool:
+    """Return True if a mosaic overview is requested in the sequence metadata."""
+    meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+    return bool(meta.get("mosaic", False))
+
+
+def sequence_xy_positions(sequence: MDASequence) -> list[tuple[float, float]]:
+    """Return the unique `(x, y)` stage positions visited by `sequence`.
+
+    Only the position and grid axes are iterated, so this is cheap even for long
+    time lapses.  Events without a stage position are ignored.
+    """
+    xy = sequence.replace(time_plan=None, z_plan=None, channels=())
+    positions = {(e.x_pos, e.y_pos) for e in xy}
+    return [(x, y) for x, y in positions if x is not None and y is not None]
+
+
+class Mosaic:
+    """Canvas onto which downsampled frames are placed by their stage position.
+
+    Frames are assumed to be centered on the stage position, with x and y stage
+    axes aligned with the image columns and rows.  The canvas covers all the
+    `positions`, downsampled by a power of 2 so that it is at most
+    `MOSAIC_MAX_SIZE` pixels wide.  It is followed by as many 2x downsampled
+    levels as needed to make the smallest one below `MOSAIC_MIN_LEVEL_SIZE`.
+
+    Parameters
+    ----------
+    positions : Sequence[tuple[float, float]]
+        The `(x, y)` stage positions (in µm) that will be acquired.
+    frame_shape : Sequence[int]
+        The shape of a frame (y, x and optionally RGB).
+    pixel_size : float
+        The size of a camera pixel (in µm).
+    dtype : str
+        The dtype of the frames.
+    """
+
+    def __init__(
+        self,
+        positions: Sequence[tuple[float, float]],
+        frame_shape: Sequence[int],
+        pixel_size: float,
+        dtype: str,
+    ) -> None:
+        self._frame_shape = tuple(frame_shape)
+        self._pixel_size = pixel_size
+        h_um, w_um = frame_shape[0] * pixel_size, frame_shape[1] * pixel_size
+        xs, ys = zip(*positions)
+        # stage coordinates of the top left corner of the canvas
+        self._x0 = min(xs) - w_um / 2
+        self._y0 = min(ys) - h_um / 2
+        full = (
+            math.ceil((max(ys) - min(ys) + h_um) / pixel_size),
+            math.ceil((max(xs) - min(xs) + w_um) / pixel_size),
+        )
+        self.factor = 1
+        while max(full) / self.factor > MOSAIC_MAX_SIZE:
+            self.factor *= 2
+
+        shape = [math.ceil(n / self.factor) for n in full]
+        self.levels: list[np.ndarray] = [
+            np.zeros((*shape, *frame_shape[2:]), dtype=dtype)
+        ]
+        while max(self.levels[-1].shape[:2]) > MOSAIC_MIN_LEVEL_SIZE:
+            h, w = self.levels[-1].shape[:2]
+            self.levels.append(np.zeros((h // 2, w // 2, *frame_shape[2:]), dtype))
+
+    @property
+    def scale(self) -> tuple[float, float]:
+        """The (y, x) size of a canvas pixel, in µm."""
+        s = self._pixel_size * self.factor
+        return s, s
+
+    @property
+    def translate(self) -> tuple[float, float]:
+        """The (y, x) stage coordinates of the top left corner of the canvas."""
+        return self._y0, self._x0
+
+    def add(self, image: np.ndarray, x_pos: float, y_pos: float) -> None:
+        """Place `image`, acquired at stage position `(x_pos, y_pos)`."""
+        f = self.factor
+        tile = image[::f, ::f]
+        h, w = image.shape[0] * self._pixel_size, image.shape[1] * self._pixel_size
+        row = round((y_pos - h / 2 - self._y0) / (self._pixel_size * f))
+        col = round((x_pos - w / 2 - self._x0) / (self._pixel_size * f))
+        for n, level in enumerate(self.levels):
+            if n:
+                tile = downsample(tile)
+                row, col = row // 2, col // 2
+            _paste(level, tile, row, col)
+
+
+def _paste(canvas: np.ndarray, tile: np.ndarray, row: int, col: int) -> None:
+    """Write `tile` into `canvas` at `(row, col)`, clipped to the canvas."""
+    r0, c0 = max(row, 0), max(col, 0)
+    r1 = min(row + tile.shape[0], canvas.shape[0])
+    c1 = min(col + tile.shape[1], canvas.shape[1])
+    if r1 > r0 and c1 > c0:
+        canvas[r0:r1, c0:c1] = tile[r0 - row : r1 - row, c0 - col : c1 - col]
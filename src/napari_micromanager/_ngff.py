@@ -0,0 +1,243 @@
+"""Layer data written straight to OME-Zarr (OME-NGFF 0.4) images."""
+
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+
+from ._growable import _clip_key
+from ._storage import create_ome_zarr_array, write_ome_zarr_metadata
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    import zarr
+
+# axes of an OME-NGFF 0.4 image, in the required order (at most 5 of them)
+NGFF_AXES = ("t", "c", "z", "y", "x")
+
+
+def ngff_layout(index_axes: Sequence[str], rgb: bool) -> tuple[list[str], list[str]]:
+    """Return `(split_axes, image_axes)` to store frames indexed by `index_axes`.
+
+    OME-NGFF 0.4 images have at most the axes t, c, z, y, x (in that order). The
+    other index axes (e.g. `p` and `g`) are split into separate images, and the
+    RGB components of the frames are stored along the `c` axis.
+    """
+    split = [ax for ax in index_axes if ax not in NGFF_AXES]
+    image = [ax for ax in NGFF_AXES if ax in index_axes or ax in "yx"]
+    if rgb and "c" not in image:
+        image.insert(1 if "t" in image else 0, "c")
+    return split, image
+
+
+class OmeZarrLayerArray:
+    """Layer data stored as OME-NGFF 0.4 images of one OME-Zarr store.
+
+    The array is indexed like the other layer arrays: index axes in acquisition
+    order, then y, x (and RGB).  On disk, it is split along the axes that NGFF
+    doesn't know (see `ngff_layout`) into images named `<name>_<axis><index>...`
+    (without the axes of size 1, so just `<name>` if there is nothing to split),
+    each one with `t, c, z, y, x` axes.  RGB frames are stored as 3 consecutive
+    channels.
+
+    Parameters
+    ----------
+    root : Path
+        The OME-Zarr store.
+    name : str
+        The name of the image (or the prefix of the names of the images).
+    index_axes : Sequence[str]
+        The labels of the index axes of the layer.
+    index_shape : Sequence[int]
+        The shape of the index axes of the layer.
+    frame_shape : Sequence[int]
+        The shape of a frame: (y, x) or (y, x, 3).
+    dtype : str
+        The dtype of the frames.
+    level : int
+        The resolution level of the arrays (0 must be created first).
+    **kwargs
+        Passed to `create_ome_zarr_array` (e.g. from `compression_kwargs`).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        name: str,
+        index_axes: Sequence[str],
+        index_shape: Sequence[int],
+        frame_shape: Sequence[int],
+        dtype: str,
+        level: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        self._root = root
+        self._index_axes = tuple(index_axes)
+        self._rgb = len(frame_shape) == 3
+        self._shape = (*index_shape, *frame_shape)
+        self._dtype = np.dtype(dtype)
+        self._split, self.image_axes = ngff_layout(index_axes, self._rgb)
+        sizes = dict(zip(index_axes, index_shape))
+        if self._rgb:
+            sizes["c"] = sizes.get("c", 1) * 3
+        sizes["y"], sizes["x"] = frame_shape[:2]
+        image_shape = [sizes[ax] for ax in self.image_axes]
+        # one chunk per frame (the RGB channels of a frame share a chunk)
+        chunks = [
+            sizes[ax] if ax in "yx" else (3 if ax == "c" and self._rgb else 1)
+            for ax in self.image_axes
+        ]
+
+        self._arrays: dict[tuple[int, ...], zarr.Array] = {}
+        self.image_names: list[str] = []
+        for split_idx in np.ndindex(*(sizes[ax] for ax in self._split)):
+            # (axes of size 1, e.g. a single position, don't need a suffix)
+            image_name = name + "".join(
+                f"_{ax}{i:03d}"
+                for ax, i in zip(self._split, split_idx)
+                if sizes[ax] > 1
+            )
+            self._arrays[split_idx] = create_ome_zarr_array(
+                root, image_name, image_shape, dtype, chunks, level=level, **kwargs
+            )
+            self.image_names.append(image_name)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self._shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def ndim(self) -> int:
+        return len(self._shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self._shape))
+
+    def __len__(self) -> int:
+        return self._shape[0]
+
+    @property
+    def arrays(self) -> list[zarr.Array]:
+        """The zarr arrays of the images."""
+        return list(self._arrays.values())
+
+    def write_metadata(self, scale: Sequence[float], levels: int = 0) -> None:
+        """Write the NGFF metadata of the images.
+
+        `scale` is the scale of the (level 0) layer, one value per index axis and
+        for y and x. `levels` is the number of downsampled levels.
+        """
+        scales = dict(zip([*self._index_axes, "y", "x"], scale))
+        image_scale = [scales.get(ax, 1.0) for ax in self.image_axes]
+        for image_name in self.image_names:
+            write_ome_zarr_metadata(
+                self._root, image_name, self.image_axes, image_scale, levels
+            )
+
+    @property
+    def stack_dims(self) -> list[int]:
+        """The index dimensions that `__setitem__` accepts a slice for."""
+        return [
+            i
+            for i, ax in enumerate(self._index_axes)
+            if ax not in self._split and not (ax == "c" and self._rgb)
+        ]
+
+    def __setitem__(self, index: tuple[int | slice, ...], frame: np.ndarray) -> None:
+        """Write `frame` at the (index axes) `index`.
+
+        `index` may hold a slice along one of the `stack_dims`, to write a stack of
+        frames (along the first dimension of `frame`) at once.
+        """
+        by_axis = dict(zip(self._index_axes, index))
+        key: list[int | slice] = []
+        for ax in self.image_axes[:-2]:
+            if ax == "c" and self._rgb:
+                c = cast("int", by_axis.get("c", 0))
+                key.append(slice(3 * c, 3 * c + 3))
+            else:
+                key.append(by_axis[ax])
+        if self._rgb:
+            # (the RGB components go along c, after a stack dimension before it)
+            c_dim = sum(isinstance(k, slice) for k in key[: self.image_axes.index("c")])
+            frame = np.moveaxis(frame, -1, c_dim)
+        image_idx = tuple(cast("int", by_axis[ax]) for ax in self._split)
+        self._arrays[image_idx][tuple(key)] = frame
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        key = _clip_key(key, self._shape)
+        n = len(self._index_axes)
+        by_axis: dict[str, Any] = dict(zip(self._index_axes, key[:n]))
+        frame_labels = ["y", "x", "rgb"][: self.ndim - n]
+        by_axis.update(zip(frame_labels, key[n:]))
+
+        split_keys = [by_axis[ax] for ax in self._split]
+        ranges = [_as_range(k) for k in split_keys]
+        parts: list[np.ndarray] = []
+        labels: list[str] = []
+        for split_idx in itertools.product(*ranges):
+            data, labels = self._read(self._arrays[split_idx], by_axis)
+            parts.append(data)
+        if not parts:  # (empty selection)
+            data, labels = self._read(next(iter(self._arrays.values())), by_axis)
+            parts = [data[:0]]
+        kept = [len(r) for r, k in zip(ranges, split_keys) if isinstance(k, slice)]
+        out = np.stack(parts).reshape(*kept, *parts[0].shape)
+        out_labels = [
+            ax for ax, k in zip(self._split, split_keys) if isinstance(k, slice)
+        ] + labels
+        order = [
+            ax
+            for ax in [*self._index_axes, *frame_labels]
+            if isinstance(by_axis[ax], slice)
+        ]
+        return out.transpose([out_labels.index(ax) for ax in order])
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        data = self[...]
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    def _read(
+        self, arr: zarr.Array, by_axis: dict[str, Any]
+    ) -> tuple[np.ndarray, list[str]]:
+        """Read the selection `by_axis` of one image.
+
+        Returns the data and the labels of its dimensions (in image axes order, with
+        the RGB components following the channels).
+        """
+        key: list[Any] = []
+        shape: list[int] = []
+        labels: list[str] = []
+        for ax in self.image_axes:
+            if ax == "c" and self._rgb:
+                c, rgb = by_axis.get("c", 0), by_axis["rgb"]
+                cs, rgbs = _as_range(c), _as_range(rgb)
+                key.append(np.array([3 * i + j for i in cs for j in rgbs], dtype=int))
+                for label, k, r in (("c", c, cs), ("rgb", rgb, rgbs)):
+                    if isinstance(k, slice):
+                        shape.append(len(r))
+                        labels.append(label)
+                continue
+            k = by_axis[ax]
+            key.append(k)
+            if isinstance(k, slice):
+                shape.append(len(_as_range(k)))
+                labels.append(ax)
+        data = np.asarray(arr.oindex[tuple(key)])
+        return data.reshape(shape), labels
+
+
+def _as_range(key: int | slice) -> range | list[int]:
+    """Return the indices selected by a (normalized) int or slice `key`."""
+    if isinstance(key, slice):
+        return range(key.start, key.stop, key.step)
+    return [int(key)]
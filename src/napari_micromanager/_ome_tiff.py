@@ -0,0 +1,190 @@
+"""Layer data streamed to (BigTIFF) OME-TIFF files as frames are acquired."""
+
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+
+from ._growable import _clip_key
+from ._ngff import _as_range
+from ._storage import OME_TIFF_EXTS
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+# axes of an OME-TIFF image, besides y and x (in any order)
+OME_TIFF_AXES = ("t", "c", "z")
+
+
+class OmeTiffLayerArray:
+    """Layer data stored in an OME-TIFF file, written in place as frames arrive.
+
+    The file is a BigTIFF with one OME image per index along the axes that OME
+    doesn't know (e.g. one image per position), each one with the t, c and z axes
+    of the layer (in the layer order), then y, x (and the RGB samples).  The pages
+    of all images are preallocated, uncompressed and contiguous, and the OME-XML is
+    written when the array is created: frames are then written straight to their
+    place in the file through memory maps, and the file is complete once `flush`
+    (or `close`) is called, without a second pass over the data.
+
+    Parameters
+    ----------
+    path : Path
+        The OME-TIFF file to create (overwritten if it exists).
+    name : str
+        If not empty, appended to the name of the file (before the extension), e.g.
+        the channel of a split channels layer.
+    index_axes : Sequence[str]
+        The labels of the index axes of the layer.
+    index_shape : Sequence[int]
+        The shape of the index axes of the layer.
+    frame_shape : Sequence[int]
+        The shape of a frame: (y, x) or (y, x, 3).
+    dtype : str
+        The dtype of the frames.
+    scale : Sequence[float]
+        The scale of the layer, one value per index axis and for y and x (the
+        physical sizes of the OME images).
+    channel_names : Sequence[str] | None
+        The names of the channels (ignored unless there is one per index of the c
+        axis).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        name: str,
+        index_axes: Sequence[str],
+        index_shape: Sequence[int],
+        frame_shape: Sequence[int],
+        dtype: str,
+        scale: Sequence[float],
+        channel_names: Sequence[str] | None = None,
+    ) -> None:
+        import tifffile
+
+        if name:
+            ext = next((e for e in OME_TIFF_EXTS if path.name.endswith(e)), "")
+            stem = path.name[: len(path.name) - len(ext)]
+            path = path.with_name(f"{stem}_{name}{ext}")
+        self.path = path
+        self._shape = (*index_shape, *frame_shape)
+        self._dtype = np.dtype(dtype)
+        # index dimensions split into separate images, and kept in each image
+        self._split = [i for i, ax in enumerate(index_axes) if ax not in OME_TIFF_AXES]
+        self._kept = [i for i, ax in enumerate(index_axes) if ax in OME_TIFF_AXES]
+        image_axes = [index_axes[i] for i in self._kept]
+        image_shape = (*(index_shape[i] for i in self._kept), *frame_shape)
+        rgb = len(frame_shape) == 3
+
+        scales = dict(zip([*index_axes, "y", "x"], scale))
+        metadata: dict[str, Any] = {
+            "axes": "".join(image_axes).upper() + ("YXS" if rgb else "YX"),
+            "PhysicalSizeX": scales["x"],
+            "PhysicalSizeY": scales["y"],
+        }
+        if "z" in scales:
+            metadata["PhysicalSizeZ"] = scales["z"]
+        sizes = dict(zip(index_axes, index_shape))
+        if channel_names and len(channel_names) == sizes.get("c"):
+            metadata["Channel"] = {"Name": list(channel_names)}
+
+        split_shape = [index_shape[i] for i in self._split]
+        offsets: dict[tuple[int, ...], int] = {}
+        with tifffile.TiffWriter(path, bigtiff=True, ome=True) as tif:
+            for split_idx in np.ndindex(*split_shape):
+                # (axes of size 1, e.g. a single position, don't need a suffix)
+                image_name = "_".join(
+                    f"{index_axes[i]}{j:03d}"
+                    for i, j in zip(self._split, split_idx)
+                    if index_shape[i] > 1
+                )
+                # (without data, the pages are only allocated)
+                offset, _ = cast(
+                    "tuple[int, int]",
+                    tif.write(
+                        shape=image_shape,
+                        dtype=self._dtype,
+                        photometric="rgb" if rgb else "minisblack",
+                        metadata={**metadata, "Name": image_name or path.name},
+                        returnoffset=True,
+                    ),
+                )
+                offsets[split_idx] = offset
+        self._images: dict[tuple[int, ...], np.memmap] = {
+            split_idx: np.memmap(
+                path, self._dtype, mode="r+", offset=offset, shape=image_shape
+            )
+            for split_idx, offset in offsets.items()
+        }
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self._shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def ndim(self) -> int:
+        return len(self._shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self._shape))
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self._dtype.itemsize
+
+    def __len__(self) -> int:
+        return self._shape[0]
+
+    def flush(self) -> None:
+        """Write the frames still held in the page cache to the file."""
+        for image in self._images.values():
+            image.flush()
+
+    def close(self) -> None:
+        """Flush the frames and unmap the file (the array can't be used anymore)."""
+        self.flush()
+        self._images.clear()
+
+    def __setitem__(self, index: tuple[int, ...], frame: np.ndarray) -> None:
+        """Write `frame` at the (index axes) `index`."""
+        split_idx = tuple(index[i] for i in self._split)
+        self._images[split_idx][tuple(index[i] for i in self._kept)] = frame
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        key = _clip_key(key, self._shape)
+        if not self._split:
+            return np.asarray(self._images[()][key])
+
+        split_keys = [key[i] for i in self._split]
+        image_key = tuple(k for i, k in enumerate(key) if i not in self._split)
+        ranges = [_as_range(k) for k in split_keys]
+        kept = [len(r) for r, k in zip(ranges, split_keys) if isinstance(k, slice)]
+        parts = [
+            np.asarray(self._images[split_idx][image_key])
+            for split_idx in itertools.product(*ranges)
+        ]
+        if parts:
+            out = np.stack(parts).reshape(*kept, *parts[0].shape)
+        else:  # (empty selection)
+            part = np.asarray(next(iter(self._images.values()))[image_key])
+            out = np.empty((*kept, *part.shape), dtype=self._dtype)
+        # the dimensions of `out` are the sliced split ones, then the other ones
+        dims = [i for i in self._split if isinstance(key[i], slice)] + [
+            i
+            for i, k in enumerate(key)
+            if i not in self._split and isinstance(k, slice)
+        ]
+        return out.transpose(np.argsort(dims))
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        data = self[...]
+        return data if dtype is None else data.astype(dtype, copy=False)
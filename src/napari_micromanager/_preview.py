@@ -0,0 +1,55 @@
+"""Helpers to update the preview layer in place instead of replacing its data."""
+
+from __future__ import annotations
+
+import weakref
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import napari.layers
+
+# buffers allocated by `new_preview_buffer`, which are safe to overwrite (frames
+# received from the core may still be referenced elsewhere)
+_BUFFERS: weakref.WeakValueDictionary[int, np.ndarray] = weakref.WeakValueDictionary()
+
+
+def new_preview_buffer(data: np.ndarray) -> np.ndarray:
+    """Return a new buffer holding a copy of `data`, to be used as preview data."""
+    buf = np.empty_like(data)
+    np.copyto(buf, data)
+    _BUFFERS[id(buf)] = buf
+    return buf
+
+
+def set_preview_data(layer: napari.layers.Image, data: np.ndarray) -> None:
+    """Show `data` in the preview `layer`.
+
+    If the layer is backed by a buffer from `new_preview_buffer` with the shape and
+    dtype of `data`, the frame is copied into it and only the displayed slice is
+    refreshed. Otherwise (first frame, or the camera ROI, binning or bit depth
+    changed), the layer data is replaced by a new buffer.
+    """
+    buf = layer.data
+    if (
+        isinstance(buf, np.ndarray)
+        and buf.shape == data.shape
+        and buf.dtype == data.dtype
+        and _BUFFERS.get(id(buf)) is buf
+    ):
+        np.copyto(buf, data)
+        _refresh_data(layer)
+    else:
+        layer.data = new_preview_buffer(data)
+
+
+def _refresh_data(layer: napari.layers.Image) -> None:
+    # what napari does when the data is replaced, minus the data setup and the
+    # thumbnail, which are updated by a full `refresh()` when live mode stops.
+    if getattr(layer, "auto_contrast", False):
+        layer.reset_contrast_limits()
+    try:
+        layer.refresh(thumbnail=False, highlight=False, extent=False)
+    except TypeError:  # napari < 0.5
+        layer.refresh()
@@ -0,0 +1,169 @@
+"""Frame writer running in worker processes, fed through shared memory."""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import queue
+import traceback
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+# time (s) to wait for a worker to acknowledge a frame before checking it is alive
+_POLL_TIMEOUT = 1.0
+# time (s) given to the workers to exit on `close`, before they are terminated
+_JOIN_TIMEOUT = 5.0
+
+
+class ProcessFrameWriter:
+    """Write frames to file-backed layer arrays from worker processes.
+
+    Frames are copied into a ring of preallocated slots in shared memory, so only
+    `(slot, target, index)` tuples cross the process boundary.  The workers write
+    the frame of a slot to its target array (compressing it on the way, outside of
+    the GIL of this process) and then hand the slot back.  `write` blocks while all
+    slots are in use, and `flush` waits until every frame written so far is stored.
+
+    Frames written to different chunks may be stored in any order: the targets
+    should have one chunk per frame.  Frames must be written from a single thread.
+
+    Parameters
+    ----------
+    targets : Mapping[str, Any]
+        The arrays to write to, by name.  They must be picklable and backed by
+        files (e.g. zarr arrays in a local store), as each worker opens them again.
+    frame_shape : Sequence[int]
+        The shape of a frame.
+    dtype : str
+        The dtype of the frames.
+    n_slots : int
+        Number of frames that may be waiting to be written at once.
+    n_processes : int
+        Number of worker processes.
+    """
+
+    def __init__(
+        self,
+        targets: Mapping[str, Any],
+        frame_shape: Sequence[int],
+        dtype: str,
+        n_slots: int = 32,
+        n_processes: int = 2,
+    ) -> None:
+        if n_slots < 1 or n_processes < 1:
+            raise ValueError("n_slots and n_processes must be at least 1")
+        nbytes = math.prod(frame_shape) * np.dtype(dtype).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=n_slots * nbytes)
+        self._slots: np.ndarray = np.ndarray(
+            (n_slots, *frame_shape), dtype=dtype, buffer=self._shm.buf
+        )
+        self._free = list(range(n_slots))
+        self._in_flight = 0
+        self._errors: list[str] = []
+
+        # (forking a process running Qt is unsafe)
+        ctx = multiprocessing.get_context("spawn")
+        self._tasks: multiprocessing.Queue = ctx.Queue()
+        self._done: multiprocessing.Queue = ctx.Queue()
+        args = (self._shm.name, self._slots.shape, dtype, dict(targets))
+        self._procs = [
+            ctx.Process(
+                target=_serve,
+                args=(*args, self._tasks, self._done),
+                name=f"nmm-writer-{i}",
+                daemon=True,
+            )
+            for i in range(n_processes)
+        ]
+        for proc in self._procs:
+            proc.start()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of frames handed to the workers and not stored yet."""
+        return self._in_flight
+
+    def write(self, target: str, index: tuple[int, ...], frame: np.ndarray) -> None:
+        """Queue `frame` to be written at `index` of the array named `target`."""
+        while not self._free:
+            self._collect()
+        slot = self._free.pop()
+        self._slots[slot] = frame
+        self._tasks.put((slot, target, index))
+        self._in_flight += 1
+
+    def flush(self) -> None:
+        """Wait until all frames are stored.
+
+        Raises a RuntimeError if a frame could not be written (the other frames
+        are still written).
+        """
+        while self._in_flight:
+            self._collect()
+        if self._errors:
+            errors, self._errors = self._errors, []
+            raise RuntimeError(
+                f"{len(errors)} frame(s) could not be written:\n{errors[0]}"
+            )
+
+    def close(self) -> None:
+        """Stop the workers (once the queued frames are written) and free the ring."""
+        for _ in self._procs:
+            self._tasks.put(None)
+        for proc in self._procs:
+            proc.join(_JOIN_TIMEOUT)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        self._procs = []
+        for q in (self._tasks, self._done):
+            q.close()
+            q.join_thread()
+        # (the buffer can't be released while it is exported to an array)
+        self._slots = np.empty(0)
+        self._shm.close()
+        self._shm.unlink()
+
+    def _collect(self) -> None:
+        """Wait for one frame to be stored and free its slot."""
+        while True:
+            try:
+                slot, error = self._done.get(timeout=_POLL_TIMEOUT)
+                break
+            except queue.Empty:
+                if not all(proc.is_alive() for proc in self._procs):
+                    raise RuntimeError("a frame writer process exited") from None
+        self._in_flight -= 1
+        self._free.append(slot)
+        if error is not None:
+            self._errors.append(error)
+
+
+def _serve(
+    shm_name: str,
+    shape: tuple[int, ...],
+    dtype: str,
+    targets: dict[str, Any],
+    tasks: multiprocessing.Queue,
+    done: multiprocessing.Queue,
+) -> None:
+    """Write the frames of the slots listed in `tasks` until None is received."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    try:
+        while (task := tasks.get()) is not None:
+            slot, target, index = task
+            try:
+                targets[target][index] = slots[slot]
+            except Exception:
+                done.put((slot, traceback.format_exc()))
+            else:
+                done.put((slot, None))
+    finally:
+        del slots
+        shm.close()
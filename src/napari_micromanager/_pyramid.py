@@ -0,0 +1,62 @@
+"""Helpers to build multiscale (pyramid) versions of frames as they are acquired."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+
+from ._util import NMM_METADATA_KEY
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from useq import MDASequence
+
+# a pyramid has at most this many levels *below* the full resolution level
+MAX_PYRAMID_LEVELS = 3
+
+
+def get_pyramid_levels(sequence: MDASequence) -> int:
+    """Return the number of downsampled levels requested in the sequence metadata.
+
+    The value of the "pyramid_levels" key is clipped to `[0, MAX_PYRAMID_LEVELS]`,
+    0 (the default) meaning no pyramid.
+    """
+    meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+    return max(0, min(int(meta.get("pyramid_levels", 0)), MAX_PYRAMID_LEVELS))
+
+
+def pyramid_yx_shapes(yx_shape: Sequence[int], levels: int) -> list[list[int]]:
+    """Return the frame shapes of the `levels` downsampled levels of `yx_shape`.
+
+    Each level is half the size of the previous one in y and x (any trailing RGB
+    dimension is kept).
+    """
+    shapes = []
+    for level in range(1, levels + 1):
+        f = 2**level
+        shapes.append([yx_shape[0] // f, yx_shape[1] // f, *yx_shape[2:]])
+    return shapes
+
+
+def downsample(image: np.ndarray) -> np.ndarray:
+    """Return `image` downsampled by 2 in y and x, using a 2x2 block mean.
+
+    Odd trailing rows/columns are dropped.  Dimensions after the first two (e.g.
+    RGB) are kept.
+    """
+    h, w = image.shape[0] // 2, image.shape[1] // 2
+    blocks = image[: h * 2, : w * 2].reshape(h, 2, w, 2, *image.shape[2:])
+    return cast("np.ndarray", blocks.mean(axis=(1, 3), dtype=np.float32)).astype(
+        image.dtype, copy=False
+    )
+
+
+def write_pyramid(
+    levels: Sequence[Any], index: tuple[int, ...], image: np.ndarray
+) -> None:
+    """Write downsampled versions of `image` at `index` in each array of `levels`."""
+    for level in levels:
+        image = downsample(image)
+        level[index] = image
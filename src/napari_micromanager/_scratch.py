@@ -0,0 +1,61 @@
+"""Scratch file holding queued frames that don't fit in memory."""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+
+import numpy as np
+
+
+class ScratchFile:
+    """Anonymous temporary file that queued frames are spilled to.
+
+    `write` appends a frame to the file and returns a read-only memory map of it,
+    which can be queued in place of the frame.  Once every spilled frame has been
+    `release`d, the next frame is written at the start of the file again, so that
+    the file never grows beyond the largest backlog.
+
+    Frames must be written from a single thread, but may be released from another.
+
+    Parameters
+    ----------
+    directory : str | None
+        Directory of the file (ideally on a fast local disk). The default
+        temporary directory if None.
+    """
+
+    def __init__(self, directory: str | None = None) -> None:
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._offset = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of frames written and not released yet."""
+        return self._pending
+
+    def write(self, frame: np.ndarray) -> np.memmap:
+        """Append `frame` to the file and return a memory map of it."""
+        with self._lock:
+            if not self._pending:
+                self._offset = 0
+            self._pending += 1
+            offset = self._offset
+            self._offset += frame.nbytes
+        self._file.seek(offset)
+        self._file.write(np.ascontiguousarray(frame).data)
+        self._file.flush()
+        return np.memmap(
+            self._file, dtype=frame.dtype, mode="r", offset=offset, shape=frame.shape
+        )
+
+    def release(self, n: int = 1) -> None:
+        """Mark `n` spilled frames as no longer needed."""
+        with self._lock:
+            self._pending = max(self._pending - n, 0)
+
+    def close(self) -> None:
+        """Close (and delete) the file."""
+        self._file.close()
@@ -0,0 +1,412 @@
+"""Helpers for the zarr stores backing the layers of an MDA."""
+
+from __future__ import annotations
+
+import glob
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, cast
+
+import numcodecs
+import numpy as np
+import zarr
+
+from ._util import NMM_METADATA_KEY, PYMMCW_METADATA_KEY, ensure_unique
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from typing_extensions import TypeAlias
+    from useq import MDASequence
+
+    # the Blosc compressors in COMPRESSIONS
+    BloscCname: TypeAlias = Literal["lz4", "zstd"]
+
+OME_ZARR_EXT = ".ome.zarr"
+OME_TIFF_EXTS = (".ome.tif", ".ome.tiff")
+# zarr-python >= 3 writes zarr v3 by default. We write OME-Zarr as zarr v2
+# (OME-NGFF 0.4) so that it can be read by the widest range of tools.
+ZARR_V3 = int(zarr.__version__.split(".")[0]) >= 3
+_V2_KWARGS: dict[str, Any] = {"zarr_format": 2} if ZARR_V3 else {}
+
+# available values for the "compression" key of the napari-micromanager metadata.
+# (Blosc with byte shuffle and the given compressor, or no compression at all)
+COMPRESSIONS = ("lz4", "zstd", "none")
+DEFAULT_CLEVEL = 5
+
+# available values for the "storage" key of the napari-micromanager metadata.
+# "memory" keeps the layers in preallocated numpy arrays, "zarr" in temporary zarr
+# stores, "memmap" in preallocated raw files mapped in memory (uncompressed, for the
+# highest throughput, see `_export` to save them), and "auto" picks "memory" if the
+# sequence fits in the memory budget.
+STORAGES = ("auto", "memory", "zarr", "memmap")
+DEFAULT_MEMORY_BUDGET = 512 * 2**20  # bytes
+
+# available values for the "disk_format" key of the napari-micromanager metadata:
+# the format of the layers written directly to disk (see `direct_to_disk`).
+# "ome-tiff" layers are uncompressed, but streamed to their final file.
+DISK_FORMATS = ("ome-zarr", "ome-tiff")
+
+# available values for the "chunking" key of the napari-micromanager metadata.
+# "frame" stores each frame in its own chunk (fastest writes and single frame
+# reads, but one file per frame), "stack" stores the frames along the innermost
+# acquired axis (e.g. a z-stack) together (fewer, larger files and fast reads
+# along that axis, but frames are buffered until their chunk is complete), and
+# "auto" picks "stack" if z is the innermost axis.
+CHUNKINGS = ("frame", "stack", "auto")
+# maximum size of a chunk of several frames
+MAX_CHUNK_BYTES = 64 * 2**20
+# maximum size of a shard, when the "sharding" option is set (zarr v3 only). A
+# shard is one file holding many chunks, which are still read one at a time.
+MAX_SHARD_BYTES = 256 * 2**20
+
+# OME-NGFF axis types for the axis labels used by napari-micromanager
+_AXIS_TYPES = {"t": "time", "c": "channel", "z": "space", "y": "space", "x": "space"}
+
+
+def get_ome_zarr_path(sequence: MDASequence) -> Path | None:
+    """Return the OME-Zarr path the layers of `sequence` should be written to.
+
+    Returns None unless the `direct_to_disk` option is set in the napari-micromanager
+    metadata *and* the sequence metadata holds a `save_dir` and `save_name` (and
+    the "ome-zarr" `disk_format` is used). If the path already exists, a counter is
+    appended to the name so that no data is ever overwritten.
+    """
+    if (save := _direct_save_info(sequence, "ome-zarr")) is None:
+        return None
+    save_dir, stem = save
+    path = save_dir / f"{stem}{OME_ZARR_EXT}"
+    if path.exists():
+        path = ensure_unique(path.with_name(stem), extension=OME_ZARR_EXT)
+    return path
+
+
+def get_ome_tiff_path(sequence: MDASequence) -> Path | None:
+    """Return the OME-TIFF path the layers of `sequence` should be written to.
+
+    Like `get_ome_zarr_path`, for the "ome-tiff" `disk_format`. The layers of a
+    sequence may be written to several files named after this path (see
+    `OmeTiffLayerArray`), so a counter is appended to the name if any of them
+    exists.
+    """
+    if (save := _direct_save_info(sequence, "ome-tiff")) is None:
+        return None
+    save_dir, stem = save
+    ext = OME_TIFF_EXTS[0]
+    name, n = stem, 0
+    while (save_dir / f"{name}{ext}").exists() or any(
+        save_dir.glob(f"{glob.escape(name)}_*{ext}")
+    ):
+        name, n = f"{stem}_{n:03d}", n + 1
+    return save_dir / f"{name}{ext}"
+
+
+def get_disk_format(sequence: MDASequence) -> str:
+    """Return the format of the layers written directly to disk."""
+    meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+    disk_format = str(meta.get("disk_format", "ome-zarr"))
+    if disk_format not in DISK_FORMATS:
+        raise ValueError(
+            f"Invalid disk format {disk_format!r}. Must be one of {DISK_FORMATS}"
+        )
+    return disk_format
+
+
+def _direct_save_info(
+    sequence: MDASequence, disk_format: str
+) -> tuple[Path, str] | None:
+    """Return `(save_dir, stem)` if layers are written to disk in `disk_format`."""
+    nmm_meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+    meta = cast("dict", sequence.metadata.get(PYMMCW_METADATA_KEY, {}))
+    if not (
+        nmm_meta.get("direct_to_disk")
+        and get_disk_format(sequence) == disk_format
+        and (save_dir := meta.get("save_dir"))
+        and (save_name := meta.get("save_name"))
+    ):
+        return None
+
+    stem = str(save_name)
+    # strip any known image extension (e.g. from the pymmcore-widgets save widget)
+    for ext in (OME_ZARR_EXT, *OME_TIFF_EXTS, ".zarr", ".tiff", ".tif"):
+        if stem.endswith(ext):
+            stem = stem[: -len(ext)]
+            break
+    return Path(save_dir).expanduser(), stem
+
+
+def get_compression(sequence: MDASequence) -> tuple[str | None, int]:
+    """Return the `(compression, clevel)` requested in the sequence metadata.
+
+    `compression` is None if no compression was requested (use the zarr defaults).
+    """
+    meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+    compression = meta.get("compression")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(
+            f"Invalid compression {compression!r}. Must be one of {COMPRESSIONS}"
+        )
+    return compression, int(meta.get("compression_level", DEFAULT_CLEVEL))
+
+
+def get_storage(sequence: MDASequence) -> str:
+    """Return the storage backend requested in the sequence metadata."""
+    meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+    storage = str(meta.get("storage", "auto"))
+    if storage not in STORAGES:
+        raise ValueError(f"Invalid storage {storage!r}. Must be one of {STORAGES}")
+    return storage
+
+
+def get_chunking(sequence: MDASequence) -> str:
+    """Return the chunking policy requested in the sequence metadata."""
+    meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+    chunking = str(meta.get("chunking", "frame"))
+    if chunking not in CHUNKINGS:
+        raise ValueError(f"Invalid chunking {chunking!r}. Must be one of {CHUNKINGS}")
+    return chunking
+
+
+def chunk_shape(
+    index_axes: Sequence[str],
+    index_shape: Sequence[int],
+    frame_shape: Sequence[int],
+    chunking: str,
+    itemsize: int,
+) -> list[int]:
+    """Return the chunks of a layer with `index_axes` (in acquisition order).
+
+    See `CHUNKINGS` for the `chunking` policies. Chunks of several frames along the
+    innermost (last) index axis are limited to `MAX_CHUNK_BYTES`.
+    """
+    chunks = [1] * len(index_shape) + list(frame_shape)
+    if chunking == "auto":
+        chunking = "stack" if index_axes and index_axes[-1] == "z" else "frame"
+    if chunking == "stack" and index_shape:
+        frame_nbytes = math.prod(frame_shape) * itemsize
+        n = max(MAX_CHUNK_BYTES // frame_nbytes, 1)
+        chunks[len(index_shape) - 1] = min(index_shape[-1], n)
+    return chunks
+
+
+def get_sharding(sequence: MDASequence) -> bool:
+    """Return True if sharded layer stores are requested in the sequence metadata."""
+    meta = cast("dict", sequence.metadata.get(NMM_METADATA_KEY, {}))
+    return bool(meta.get("sharding", False))
+
+
+def shard_shape(
+    shape: Sequence[int], chunks: Sequence[int], n_index: int, itemsize: int
+) -> list[int]:
+    """Return the shards of an array of `shape` and `chunks` (with `n_index` axes).
+
+    Shards hold whole chunks along the index axes, from the innermost (last) axis
+    outwards, up to `MAX_SHARD_BYTES`.
+    """
+    shards = list(chunks)
+    nbytes = math.prod(chunks) * itemsize
+    for ax in reversed(range(n_index)):
+        n = min(-(-shape[ax] // chunks[ax]), max(MAX_SHARD_BYTES // nbytes, 1))
+        shards[ax] *= n
+        nbytes *= n
+        if shards[ax] < shape[ax]:
+            break
+    return shards
+
+
+def estimate_nbytes(shapes: Sequence[Sequence[int]], dtype: str) -> int:
+    """Return the number of bytes needed to hold arrays of `shapes` and `dtype`."""
+    itemsize = np.dtype(dtype).itemsize
+    return sum(math.prod(shape) for shape in shapes) * itemsize
+
+
+def create_temp_zarr_array(
+    shape: Sequence[int],
+    dtype: str,
+    chunks: Sequence[int],
+    shards: Sequence[int] | None = None,
+    **kwargs: Any,
+) -> tuple[zarr.Array, tempfile.TemporaryDirectory]:
+    """Create a zarr array in a new temporary directory.
+
+    Returns the array and the temporary directory, which the caller must clean up.
+    If `shards` is given, the chunks are stored in shards of that shape (zarr v3
+    only, see `shard_shape`). Extra `kwargs` are passed to `zarr.open_array` (e.g.
+    from `compression_kwargs`).
+    """
+    if shards is not None:
+        from zarr.codecs import BytesCodec, ShardingCodec
+
+        inner = kwargs.pop("codecs", None) or [BytesCodec()]
+        kwargs["codecs"] = [ShardingCodec(chunk_shape=tuple(chunks), codecs=inner)]
+        chunks = shards
+    tmp = tempfile.TemporaryDirectory()
+    z = zarr.open_array(
+        str(tmp.name),
+        mode="w",
+        shape=tuple(shape),
+        dtype=dtype,
+        chunks=tuple(chunks),
+        **kwargs,
+    )
+    return z, tmp
+
+
+def create_temp_memmap(
+    shape: Sequence[int], dtype: str, directory: str | None = None
+) -> tuple[np.memmap, tempfile.TemporaryDirectory]:
+    """Create a memory-mapped raw array file in a new temporary directory.
+
+    Returns the array and the temporary directory, which the caller must clean up.
+    The file is created at its full size, but it is sparse on most filesystems (the
+    frames not written yet don't take up disk space).
+    """
+    tmp = tempfile.TemporaryDirectory(dir=directory)
+    arr = np.memmap(
+        Path(tmp.name) / "data.raw", dtype=dtype, mode="w+", shape=tuple(shape)
+    )
+    return arr, tmp
+
+
+def compression_kwargs(
+    compression: str | None, clevel: int = DEFAULT_CLEVEL, *, zarr_format: int = 3
+) -> dict[str, Any]:
+    """Return the kwargs for `zarr.open` that set up the requested compression.
+
+    Blosc is configured to use all cores (even though the frames are written from
+    a worker thread), so that compression doesn't become the bottleneck. Note that
+    this changes the Blosc threading settings of the whole process (see
+    `_use_blosc_threads`).
+    """
+    if compression is None:
+        return {}
+    if compression != "none":
+        _use_blosc_threads()
+
+    if ZARR_V3 and zarr_format == 3:
+        from zarr.codecs import BloscCodec, BytesCodec
+
+        codecs: list[Any] = [BytesCodec()]
+        if compression != "none":
+            codecs.append(
+                BloscCodec(
+                    cname=cast("BloscCname", compression),
+                    clevel=clevel,
+                    shuffle="shuffle",
+                )
+            )
+        return {"codecs": codecs}
+
+    if compression == "none":
+        return {"compressor": None}
+    return {
+        "compressor": numcodecs.Blosc(
+            cname=compression, clevel=clevel, shuffle=numcodecs.Blosc.SHUFFLE
+        )
+    }
+
+
+def _use_blosc_threads() -> None:
+    # by default, blosc only uses threads when called from the main thread.
+    # NOTE: these are process-global numcodecs settings: they also apply to any
+    # other Blosc (de)compression in the process (e.g. by other plugins), and they
+    # are not restored afterwards.
+    numcodecs.blosc.use_threads = True
+    numcodecs.blosc.set_nthreads(min(os.cpu_count() or 1, 8))
+
+
+def nbytes_stored(arr: zarr.Array) -> int:
+    """Return the number of bytes that `arr` takes up in its store."""
+    stored = arr.nbytes_stored
+    return int(stored() if callable(stored) else stored)
+
+
+def create_ome_zarr_array(
+    root: Path,
+    name: str,
+    shape: Sequence[int],
+    dtype: str,
+    chunks: Sequence[int],
+    level: int = 0,
+    **kwargs: Any,
+) -> zarr.Array:
+    """Create the array of resolution `level` for image `name` in OME-Zarr `root`.
+
+    The array is stored at `<root>/<name>/<level>`, the full resolution level (0)
+    must be created first. Call `write_ome_zarr_metadata` once the axes and scale
+    are known to make the image readable by OME-Zarr readers. Extra `kwargs` are
+    passed to `zarr.open_array` (e.g. from `compression_kwargs`).
+    """
+    if level == 0:
+        zarr.open_group(str(root), mode="a", **_V2_KWARGS)
+        zarr.open_group(str(root / name), mode="w", **_V2_KWARGS)
+    return zarr.open_array(
+        str(root / name / str(level)),
+        mode="w",
+        shape=tuple(shape),
+        dtype=dtype,
+        chunks=tuple(chunks),
+        **_V2_KWARGS,
+        **kwargs,
+    )
+
+
+def write_ome_zarr_metadata(
+    root: Path,
+    name: str,
+    axis_labels: Sequence[str],
+    scale: Sequence[float],
+    levels: int = 0,
+) -> None:
+    """Write OME-NGFF (0.4) `multiscales` metadata for image `name` in `root`.
+
+    `axis_labels` and `scale` (of the full resolution level) must have one entry
+    per dimension of the array. The axes must be a subset of `t, c, z, y, x`, in
+    that order, ending with `y, x` (see `_ngff.ngff_layout`). `levels` is the
+    number of downsampled levels, each one being half the size of the previous
+    one in y and x.
+    """
+    order = [ax for ax in "tczyx" if ax in axis_labels]
+    if list(axis_labels) != order or order[-2:] != ["y", "x"]:
+        raise ValueError(
+            f"Invalid OME-NGFF 0.4 axes {list(axis_labels)}: must be a subset of "
+            "t, c, z, y, x in this order, ending with y, x."
+        )
+    axes: list[dict[str, str]] = []
+    for label in axis_labels:
+        axis = {"name": label}
+        if typ := _AXIS_TYPES.get(label):
+            axis["type"] = typ
+        if label in "zyx":
+            axis["unit"] = "micrometer"
+        axes.append(axis)
+
+    group = zarr.open_group(str(root / name), mode="a", **_V2_KWARGS)
+    group.attrs["multiscales"] = [
+        {
+            "version": "0.4",
+            "name": name,
+            "axes": axes,
+            "datasets": [
+                {
+                    "path": str(level),
+                    "coordinateTransformations": [
+                        {
+                            "type": "scale",
+                            "scale": _level_scale(axis_labels, scale, level),
+                        }
+                    ],
+                }
+                for level in range(levels + 1)
+            ],
+        }
+    ]
+
+
+def _level_scale(
+    axis_labels: Sequence[str], scale: Sequence[float], level: int
+) -> list[float]:
+    f = 2**level
+    return [float(s) * (f if ax in "yx" else 1) for ax, s in zip(axis_labels, scale)]
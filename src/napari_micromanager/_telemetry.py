@@ -0,0 +1,249 @@
+"""Cheap per-frame timings of the MDA pipeline, kept in a fixed-size ring buffer."""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+DEFAULT_CAPACITY = 2**16
+# frames written later than this (in seconds) after they were received are "late"
+DEFAULT_LATE_AFTER = 1.0
+
+# one record per frame. Times are `time.perf_counter()` values (NaN if not reached)
+RECORD_DTYPE = np.dtype(
+    [
+        ("frame", np.int64),  # number of the frame since the telemetry was created
+        ("enqueued", np.float64),  # frameReady received, frame queued for writing
+        ("write_start", np.float64),
+        ("write_end", np.float64),
+        ("displayed", np.float64),  # viewer updated to (at least) this frame
+        ("queue_depth", np.int32),  # frames waiting to be written, when enqueued
+        ("nbytes", np.int64),
+        ("dropped", np.bool_),  # the frame was discarded without being written
+    ]
+)
+
+
+class Telemetry:
+    """Per-stage timings of the frames going through the MDA pipeline.
+
+    Each frame gets a record in a ring buffer holding the last `capacity` frames.
+    The stages are recorded by different threads: `enqueue` by the thread emitting
+    `frameReady`, `write_started`/`write_finished`/`drop` by the writer thread and
+    `displayed` by the main thread. Frames must be written (or dropped) in the order
+    in which they were enqueued, so no lock is needed.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of frames kept in the ring buffer.
+    late_after : float
+        Frames written more than this many seconds after they were enqueued are
+        counted as late.
+    """
+
+    def __init__(
+        self, capacity: int = DEFAULT_CAPACITY, late_after: float = DEFAULT_LATE_AFTER
+    ) -> None:
+        self.capacity = capacity
+        self.late_after = late_after
+        self._records = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self._records[:] = (0, np.nan, np.nan, np.nan, np.nan, 0, 0, False)
+        # frames enqueued, written (or dropped) and displayed since the telemetry
+        # was created: the positions of the stages in the ring buffer
+        self._enqueued = self._written = self._displayed = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the records and counters.
+
+        This is safe while frames go through the pipeline: the frames enqueued
+        before the reset are still tracked until they are written, but they are no
+        longer counted nor returned by `records`.
+        """
+        self._t0 = time.perf_counter()
+        self._first = self._enqueued  # (first frame since the reset)
+        self.n_dropped = 0
+        self.n_late = 0
+        self.bytes_written = 0
+        self.max_queue_depth = self.queue_depth
+
+    @property
+    def n_enqueued(self) -> int:
+        """Number of frames received since the reset."""
+        return self._enqueued - self._first
+
+    @property
+    def n_written(self) -> int:
+        """Number of frames written (or dropped) since the reset."""
+        return max(self._written - self._first, 0)
+
+    @property
+    def n_displayed(self) -> int:
+        """Number of frames displayed since the reset."""
+        return max(self._displayed - self._first, 0)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of frames enqueued but not written yet."""
+        return self._enqueued - self._written
+
+    # -------------------- recording --------------------
+
+    def enqueue(self, queue_depth: int) -> None:
+        """Record that a frame was received, with `queue_depth` frames waiting."""
+        rec = self._records[self._enqueued % self.capacity]
+        rec["frame"] = self._enqueued
+        rec["enqueued"] = time.perf_counter()
+        rec["write_start"] = rec["write_end"] = rec["displayed"] = np.nan
+        rec["queue_depth"] = queue_depth
+        rec["nbytes"] = 0
+        rec["dropped"] = False
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+        self._enqueued += 1
+
+    def write_started(self, n: int = 1) -> None:
+        """Record that the writer started writing the next `n` frames (at once)."""
+        now = time.perf_counter()
+        for s in self._slices(self._written, self._written + n):
+            self._records["write_start"][s] = now
+
+    def write_finished(self, nbytes: int) -> None:
+        """Record that the writer finished writing the frame (of `nbytes`)."""
+        rec = self._records[self._written % self.capacity]
+        rec["write_end"] = now = time.perf_counter()
+        rec["nbytes"] = nbytes
+        if self._written >= self._first:
+            if now - rec["enqueued"] > self.late_after:
+                self.n_late += 1
+            self.bytes_written += nbytes
+        self._written += 1
+
+    def drop(self, n: int = 1) -> None:
+        """Record that the next `n` frames were discarded without being written."""
+        start, self._written = self._written, self._written + n
+        for s in self._slices(start, self._written):
+            self._records["dropped"][s] = True
+        self.n_dropped += max(self._written - max(start, self._first), 0)
+
+    def displayed(self) -> None:
+        """Record that the viewer now shows all the frames written so far."""
+        now = time.perf_counter()
+        for s in self._slices(self._displayed, self._written):
+            self._records["displayed"][s] = now
+        self._displayed = self._written
+
+    def _slices(self, start: int, stop: int) -> list[slice]:
+        """Return the slices of the ring buffer holding the frames start to stop."""
+        start = max(start, stop - self.capacity)
+        if start >= stop:
+            return []
+        i, j = start % self.capacity, stop % self.capacity
+        if i < j:
+            return [slice(i, j)]
+        return [slice(i, self.capacity), slice(0, j)]
+
+    # -------------------- analysis --------------------
+
+    def records(self) -> np.ndarray:
+        """Return a copy of the records still in the ring buffer, oldest first."""
+        slices = self._slices(self._first, self._enqueued)
+        if not slices:
+            return self._records[:0].copy()
+        return np.concatenate([self._records[s] for s in slices])
+
+    def summary(self, last: int = 1000) -> dict[str, Any]:
+        """Return the counters, and rates and latencies over the `last` frames.
+
+        Latencies are in ms (NaN if no frame reached the stage), rates are in
+        frames/s and MB/s over the time spent writing.
+        """
+        recs = self.records()[-last:]
+        written = recs[~np.isnan(recs["write_end"])]
+        shown = written[~np.isnan(written["displayed"])]
+        write_time = float(np.sum(written["write_end"] - written["write_start"]))
+        return {
+            "enqueued": self.n_enqueued,
+            "written": self.n_written - self.n_dropped,
+            "displayed": self.n_displayed,
+            "dropped": self.n_dropped,
+            "late": self.n_late,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "bytes_written": self.bytes_written,
+            "write_fps": len(written) / write_time if write_time else 0.0,
+            "write_mb_per_s": (
+                float(written["nbytes"].sum()) / write_time / 1e6 if write_time else 0.0
+            ),
+            "queued_ms": _percentiles(written["write_start"] - written["enqueued"]),
+            "write_ms": _percentiles(written["write_end"] - written["write_start"]),
+            "display_ms": _percentiles(shown["displayed"] - shown["write_end"]),
+        }
+
+    def dump(self, path: str | Path) -> Path:
+        """Write the records to `path` for offline analysis.
+
+        A `.json` path gets a Chrome trace (viewable in Perfetto or chrome://tracing)
+        with one span per frame and stage. Any other path gets a CSV file with one
+        row per frame (times in seconds since the telemetry was reset).
+        """
+        path = Path(path)
+        recs = self.records()
+        if path.suffix == ".json":
+            path.write_text(json.dumps(self._chrome_trace(recs)))
+            return path
+        names = list(recs.dtype.names or ())
+        cols = [
+            recs[n] - self._t0 if recs.dtype[n] == np.float64 else recs[n]
+            for n in names
+        ]
+        table = np.rec.fromarrays(cols, dtype=recs.dtype)
+        np.savetxt(
+            path,
+            table,
+            delimiter=",",
+            header=",".join(names),
+            comments="",
+            fmt=["%d", "%.6f", "%.6f", "%.6f", "%.6f", "%d", "%d", "%d"],
+        )
+        return path
+
+    def _chrome_trace(self, recs: np.ndarray) -> dict[str, Any]:
+        events: list[dict[str, Any]] = []
+        stages = [
+            ("queued", "enqueued", "write_start", 1),
+            ("write", "write_start", "write_end", 2),
+            ("to display", "write_end", "displayed", 3),
+        ]
+        for rec in recs:
+            for name, start, end, tid in stages:
+                t0, t1 = rec[start], rec[end]
+                if np.isnan(t0) or np.isnan(t1):
+                    continue
+                events.append(
+                    {
+                        "name": name,
+                        "ph": "X",
+                        "pid": 1,
+                        "tid": tid,
+                        "ts": (t0 - self._t0) * 1e6,
+                        "dur": (t1 - t0) * 1e6,
+                        "args": {
+                            "frame": int(rec["frame"]),
+                            "queue_depth": int(rec["queue_depth"]),
+                        },
+                    }
+                )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _percentiles(values: np.ndarray) -> dict[str, float]:
+    """Return the p50 and p95 of `values` (in s) in ms."""
+    if not len(values):
+        return {"p50": float("nan"), "p95": float("nan")}
+    p50, p95 = np.percentile(values * 1e3, (50, 95))
+    return {"p50": float(p50), "p95": float(p95)}
@@ -44,7 +44,7 @@ def ensure_unique(path: Path, extension: str = ".tif", ndigits: int = 3) -> Path
     Result is appended with a counter of ndigits.
     """
     p = path
-    stem = p.stem
+    stem = _strip_extension(p.name, extension)
     # check if provided path already has an ndigit number in it
     cur_num = stem.rsplit("_")[-1]
     if cur_num.isdigit() and len(cur_num) == ndigits:
@@ -61,10 +61,18 @@ def ensure_unique(path: Path, extension: str = ".tif", ndigits: int = 3) -> Path
     )
     for fn in paths:
         try:
-            current_max = max(current_max, int(fn.stem.rsplit("_")[-1]))
+            fn_stem = _strip_extension(fn.name, extension)
+            current_max = max(current_max, int(fn_stem.rsplit("_")[-1]))
         except ValueError:
             continue
 
     # build new path name
     number = f"_{current_max + 1:0{ndigits}d}"
     return path.parent / f"{stem}{number}{extension}"
+
+
+def _strip_extension(name: str, extension: str) -> str:
+    """Return `name` without `extension` (which may have several suffixes)."""
+    if extension and name.endswith(extension):
+        return name[: -len(extension)]
+    return name.rsplit(".", 1)[0] if "." in name else name
@@ -3,13 +3,14 @@ from __future__ import annotations
 import atexit
 import contextlib
 import logging
-from typing import TYPE_CHECKING, Any, Callable
+from typing import TYPE_CHECKING, Any, Callable, cast
 from warnings import warn
 
 import napari
 import napari.layers
 import napari.viewer
 from pymmcore_plus import CMMCorePlus
+from qtpy.QtCore import QTimer
 
 from ._core_link import CoreViewerLink
 from ._gui_objects._toolbar import MicroManagerToolbar
@@ -19,11 +20,29 @@ if TYPE_CHECKING:
 
     from pymmcore_plus.core.events._protocol import PSignalInstance
 
+    from ._telemetry import Telemetry
+
 
 # this is very verbose
 logging.getLogger("napari.loader").setLevel(logging.WARNING)
 logging.getLogger("in_n_out").setLevel(logging.WARNING)
 
+# events (by type) that may change the (min, max) shown in the MinMax widget
+MINMAX_EVENTS = frozenset(
+    {
+        "inserted",
+        "removed",
+        "changed",  # (selection)
+        "current_step",  # (dims)
+        "data",
+        "set_data",
+        "visible",
+        "colormap",
+    }
+)
+# bursts of events are merged into one MinMax update per this many ms (~1 UI frame)
+MINMAX_UPDATE_MS = 16
+
 
 class MainWindow(MicroManagerToolbar):
     """The main napari-micromanager widget that gets added to napari."""
@@ -38,11 +57,22 @@ class MainWindow(MicroManagerToolbar):
         # this object mediates the connection between the viewer and core events
         self._core_link = CoreViewerLink(viewer, self._mmc, self)
 
+        # MinMax updates are merged and only computed when the widget is visible
+        self._minmax_timer = QTimer(self)
+        self._minmax_timer.setSingleShot(True)
+        self._minmax_timer.setInterval(MINMAX_UPDATE_MS)
+        self._minmax_timer.timeout.connect(self._refresh_max_min)
+        self.minmax.shown.connect(self._minmax_timer.start)
+
         # some remaining connections related to widgets ... TODO: unify with superclass
         self._connections: list[tuple[PSignalInstance, Callable]] = [
             (self.viewer.layers.events, self._update_max_min),
             (self.viewer.layers.selection.events, self._update_max_min),
             (self.viewer.dims.events.current_step, self._update_max_min),
+            (
+                cast("PSignalInstance", self._core_link.liveFramesChanged),
+                self._snap_live_toolbar.set_frame_counts,
+            ),
         ]
         for signal, slot in self._connections:
             signal.connect(slot)
@@ -62,6 +92,16 @@ class MainWindow(MicroManagerToolbar):
                 # don't crash if the user passed an invalid config
                 warn(f"Config file {config} not found. Nothing loaded.", stacklevel=2)
 
+    @property
+    def telemetry(self) -> Telemetry:
+        """Per-frame timings of the MDA pipeline (see `Telemetry`)."""
+        return self._core_link._mda_handler.telemetry
+
+    @property
+    def queue_fill(self) -> float:
+        """Fill level of the MDA frame queue, as a fraction of its byte budget."""
+        return float(self._core_link._mda_handler.queue_fill)
+
     def _cleanup(self) -> None:
         for signal, slot in self._connections:
             with contextlib.suppress(TypeError, RuntimeError):
@@ -70,8 +110,30 @@ class MainWindow(MicroManagerToolbar):
         self._core_link.cleanup()
         atexit.unregister(self._cleanup)  # doesn't raise if not connected
 
-    def _update_max_min(self, *_: Any) -> None:
+    def _update_max_min(self, event: Any = None) -> None:
+        """Schedule a MinMax update if `event` may change the displayed range.
+
+        `viewer.layers.events` also relays all events of the layers (e.g. thumbnail
+        updates), which are ignored.
+        """
+        if event is not None and getattr(event, "type", None) not in MINMAX_EVENTS:
+            return
+        if not self._minmax_timer.isActive():
+            self._minmax_timer.start()
+
+    def _refresh_max_min(self) -> None:
+        # nothing to do if the MinMax dock is hidden (it is updated when shown) or
+        # was deleted together with the viewer window
+        try:
+            if not self.minmax.isVisible():
+                return
+        except RuntimeError:
+            return
         visible = (x for x in self.viewer.layers.selection if x.visible)
+        # the per-frame stats of MDA layers can be used when frames (yx) are shown
+        dims = self.viewer.dims
+        yx_displayed = list(dims.displayed) == [dims.ndim - 2, dims.ndim - 1]
         self.minmax.update_from_layers(
-            lr for lr in visible if isinstance(lr, napari.layers.Image)
+            (lr for lr in visible if isinstance(lr, napari.layers.Image)),
+            dims.point if yx_displayed else None,
         )
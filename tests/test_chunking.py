@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from napari_micromanager._chunk_buffer import ChunkBuffer
+from napari_micromanager._storage import (
+    MAX_CHUNK_BYTES,
+    MAX_SHARD_BYTES,
+    ZARR_V3,
+    chunk_shape,
+    create_temp_zarr_array,
+    shard_shape,
+)
+
+
+@pytest.mark.parametrize(
+    "index_axes, chunking, expected",
+    [
+        ("tz", "frame", [1, 1]),
+        ("tz", "stack", [1, 5]),
+        ("tz", "auto", [1, 5]),
+        ("zt", "stack", [1, 3]),
+        ("zt", "auto", [1, 1]),
+        ("", "stack", []),
+    ],
+)
+def test_chunk_shape(index_axes: str, chunking: str, expected: list[int]) -> None:
+    sizes = {"t": 3, "z": 5}
+    index_shape = [sizes[ax] for ax in index_axes]
+    chunks = chunk_shape(list(index_axes), index_shape, [8, 8], chunking, 2)
+    assert chunks == [*expected, 8, 8]
+
+
+def test_chunk_shape_limit() -> None:
+    frame = [2048, 2048]
+    n = MAX_CHUNK_BYTES // (2048 * 2048 * 2)
+    assert chunk_shape(["z"], [1000], frame, "stack", 2) == [n, *frame]
+
+
+def test_chunk_buffer() -> None:
+    z, tmp = create_temp_zarr_array((2, 3, 4, 4), "uint16", (1, 2, 4, 4))
+    try:
+        buf = ChunkBuffer(z, 2)
+        frames = np.arange(1, 7, dtype="uint16").reshape(2, 3, 1, 1)
+        expected = np.broadcast_to(frames, (2, 3, 4, 4)).copy()
+
+        buf[0, 0] = expected[0, 0]
+        # the frame waits in memory for the rest of its chunk, but can be read
+        assert buf.n_pending == 1
+        assert not z[0, 0].any()
+        np.testing.assert_array_equal(buf[0, 0], expected[0, 0])
+        np.testing.assert_array_equal(
+            buf[:, 0, 1:3], [expected[0, 0, 1:3], np.zeros((2, 4))]
+        )
+        buf[0, 1] = expected[0, 1]
+        assert buf.n_pending == 0  # (the chunk was complete)
+        np.testing.assert_array_equal(z[0, :2], expected[0, :2])
+
+        # (the last chunk along z only holds one frame)
+        buf[0, 2] = expected[0, 2]
+        assert buf.n_pending == 0
+        buf[1, 0] = expected[1, 0]
+        buf[1, 2] = expected[1, 2]
+        assert buf.n_pending == 1
+        buf.flush()
+        assert buf.n_pending == 0
+        buf[1, 1] = expected[1, 1]  # (written through)
+        np.testing.assert_array_equal(z[:], expected)
+        np.testing.assert_array_equal(np.asarray(buf), expected)
+    finally:
+        tmp.cleanup()
+
+
+@pytest.mark.parametrize(
+    "shape, chunks, expected",
+    [
+        ((3, 5, 8, 8), (1, 1, 8, 8), (3, 5, 8, 8)),
+        ((3, 5, 8, 8), (1, 5, 8, 8), (3, 5, 8, 8)),
+        ((10**8, 8, 8), (1, 8, 8), (MAX_SHARD_BYTES // 128, 8, 8)),
+        ((10**6, 5, 8, 8), (1, 1, 8, 8), (MAX_SHARD_BYTES // 640, 5, 8, 8)),
+    ],
+)
+def test_shard_shape(
+    shape: tuple[int, ...], chunks: tuple[int, ...], expected: tuple[int, ...]
+) -> None:
+    assert tuple(shard_shape(shape, chunks, len(shape) - 2, 2)) == expected
+
+
+@pytest.mark.skipif(not ZARR_V3, reason="sharding requires zarr >= 3")
+def test_chunk_buffer_sharded() -> None:
+    z, tmp = create_temp_zarr_array((5, 4, 4), "uint16", (1, 4, 4), shards=(2, 4, 4))
+    try:
+        buf = ChunkBuffer(z, 1)
+        frames = [np.full((4, 4), i + 1, dtype="uint16") for i in range(5)]
+        for i in range(3):
+            buf[(i,)] = frames[i]
+        # (frames are collected by shard: the second one is still in memory)
+        assert buf.n_pending == 1
+        assert z[:, 0, 0].tolist() == [1, 2, 0, 0, 0]
+        buf.flush()
+        assert z[:, 0, 0].tolist() == [1, 2, 3, 0, 0]
+        buf[(3,)] = frames[3]  # (written through)
+        buf[(4,)] = frames[4]  # (the last shard only holds one frame)
+        assert buf.n_pending == 0
+        assert z[:, 0, 0].tolist() == [1, 2, 3, 4, 5]
+    finally:
+        tmp.cleanup()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+import zarr
+
+from napari_micromanager._export import export_array
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(
+    "index_axes, index_shape, frame_shape",
+    [("tpcz", (2, 2, 2, 3), (4, 5)), ("tz", (2, 2), (4, 5, 3))],
+)
+def test_export_ome_tiff(
+    tmp_path: Path,
+    index_axes: str,
+    index_shape: tuple[int, ...],
+    frame_shape: tuple[int, ...],
+) -> None:
+    tifffile = pytest.importorskip("tifffile")
+    shape = (*index_shape, *frame_shape)
+    data = np.arange(np.prod(shape), dtype="uint16").reshape(shape)
+    scale = [1.0] * (len(index_axes) - 1) + [2.0, 0.5, 0.5]
+    path = export_array(data, tmp_path / "out.ome.tiff", list(index_axes), scale)
+
+    with tifffile.TiffFile(path) as tif:
+        assert tif.is_ome
+        # one image per position
+        n_images = index_shape[index_axes.index("p")] if "p" in index_axes else 1
+        assert len(tif.series) == n_images
+        for p, series in enumerate(tif.series):
+            expected = data[:, p] if "p" in index_axes else data
+            np.testing.assert_array_equal(series.asarray(), expected)
+        assert 'PhysicalSizeX="0.5"' in tif.ome_metadata
+        assert 'PhysicalSizeZ="2.0"' in tif.ome_metadata
+
+
+def test_export_ome_zarr(tmp_path: Path) -> None:
+    shape = (2, 3, 4, 5)
+    data = np.arange(np.prod(shape), dtype="uint8").reshape(shape)
+    path = export_array(data, tmp_path / "out.ome.zarr", ["t", "z"])
+
+    group = zarr.open_group(str(path / "0"), mode="r")
+    np.testing.assert_array_equal(group["0"][:], data)
+    axes = group.attrs["multiscales"][0]["axes"]
+    assert [ax["name"] for ax in axes] == ["t", "z", "y", "x"]
+
+
+def test_export_unknown_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="extension"):
+        export_array(np.zeros((1, 2, 2)), tmp_path / "out.png", ["t"])
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import numpy as np
+import pytest
 from useq import MDAEvent
 
 if TYPE_CHECKING:
@@ -12,14 +14,15 @@ if TYPE_CHECKING:
     from napari_micromanager.main_window import MainWindow
 
 
-def test_generator_mda_does_not_crash(main_window: MainWindow, qtbot: QtBot) -> None:
-    """Running an MDA from a generator should not crash the handler."""
+def test_generator_mda_preview_only(main_window: MainWindow, qtbot: QtBot) -> None:
+    """With "preview" storage, generator frames are only shown in the preview."""
 
     def _events() -> Iterator[MDAEvent]:
         yield MDAEvent(exposure=5)
         yield MDAEvent(exposure=5)
 
     mmc = main_window._mmc
+    main_window._core_link._mda_handler.generator_storage = "preview"
     with qtbot.waitSignal(mmc.mda.events.sequenceFinished, timeout=5000):
         mmc.run_mda(_events())
 
@@ -30,3 +33,39 @@ def test_generator_mda_does_not_crash(main_window: MainWindow, qtbot: QtBot) ->
     # The acquired frames should still be visible in the preview layer.
     assert "preview" in layer_names
     assert main_window.viewer.layers["preview"].data.shape == (512, 512)
+
+
+@pytest.mark.parametrize("storage", ["zarr", "memory"])
+def test_generator_mda_growable_layer(
+    main_window: MainWindow, qtbot: QtBot, storage: str
+) -> None:
+    """Generator frames are kept in a layer that grows as they arrive."""
+
+    def _events() -> Iterator[MDAEvent]:
+        # frames without an index are appended along the first axis...
+        for _ in range(20):
+            yield MDAEvent(exposure=1)
+
+    mmc = main_window._mmc
+    main_window._core_link._mda_handler.generator_storage = storage
+    with qtbot.waitSignal(mmc.mda.events.sequenceFinished, timeout=10000):
+        mmc.run_mda(_events())
+
+    layer = next(lr for lr in main_window.viewer.layers if lr.name.startswith("Exp_"))
+    qtbot.waitUntil(lambda: layer.data.shape[0] == 20)
+    assert layer.data.shape == (20, 1, 1, 1, 1, 512, 512)
+    assert np.asarray(layer.data[19, 0, 0, 0, 0]).any()
+    assert main_window.viewer.dims.nsteps[0] == 20
+
+    # ... and indexed frames are placed at their index
+    def _indexed() -> Iterator[MDAEvent]:
+        for c in range(2):
+            for z in range(3):
+                yield MDAEvent(index={"c": c, "z": z}, exposure=1)
+
+    with qtbot.waitSignal(mmc.mda.events.sequenceFinished, timeout=10000):
+        mmc.run_mda(_indexed())
+    layer = main_window.viewer.layers[-1]
+    qtbot.waitUntil(lambda: layer.data.shape[3:5] == (2, 3))
+    assert layer.data.shape == (1, 1, 1, 2, 3, 512, 512)
+    assert np.asarray(layer.data[0, 0, 0, 1, 2]).any()
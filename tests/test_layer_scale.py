@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import numpy as np
 import pytest
 
 from napari_micromanager._mda_handler import _NapariMDAHandler
@@ -81,3 +82,42 @@ def test_preview_scale(core: CMMCorePlus, main_window: MainWindow):
         # return to orig value for future tests and re-raise
         core.setPixelSizeUm(pix_size)
         raise e
+
+
+def test_preview_scale_follows_objective(core: CMMCorePlus, main_window: MainWindow):
+    link = main_window._core_link
+    img = core.snap()
+    link._update_viewer(img)
+    layer = main_window.viewer.layers["preview"]
+    assert tuple(layer.scale) == (core.getPixelSizeUm(),) * 2
+
+    # the cached scale is refreshed when the objective changes...
+    core.setProperty("Objective", "Label", "Nikon 20X Plan Fluor ELWD")
+    link._update_viewer(img)
+    assert tuple(layer.scale) == (core.getPixelSizeUm(),) * 2
+
+    # ... and the layer is re-created if it was removed
+    main_window.viewer.layers.remove(layer)
+    link._update_viewer(img)
+    assert main_window.viewer.layers["preview"] is not layer
+
+
+def test_preview_buffer_reused(core: CMMCorePlus, main_window: MainWindow):
+    link = main_window._core_link
+    first, second = core.snap(), core.snap()
+    link._update_viewer(first)
+    layer = main_window.viewer.layers["preview"]
+    buf = layer.data
+    assert buf is not first
+
+    # frames are copied into the same buffer ...
+    link._update_viewer(second)
+    assert layer.data is buf
+    np.testing.assert_array_equal(buf, second)
+
+    # ... until the frame shape changes
+    core.setProperty("Camera", "Binning", "2")
+    binned = core.snap()
+    link._update_viewer(binned)
+    assert layer.data is not buf
+    assert layer.data.shape == binned.shape
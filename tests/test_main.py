@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import patch
 
@@ -36,3 +38,15 @@ def test_cli_main(argv: list) -> None:
     # this is to prevent a leaked widget error in the NEXT test
     napari.current_viewer().close()
     QtViewer._instances.clear()
+
+
+def test_import_is_lazy() -> None:
+    # napari, Qt and the widgets are only imported with the MainWindow
+    code = (
+        "import sys, napari_micromanager; "
+        "print(*(m for m in ('napari', 'qtpy', 'zarr') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert not out.stdout.strip()
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import numpy as np
+import pytest
 import useq
 
-from napari_micromanager.main_window import MainWindow
+from napari_micromanager.main_window import MINMAX_UPDATE_MS, MainWindow
 
 if TYPE_CHECKING:
     from pymmcore_plus import CMMCorePlus
@@ -46,3 +48,55 @@ def test_preview_while_mda(main_window: MainWindow, qtbot: QtBot):
 
     layers = [layer.name for layer in viewer.layers]
     assert "preview" not in layers
+
+
+def test_live_display_rate(main_window: MainWindow, qtbot: QtBot) -> None:
+    mmc = main_window._mmc
+    link = main_window._core_link
+    link.live_fps = 10
+    mmc.setExposure(2)
+
+    mmc.startContinuousSequenceAcquisition()
+    try:
+        qtbot.waitUntil(lambda: link.frames_displayed >= 3, timeout=5000)
+    finally:
+        mmc.stopSequenceAcquisition()
+
+    # the camera runs much faster than the display clock: frames are skipped
+    assert link.frames_received > link.frames_displayed
+    assert "preview" in main_window.viewer.layers
+    label = main_window._snap_live_toolbar.frames_label.text()
+    displayed, received = map(int, label.split("/"))
+    assert 0 < displayed <= received
+
+    with pytest.raises(ValueError):
+        link.live_fps = 0
+
+
+def test_minmax_updates_debounced(main_window: MainWindow, qtbot: QtBot) -> None:
+    viewer = main_window.viewer
+    layer = viewer.add_image(np.arange(16, dtype=np.uint8).reshape(4, 4))
+    timer = main_window._minmax_timer
+    qtbot.waitUntil(lambda: not timer.isActive())
+
+    with (
+        patch.object(main_window.minmax, "isVisible", return_value=True),
+        patch.object(main_window.minmax, "update_from_layers") as mock,
+    ):
+        # events that don't change the displayed range are ignored...
+        layer.refresh(data_displayed=False)
+        layer.events.thumbnail()
+        assert not timer.isActive()
+        # ... and bursts of relevant events are merged into one update
+        for _ in range(5):
+            layer.data = layer.data + 1
+        qtbot.waitUntil(lambda: mock.call_count > 0)
+        qtbot.wait(3 * MINMAX_UPDATE_MS)
+    mock.assert_called_once()
+
+    # nothing is computed while the MinMax dock is hidden
+    with patch.object(main_window.minmax, "update_from_layers") as mock:
+        main_window.minmax.hide()
+        layer.data = layer.data + 1
+        qtbot.waitUntil(lambda: not timer.isActive())
+    mock.assert_not_called()
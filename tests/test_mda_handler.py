@@ -0,0 +1,629 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import useq
+import zarr
+
+from napari_micromanager._chunk_buffer import ChunkBuffer
+from napari_micromanager._export import export_layer
+from napari_micromanager._gui_objects._min_max_widget import MinMax
+from napari_micromanager._gui_objects._telemetry_widget import TelemetryWidget
+from napari_micromanager._mda_handler import _NapariMDAHandler
+from napari_micromanager._telemetry import Telemetry
+from napari_micromanager._util import NMM_METADATA_KEY, PYMMCW_METADATA_KEY
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    import napari
+    from pymmcore_plus import CMMCorePlus
+    from pytestqt.qtbot import QtBot
+
+
+@pytest.fixture
+def handler(
+    napari_viewer: napari.Viewer, core: CMMCorePlus
+) -> Iterator[_NapariMDAHandler]:
+    handler = _NapariMDAHandler(core, napari_viewer)
+    yield handler
+    handler._cleanup()
+
+
+def _frames(core: CMMCorePlus, n: int) -> list[np.ndarray]:
+    """Return `n` camera-sized frames, filled with 1, 2, ... n."""
+    shape = (core.getImageHeight(), core.getImageWidth())
+    dtype = f"u{core.getBytesPerPixel()}"
+    return [np.full(shape, i + 1, dtype=dtype) for i in range(n)]
+
+
+def _acquire(
+    handler: _NapariMDAHandler, seq: useq.MDASequence, frames: Iterable[np.ndarray]
+) -> None:
+    """Feed `frames` to `handler` as the frames of `seq` (stops at the shortest)."""
+    handler._on_mda_started(seq)
+    for frame, event in zip(frames, seq):
+        handler._on_mda_frame(frame, event)
+    handler._on_mda_finished(seq)
+
+
+def test_frames_written_in_acquisition_order(
+    handler: _NapariMDAHandler, napari_viewer: napari.Viewer, core: CMMCorePlus
+) -> None:
+    seq = useq.MDASequence(time_plan={"interval": 0, "loops": 3})
+    events = list(seq)
+    frames = _frames(core, 3)
+
+    handler._on_mda_started(seq)
+    for frame, event in zip(frames, events):
+        handler._on_mda_frame(frame, event)
+    # a second frame for the same index must win over the first one (FIFO)
+    handler._on_mda_frame(np.full_like(frames[0], 42), events[0])
+    handler._on_mda_finished(seq)
+
+    data = napari_viewer.layers[-1].data
+    assert [int(data[i, 0, 0]) for i in range(3)] == [42, 2, 3]
+    assert handler.drain_rate > 0
+
+
+@pytest.mark.parametrize("storage", ["memory", "zarr"])
+def test_parallel_layer_writers(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    storage: str,
+) -> None:
+    seq = useq.MDASequence(
+        channels=["DAPI", "FITC"],
+        time_plan={"interval": 0, "loops": 3},
+        metadata={NMM_METADATA_KEY: {"split_channels": True, "storage": storage}},
+    )
+    events = list(seq)
+    frames = _frames(core, 6)
+
+    handler._on_mda_started(seq)
+    assert len(handler._layer_writers) == 2
+    for frame, event in zip(frames, events):
+        handler._on_mda_frame(frame, event)
+    # later frames of a channel must still win over earlier ones
+    for value in (42, 43):
+        handler._on_mda_frame(np.full_like(frames[0], value), events[1])
+    handler._on_mda_finished(seq)
+
+    assert not handler._layer_writers
+    dapi, fitc = (np.asarray(layer.data) for layer in napari_viewer.layers[-2:])
+    assert dapi[:, 0, 0].tolist() == [1, 3, 5]
+    assert fitc[:, 0, 0].tolist() == [43, 4, 6]
+
+
+@pytest.mark.parametrize("storage", ["zarr", "ome_zarr", "memory"])
+def test_burst_written_in_runs(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    tmp_path: Path,
+    storage: str,
+) -> None:
+    meta = {NMM_METADATA_KEY: {"storage": storage}}
+    if storage == "ome_zarr":
+        meta = {
+            NMM_METADATA_KEY: {"direct_to_disk": True},
+            PYMMCW_METADATA_KEY: {"save_dir": str(tmp_path), "save_name": "exp"},
+        }
+    seq = useq.MDASequence(
+        time_plan={"interval": 0, "loops": 2},
+        z_plan={"range": 2, "step": 1},
+        metadata=meta,
+    )
+    frames = _frames(core, 6)
+    # the whole sequence arrives in one batch (e.g. a hardware-sequenced burst)
+    batch = list(zip(frames, seq))
+    handler._on_mda_started(seq)
+    runs = handler._frame_runs(batch)
+    if storage == "memory":  # (numpy arrays are written frame by frame)
+        assert [len(run) for run in runs] == [1] * 6
+    else:  # one run per z-stack
+        assert [len(run) for run in runs] == [3, 3]
+    handler.combine_runs = False
+    assert [len(run) for run in handler._frame_runs(batch)] == [1] * 6
+    handler.combine_runs = True
+
+    # (the newest index of the batch is what its single viewer update shows)
+    results = handler._write_batch(batch)
+    assert results[-1] == (napari_viewer.layers[-1].name, (1, 2))
+    handler._on_mda_finished(seq)
+    data = np.asarray(napari_viewer.layers[-1].data)
+    assert data[:, :, 0, 0].tolist() == [[1, 2, 3], [4, 5, 6]]
+    assert handler.telemetry.n_written == 6
+
+
+@pytest.mark.parametrize("follow", [True, False])
+def test_viewer_dims_updates_coalesced(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    qtbot: QtBot,
+    follow: bool,
+) -> None:
+    handler.follow = follow
+    seq = useq.MDASequence(time_plan={"interval": 0, "loops": 5})
+    handler._on_mda_started(seq)
+    layer = napari_viewer.layers[-1]
+    assert not layer.visible
+
+    with patch.object(
+        handler, "_update_viewer_dims", wraps=handler._update_viewer_dims
+    ) as mock:
+        for t in range(5):
+            handler._schedule_viewer_dims({layer.name: (t,)})
+        qtbot.waitUntil(lambda: not handler._dims_timer.isActive())
+
+    mock.assert_called_once_with((layer.name, (4,)))
+    assert layer.visible
+    assert napari_viewer.dims.current_step[0] == (4 if follow else 0)
+    handler._on_mda_finished(seq)
+
+
+@pytest.mark.parametrize("compression", ["lz4", "zstd", "none"])
+def test_layer_compression(
+    handler: _NapariMDAHandler, core: CMMCorePlus, compression: str
+) -> None:
+    seq = useq.MDASequence(
+        time_plan={"interval": 0, "loops": 4},
+        metadata={NMM_METADATA_KEY: {"compression": compression, "storage": "zarr"}},
+    )
+    _acquire(handler, seq, _frames(core, 4))
+
+    assert handler.write_throughput > 0
+    ratio = handler.compression_ratio()
+    if compression == "none":
+        assert 0.9 < ratio <= 1
+    else:
+        assert ratio > 10
+
+
+def test_memory_storage_spills_to_disk(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    qtbot: QtBot,
+) -> None:
+    seq = useq.MDASequence(time_plan={"interval": 0, "loops": 4})
+    frames = _frames(core, 4)
+
+    # small sequences are kept in memory
+    handler._on_mda_started(seq)
+    layer = napari_viewer.layers[-1]
+    assert isinstance(layer.data, np.ndarray)
+
+    # ... until they outgrow the memory budget
+    handler.memory_budget = frames[0].nbytes * 2
+    for frame, event in zip(frames, seq):
+        handler._on_mda_frame(frame, event)
+    handler._on_mda_finished(seq)
+
+    qtbot.waitUntil(lambda: isinstance(layer.data, zarr.Array))
+    assert [int(layer.data[i, 0, 0]) for i in range(4)] == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("chunking", ["frame", "stack", "auto"])
+def test_layer_chunking(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    chunking: str,
+) -> None:
+    seq = useq.MDASequence(
+        axis_order="tpcz",
+        time_plan={"interval": 0, "loops": 2},
+        z_plan={"range": 2, "step": 1},
+        metadata={NMM_METADATA_KEY: {"storage": "zarr", "chunking": chunking}},
+    )
+    frames = _frames(core, 5)  # (the last z-stack is incomplete)
+    handler._on_mda_started(seq)
+    layer = napari_viewer.layers[-1]
+    for frame, event in zip(frames, seq):
+        handler._on_mda_frame(frame, event)
+    handler._on_mda_finished(seq)
+
+    data = np.asarray(layer.data)
+    assert data[:, :, 0, 0].tolist() == [[1, 2, 3], [4, 5, 0]]
+    z = handler._tmp_arrays[str(seq.uid)][0]
+    z = getattr(z, "array", z)
+    assert isinstance(z, zarr.Array)
+    assert z.chunks[:2] == ((1, 1) if chunking == "frame" else (1, 3))
+
+
+def test_sharded_layer(
+    handler: _NapariMDAHandler, napari_viewer: napari.Viewer, core: CMMCorePlus
+) -> None:
+    pytest.importorskip("zarr.codecs")
+    seq = useq.MDASequence(
+        time_plan={"interval": 0, "loops": 20},
+        metadata={
+            NMM_METADATA_KEY: {"storage": "zarr", "sharding": True, "pyramid_levels": 1}
+        },
+    )
+    frames = _frames(core, 20)
+    _acquire(handler, seq, frames)
+
+    data = np.asarray(napari_viewer.layers[-1].data[0])
+    assert data[:, 0, 0].tolist() == list(range(1, 21))
+    buf = handler._tmp_arrays[str(seq.uid)][0]
+    assert isinstance(buf, ChunkBuffer)
+    z = buf.array
+    assert z.chunks[0] == 1
+    assert z.shards[0] == 20
+    # one shard file (and the metadata), instead of one file per frame
+    files = [p for p in Path(z.store.root).rglob("*") if p.is_file()]
+    assert len(files) == 2
+
+
+def test_memmap_layer(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    tmp_path: Path,
+) -> None:
+    tifffile = pytest.importorskip("tifffile")
+    seq = useq.MDASequence(
+        axis_order="tpcz",
+        time_plan={"interval": 0, "loops": 2},
+        z_plan={"range": 1, "step": 1},
+        metadata={NMM_METADATA_KEY: {"storage": "memmap"}},
+    )
+    frames = _frames(core, 4)
+    _acquire(handler, seq, frames)
+
+    layer = napari_viewer.layers[-1]
+    assert isinstance(layer.data, np.memmap)
+    assert layer.data[:, :, 0, 0].tolist() == [[1, 2], [3, 4]]
+    # (mapped files don't count towards the memory budget)
+    assert not handler._memory_used.get(str(seq.uid))
+
+    path = export_layer(layer, tmp_path / "out.ome.tif")
+    with tifffile.TiffFile(path) as tif:
+        assert tif.is_ome
+        assert tif.series[0].axes == "TZYX"
+        np.testing.assert_array_equal(tif.asarray(), layer.data)
+
+
+@pytest.mark.parametrize("storage", ["memory", "zarr", "memmap"])
+def test_removed_layer_freed(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    storage: str,
+) -> None:
+    seq = useq.MDASequence(
+        time_plan={"interval": 0, "loops": 4},
+        metadata={NMM_METADATA_KEY: {"storage": storage}},
+    )
+    frames = _frames(core, 2)
+    _acquire(handler, seq, frames)
+    id_ = str(seq.uid)
+    _, tmp = handler._tmp_arrays[id_]
+    if storage == "memory":
+        # only the frames written count towards the memory budget
+        assert handler._memory_used[id_] == 2 * frames[0].nbytes
+
+    napari_viewer.layers.remove(napari_viewer.layers[-1])
+    assert id_ not in handler._tmp_arrays
+    assert id_ not in handler._memory_used
+    if tmp is not None:
+        assert not Path(tmp.name).exists()
+
+
+@pytest.mark.parametrize("storage", ["memory", "zarr", "spilled"])
+def test_multiscale_layers(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    qtbot: QtBot,
+    storage: str,
+) -> None:
+    seq = useq.MDASequence(
+        time_plan={"interval": 0, "loops": 2},
+        metadata={
+            NMM_METADATA_KEY: {
+                "pyramid_levels": 2,
+                "storage": "memory" if storage == "spilled" else storage,
+            }
+        },
+    )
+    shape = (core.getImageHeight(), core.getImageWidth())
+    dtype = f"u{core.getBytesPerPixel()}"
+    if storage == "spilled":
+        # the levels are moved to disk with the full resolution
+        handler.memory_budget = 1
+
+    frames = [np.random.randint(0, 1000, shape).astype(dtype) for _ in range(2)]
+    _acquire(handler, seq, frames)
+
+    layer = napari_viewer.layers[-1]
+    if storage == "spilled":
+        qtbot.waitUntil(lambda: isinstance(layer.data[0], zarr.Array))
+        assert all(isinstance(level, zarr.Array) for level in layer.data)
+        assert {f"{seq.uid}/1", f"{seq.uid}/2"} <= set(handler._tmp_arrays)
+    assert layer.multiscale
+    assert [level.shape[-2:] for level in layer.data] == [
+        shape,
+        (shape[0] // 2, shape[1] // 2),
+        (shape[0] // 4, shape[1] // 4),
+    ]
+    expected = frames[1].reshape(shape[0] // 4, 4, shape[1] // 4, 4).mean((1, 3))
+    np.testing.assert_allclose(layer.data[2][1], expected, atol=2)
+
+
+def test_frame_stats(
+    handler: _NapariMDAHandler, napari_viewer: napari.Viewer, core: CMMCorePlus
+) -> None:
+    seq = useq.MDASequence(
+        time_plan={"interval": 0, "loops": 3},
+        metadata={NMM_METADATA_KEY: {"storage": "zarr"}},
+    )
+    shape = (core.getImageHeight(), core.getImageWidth())
+    dtype = f"u{core.getBytesPerPixel()}"
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(10 * i, 100 * (i + 1), shape, dtype=dtype) for i in range(3)]
+
+    _acquire(handler, seq, frames[:2])
+
+    layer = napari_viewer.layers[-1]
+    stats = layer.metadata[NMM_METADATA_KEY]["frame_stats"]
+    for i, frame in enumerate(frames[:2]):
+        assert stats.range((i,)) == (frame.min(), frame.max())
+        assert stats.mean[i] == pytest.approx(frame.mean())
+        assert stats.hist[i].sum() > 0
+    assert stats.range((2,)) is None  # never written
+    assert stats.data_range() == (frames[0].min(), frames[1].max())
+
+    # the MinMax widget reads the displayed frame's range from the cache
+    minmax = MinMax()
+    with patch.object(type(layer), "_calc_data_range", side_effect=AssertionError):
+        minmax.update_from_layers([layer], point=(1, 0, 0))
+    assert str((float(frames[1].min()), float(frames[1].max()))) in minmax._label.text()
+
+
+def test_mosaic_layer(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    qtbot: QtBot,
+) -> None:
+    h, w = core.getImageHeight(), core.getImageWidth()
+    pix = core.getPixelSizeUm()
+    seq = useq.MDASequence(
+        channels=["DAPI", "FITC"],
+        grid_plan={
+            "rows": 2,
+            "columns": 2,
+            "fov_width": w * pix,
+            "fov_height": h * pix,
+        },
+        metadata={NMM_METADATA_KEY: {"mosaic": True}},
+    )
+    dtype = f"u{core.getBytesPerPixel()}"
+
+    handler._on_mda_started(seq)
+    mosaic = napari_viewer.layers[-1]
+    assert mosaic.name.endswith("_mosaic")
+    events = list(seq)
+    for i, event in enumerate(events):
+        handler._on_mda_frame(np.full((h, w), i + 1, dtype=dtype), event)
+    handler._on_mda_finished(seq)
+
+    canvas = np.asarray(mosaic.data[0] if mosaic.multiscale else mosaic.data)
+    f = round(mosaic.scale[-1] / pix)
+    assert canvas.shape == (2 * h // f, 2 * w // f)
+    # each tile shows the frame of the first channel acquired at its position
+    for i, event in enumerate(events):
+        if event.index.get("c", 0):
+            continue
+        row = round((event.y_pos - mosaic.translate[0]) / mosaic.scale[0])
+        col = round((event.x_pos - mosaic.translate[1]) / mosaic.scale[1])
+        assert canvas[row, col] == i + 1
+    qtbot.waitUntil(lambda: not handler._mosaic_dirty)
+
+
+def test_telemetry(
+    handler: _NapariMDAHandler, core: CMMCorePlus, qtbot: QtBot, tmp_path: Path
+) -> None:
+    seq = useq.MDASequence(time_plan={"interval": 0, "loops": 3})
+    frames = _frames(core, 3)
+    _acquire(handler, seq, frames)
+    telemetry = handler.telemetry
+    qtbot.waitUntil(lambda: telemetry.n_displayed == 3)
+
+    summary = telemetry.summary()
+    assert summary["enqueued"] == summary["written"] == summary["displayed"] == 3
+    assert summary["dropped"] == summary["queue_depth"] == 0
+    assert summary["bytes_written"] == 3 * frames[0].nbytes
+    assert summary["write_ms"]["p95"] >= summary["write_ms"]["p50"] >= 0
+    assert len(telemetry.records()) == 3
+
+    csv = telemetry.dump(tmp_path / "trace.csv").read_text().splitlines()
+    assert csv[0].startswith("frame,enqueued") and len(csv) == 4
+    trace = json.loads(telemetry.dump(tmp_path / "trace.json").read_text())
+    assert {e["name"] for e in trace["traceEvents"]} == {
+        "queued",
+        "write",
+        "to display",
+    }
+
+    wdg = TelemetryWidget()
+    wdg.telemetry = telemetry
+    wdg.refresh()
+    assert wdg._labels["Frames written"].text() == "3"
+    wdg._reset()
+    assert wdg._labels["Frames written"].text() == "0"
+
+
+def test_telemetry_ring_buffer() -> None:
+    telemetry = Telemetry(capacity=4)
+    for i in range(6):
+        telemetry.enqueue(queue_depth=i)
+    telemetry.drop()
+    for _ in range(5):
+        telemetry.write_started()
+        telemetry.write_finished(nbytes=10)
+    telemetry.displayed()
+    records = telemetry.records()
+    assert list(records["frame"]) == [2, 3, 4, 5]
+    assert records["displayed"].min() > 0
+    summary = telemetry.summary()
+    assert summary["written"] == 5 and summary["dropped"] == 1
+    assert summary["max_queue_depth"] == 5
+
+
+def test_telemetry_reset_in_flight() -> None:
+    # resetting while frames are queued must not break the following records
+    telemetry = Telemetry(capacity=4)
+    for i in range(3):
+        telemetry.enqueue(queue_depth=i)
+    telemetry.reset()
+    assert telemetry.queue_depth == 3
+    assert telemetry.n_enqueued == telemetry.n_written == 0
+    telemetry.drop()
+    for _ in range(2):
+        telemetry.write_started()
+        telemetry.write_finished(nbytes=10)
+    telemetry.enqueue(queue_depth=0)
+    telemetry.write_started()
+    telemetry.write_finished(nbytes=10)
+    telemetry.displayed()
+
+    summary = telemetry.summary()
+    assert summary["enqueued"] == summary["written"] == summary["displayed"] == 1
+    assert summary["dropped"] == summary["queue_depth"] == 0
+    assert summary["bytes_written"] == 10
+    assert list(telemetry.records()["frame"]) == [3]
+
+
+@pytest.mark.parametrize("policy", ["spill", "drop_display"])
+def test_backpressure(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    qtbot: QtBot,
+    policy: str,
+) -> None:
+    handler.backpressure = policy
+    handler.queue_budget = 0  # every frame is over budget
+    seq = useq.MDASequence(time_plan={"interval": 0, "loops": 3})
+    frames = _frames(core, 3)
+
+    handler._on_mda_started(seq)
+    # (holding the lock keeps the writer from draining the queue in the meantime)
+    with handler._deck_cond:
+        for frame, event in zip(frames, seq):
+            handler._on_mda_frame(frame, event)
+        # spilled frames don't count towards the queue in memory
+        assert (handler._scratch is not None) == (policy == "spill")
+        if policy == "spill":
+            assert handler.queue_nbytes == 0
+        else:
+            assert handler.queue_nbytes == 3 * frames[0].nbytes
+            assert handler.queue_fill == float("inf")
+            assert handler._queue_full
+    handler._on_mda_finished(seq)
+    assert handler._scratch is None
+    assert handler.queue_nbytes == 0
+
+    # every frame is written, but display work is skipped with "drop_display"
+    layer = napari_viewer.layers[-1]
+    assert [int(layer.data[i, 0, 0]) for i in range(3)] == [1, 2, 3]
+    stats = layer.metadata[NMM_METADATA_KEY]["frame_stats"]
+    if policy == "spill":
+        assert stats.written.all()
+    else:
+        assert not stats.written.any()
+    qtbot.waitUntil(lambda: layer.visible)
+
+
+def test_backpressure_block(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    qtbot: QtBot,
+) -> None:
+    handler.queue_budget = 1  # every frame pauses the acquisition
+    toggled: list[bool] = []
+    core.mda.events.sequencePauseToggled.connect(toggled.append)
+    seq = useq.MDASequence(time_plan={"interval": 0, "loops": 4})
+
+    with qtbot.waitSignal(core.mda.events.sequenceFinished, timeout=10000):
+        core.run_mda(seq)
+
+    # the acquisition was paused until the writer caught up. (a pause on the last
+    # frame can't be undone once the MDA has finished: the runner resets it when
+    # the next MDA starts)
+    assert toggled[:2] == [True, False]
+    assert not handler._paused_for_queue
+    data = napari_viewer.layers[-1].data
+    assert all(np.asarray(data[i]).any() for i in range(4))
+
+
+@pytest.mark.parametrize("direct_to_disk", [False, True], ids=["temp", "ome_zarr"])
+def test_process_writer(
+    handler: _NapariMDAHandler,
+    napari_viewer: napari.Viewer,
+    core: CMMCorePlus,
+    tmp_path: Path,
+    direct_to_disk: bool,
+) -> None:
+    handler.writer = "process"
+    handler.writer_processes = 2
+    handler.writer_slots = 2
+    seq = useq.MDASequence(
+        channels=["DAPI", "FITC"],
+        time_plan={"interval": 0, "loops": 3},
+        metadata={
+            NMM_METADATA_KEY: {
+                "storage": "zarr",
+                "compression": "zstd",
+                "split_channels": True,
+                "direct_to_disk": direct_to_disk,
+            },
+            PYMMCW_METADATA_KEY: {"save_dir": str(tmp_path), "save_name": "exp"},
+        },
+    )
+    frames = _frames(core, 6)
+    _acquire(handler, seq, frames)
+
+    assert handler._proc_writer is None  # (stopped at the end of the MDA)
+    for c in range(2):
+        data = np.asarray(napari_viewer.layers[-2 + c].data)
+        assert data[:, 0, 0].tolist() == [int(f[0, 0]) for f in frames[c::2]]
+
+
+def test_invalid_backpressure(handler: _NapariMDAHandler) -> None:
+    handler.backpressure = "nope"
+    with pytest.raises(ValueError, match="Invalid backpressure"):
+        handler._on_mda_started(useq.MDASequence(time_plan={"interval": 0, "loops": 1}))
+
+
+def test_backpressure_block_user_pause(
+    handler: _NapariMDAHandler, core: CMMCorePlus, qtbot: QtBot
+) -> None:
+    handler.queue_budget = 0
+    seq = useq.MDASequence(time_plan={"interval": 0, "loops": 1})
+    (frame,) = _frames(core, 1)
+    mda = core.mda
+    with patch.object(type(mda), "is_running", return_value=True):
+        handler._on_mda_started(seq)
+        with handler._deck_cond:
+            handler._on_mda_frame(frame, next(iter(seq)))
+            assert mda.is_paused() and handler._paused_for_queue
+            # the user resumes, then pauses again: the MDA is now theirs to resume
+            mda.toggle_pause()
+            mda.toggle_pause()
+            assert not handler._paused_for_queue
+        qtbot.waitUntil(lambda: handler.queue_nbytes == 0)
+        assert mda.is_paused()
+        mda.toggle_pause()
+        handler._on_mda_finished(seq)
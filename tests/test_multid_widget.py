@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
+import pytest
+import zarr
 from pymmcore_plus.mda import MDAEngine
 from useq import MDASequence
 
 from napari_micromanager._gui_objects._mda_widget import MultiDWidget
-from napari_micromanager._util import NMM_METADATA_KEY
+from napari_micromanager._util import NMM_METADATA_KEY, PYMMCW_METADATA_KEY
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -23,6 +26,7 @@ def test_main_window_mda(main_window: MainWindow) -> None:
         time_plan={"loops": 4, "interval": 0.1},
         z_plan={"range": 3, "step": 1},
         channels=["DAPI", "FITC"],
+        metadata={NMM_METADATA_KEY: {"storage": "zarr"}},
     )
 
     main_window._mmc.mda.run(mda)
@@ -107,3 +111,140 @@ def test_script_initiated_mda(main_window: MainWindow, qtbot: QtBot) -> None:
     viewer_layer_names = [layer.name for layer in viewer.layers]
     assert layer_name in viewer_layer_names
     assert sequence.shape == viewer.layers[layer_name].data.shape[:-2]
+
+
+def test_mda_widget_keeps_options(main_window: MainWindow) -> None:
+    # options without a widget survive a setValue/value round trip
+    main_window._show_dock_widget("MDA")
+    mda_widget = main_window._dock_widgets["MDA"].widget()
+    assert isinstance(mda_widget, MultiDWidget)
+
+    options = {"pyramid_levels": 2, "storage": "zarr", "compression_level": 3}
+    mda = MDASequence(
+        time_plan={"loops": 2, "interval": 0},
+        metadata={
+            NMM_METADATA_KEY: {
+                **options,
+                "compression": "zstd",
+                "chunking": "stack",
+                "sharding": True,
+                "disk_format": "ome-tiff",
+            }
+        },
+    )
+    mda_widget.setValue(mda)
+    meta = mda_widget.value().metadata[NMM_METADATA_KEY]
+    assert options.items() <= meta.items()
+    assert meta["compression"] == "zstd"
+    assert meta["chunking"] == "stack"
+    assert meta["sharding"]
+    assert meta["disk_format"] == "ome-tiff"
+
+
+def test_direct_to_disk_mda(
+    qtbot: QtBot, main_window: MainWindow, tmp_path: Path
+) -> None:
+    main_window._show_dock_widget("MDA")
+    mda_widget = main_window._dock_widgets["MDA"].widget()
+    assert isinstance(mda_widget, MultiDWidget)
+
+    mda = MDASequence(time_plan={"loops": 2, "interval": 0}, channels=["DAPI", "FITC"])
+    mda_widget.setValue(mda)
+    mda_widget.save_info.setValue(tmp_path / "thing.ome.tif")
+    mda_widget.checkBox_direct_to_disk.setChecked(True)
+    assert mda_widget.value().metadata[NMM_METADATA_KEY]["direct_to_disk"]
+
+    mmc = main_window._mmc
+    with qtbot.waitSignal(mmc.mda.events.sequenceFinished, timeout=8000):
+        mda_widget.run_mda()
+
+    # nothing was written a second time by pymmcore-widgets
+    assert not (tmp_path / "thing.ome.tif").exists()
+    dest = tmp_path / "thing.ome.zarr"
+    layer = main_window.viewer.layers[-1]
+    assert layer.metadata[NMM_METADATA_KEY]["save_path"] == str(dest / "0")
+
+    group = zarr.open_group(str(dest / "0"), mode="r")
+    data = group["0"]
+    # (the single position of the layer isn't an axis of the NGFF image)
+    np.testing.assert_array_equal(data[:], np.asarray(layer.data)[:, 0])
+    assert data.nchunks_initialized == 4
+    # the metadata is valid OME-NGFF 0.4
+    if yaozarrs := _yaozarrs():
+        image = yaozarrs.validate_ome_object(dict(group.attrs), yaozarrs.v04.Image)
+        assert [ax.name for ax in image.multiscales[0].axes] == ["t", "c", "y", "x"]
+
+
+def test_direct_to_disk_positions(
+    qtbot: QtBot, main_window: MainWindow, tmp_path: Path
+) -> None:
+    # NGFF images have (at most) t, c, z, y, x axes: positions are separate images
+    mda = MDASequence(
+        z_plan={"range": 2, "step": 1},
+        channels=["DAPI", "FITC"],
+        stage_positions=[(0, 0, 0), (10, 10, 0)],
+        axis_order="pzc",
+        metadata={
+            NMM_METADATA_KEY: {"direct_to_disk": True},
+            PYMMCW_METADATA_KEY: {"save_dir": str(tmp_path), "save_name": "pos"},
+        },
+    )
+    mmc = main_window._mmc
+    with qtbot.waitSignal(mmc.mda.events.sequenceFinished, timeout=8000):
+        mmc.run_mda(mda)
+
+    layer = main_window.viewer.layers[-1]
+    dest = tmp_path / "pos.ome.zarr"
+    for p in range(2):
+        group = zarr.open_group(str(dest / f"0_p{p:03d}"), mode="r")
+        # (z, c) in acquisition order in the layer, (c, z) on disk
+        expected = np.asarray(layer.data[p]).swapaxes(0, 1)
+        np.testing.assert_array_equal(group["0"][:], expected)
+        if yaozarrs := _yaozarrs():
+            image = yaozarrs.validate_ome_object(dict(group.attrs), yaozarrs.v04.Image)
+            assert [ax.name for ax in image.multiscales[0].axes] == ["c", "z", "y", "x"]
+
+
+def test_direct_to_disk_ome_tiff(
+    qtbot: QtBot, main_window: MainWindow, tmp_path: Path
+) -> None:
+    tifffile = pytest.importorskip("tifffile")
+    mda = MDASequence(
+        z_plan={"range": 2, "step": 1},
+        channels=["DAPI", "FITC"],
+        stage_positions=[(0, 0, 0), (10, 10, 0)],
+        axis_order="pzc",
+        metadata={
+            NMM_METADATA_KEY: {
+                "direct_to_disk": True,
+                "disk_format": "ome-tiff",
+                "pyramid_levels": 1,
+            },
+            PYMMCW_METADATA_KEY: {"save_dir": str(tmp_path), "save_name": "pos"},
+        },
+    )
+    mmc = main_window._mmc
+    with qtbot.waitSignal(mmc.mda.events.sequenceFinished, timeout=8000):
+        mmc.run_mda(mda)
+
+    layer = main_window.viewer.layers[-1]
+    dest = tmp_path / "pos.ome.tif"
+    assert layer.metadata[NMM_METADATA_KEY]["save_path"] == str(dest)
+    # one BigTIFF, with one OME image per position and contiguous pages
+    with tifffile.TiffFile(dest) as tif:
+        assert tif.is_ome
+        assert tif.is_bigtiff
+        assert len(tif.series) == 2
+        for p, series in enumerate(tif.series):
+            assert series.axes == "ZCYX"
+            assert series.dataoffset is not None
+            np.testing.assert_array_equal(series.asarray(), layer.data[0][p])
+        assert 'Name="FITC"' in tif.ome_metadata
+
+
+def _yaozarrs() -> Any:
+    try:
+        import yaozarrs
+    except ImportError:
+        return None
+    return yaozarrs
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+import zarr
+
+from napari_micromanager._ngff import OmeZarrLayerArray, ngff_layout
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _validate(root: Path, name: str) -> list[str]:
+    """Validate the NGFF metadata of image `name`, and return its axis names."""
+    yaozarrs = pytest.importorskip("yaozarrs")
+    attrs = dict(zarr.open_group(str(root / name), mode="r").attrs)
+    yaozarrs.validate_ome_object(attrs, yaozarrs.v04.Image)
+    return [ax["name"] for ax in attrs["multiscales"][0]["axes"]]
+
+
+@pytest.mark.parametrize(
+    "index_axes, rgb, split, image",
+    [
+        ("tpcz", False, ["p"], ["t", "c", "z", "y", "x"]),
+        ("tzc", False, [], ["t", "c", "z", "y", "x"]),
+        ("ctz", False, [], ["t", "c", "z", "y", "x"]),
+        ("pgz", False, ["p", "g"], ["z", "y", "x"]),
+        ("tz", True, [], ["t", "c", "z", "y", "x"]),
+        ("z", True, [], ["c", "z", "y", "x"]),
+    ],
+)
+def test_ngff_layout(
+    index_axes: str, rgb: bool, split: list[str], image: list[str]
+) -> None:
+    assert ngff_layout(list(index_axes), rgb) == (split, image)
+
+
+@pytest.mark.parametrize(
+    "index_axes, index_shape, frame_shape",
+    [
+        ("tpzc", (2, 2, 3, 2), (4, 5)),
+        ("tc", (2, 2), (4, 5, 3)),
+        ("pz", (2, 2), (4, 5, 3)),
+    ],
+)
+def test_ome_zarr_layer_array(
+    tmp_path: Path,
+    index_axes: str,
+    index_shape: tuple[int, ...],
+    frame_shape: tuple[int, ...],
+) -> None:
+    arr = OmeZarrLayerArray(
+        tmp_path, "0", list(index_axes), index_shape, frame_shape, "uint16"
+    )
+    shape = (*index_shape, *frame_shape)
+    expected = np.arange(np.prod(shape), dtype="uint16").reshape(shape)
+    for idx in np.ndindex(*index_shape):
+        arr[idx] = expected[idx]
+    arr.write_metadata([1.0] * len(index_axes) + [0.5, 0.5])
+
+    assert arr.shape == expected.shape
+    np.testing.assert_array_equal(np.asarray(arr), expected)
+    # napari-style slices (ints for the index axes, slices for the frame)
+    for key in [
+        (1,) * len(index_axes),
+        (slice(None), 1),
+        (Ellipsis, slice(1, 3), slice(None, None, 2)),
+        (-1, slice(None), Ellipsis, 0),
+    ]:
+        np.testing.assert_array_equal(arr[key], expected[key])
+
+    split, image_axes = ngff_layout(list(index_axes), len(frame_shape) == 3)
+    n_images = np.prod([index_shape[index_axes.index(ax)] for ax in split])
+    assert len(arr.image_names) == n_images
+    for name in arr.image_names:
+        assert _validate(tmp_path, name) == image_axes
+
+
+@pytest.mark.parametrize("frame_shape", [(4, 5), (4, 5, 3)])
+def test_ome_zarr_layer_array_stack(
+    tmp_path: Path, frame_shape: tuple[int, ...]
+) -> None:
+    index_shape = (2, 3, 2)
+    arr = OmeZarrLayerArray(
+        tmp_path, "0", list("tzc"), index_shape, frame_shape, "uint16"
+    )
+    shape = (*index_shape, *frame_shape)
+    expected = np.arange(np.prod(shape), dtype="uint16").reshape(shape)
+    # stacks of frames along t and z (and along c, unless c holds RGB channels)
+    assert arr.stack_dims == ([0, 1] if len(frame_shape) == 3 else [0, 1, 2])
+    for c in range(2):
+        arr[0, slice(0, 3), c] = expected[0, :, c]
+    for z in range(3):
+        arr[slice(1, 2), z, 0] = expected[1:2, z, 0]
+        arr[1, z, 1] = expected[1, z, 1]
+    np.testing.assert_array_equal(np.asarray(arr), expected)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+from useq import MDASequence
+
+from napari_micromanager._ome_tiff import OmeTiffLayerArray
+from napari_micromanager._storage import get_ome_tiff_path
+from napari_micromanager._util import NMM_METADATA_KEY, PYMMCW_METADATA_KEY
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+tifffile = pytest.importorskip("tifffile")
+
+
+@pytest.mark.parametrize(
+    "index_axes, index_shape, frame_shape, series_axes",
+    [
+        ("tpzc", (2, 2, 3, 2), (4, 5), "TZCYX"),
+        ("tc", (2, 2), (4, 5, 3), "TCYXS"),
+        ("pg", (2, 2), (4, 5), "YX"),
+    ],
+)
+def test_ome_tiff_layer_array(
+    tmp_path: Path,
+    index_axes: str,
+    index_shape: tuple[int, ...],
+    frame_shape: tuple[int, ...],
+    series_axes: str,
+) -> None:
+    path = tmp_path / "exp.ome.tif"
+    scale = [1.0] * len(index_axes) + [0.5, 0.5]
+    arr = OmeTiffLayerArray(
+        path, "", list(index_axes), index_shape, frame_shape, "uint16", scale
+    )
+    shape = (*index_shape, *frame_shape)
+    expected = np.arange(np.prod(shape), dtype="uint16").reshape(shape)
+    for idx in np.ndindex(*index_shape):
+        arr[idx] = expected[idx]
+    arr.flush()
+
+    assert arr.shape == expected.shape
+    np.testing.assert_array_equal(np.asarray(arr), expected)
+    # napari-style slices (ints for the index axes, slices for the frame)
+    for key in [
+        (1,) * len(index_axes),
+        (slice(None), 1),
+        (Ellipsis, slice(1, 3), slice(None, None, 2)),
+        (-1, slice(None), Ellipsis, 0),
+        (slice(2, 2),),
+    ]:
+        np.testing.assert_array_equal(arr[key], expected[key])
+
+    # the file is readable (and complete) while the array is still open
+    split = [i for i, ax in enumerate(index_axes) if ax not in "tcz"]
+    split_shape = [index_shape[i] for i in split]
+    with tifffile.TiffFile(path) as tif:
+        assert tif.is_ome
+        assert tif.is_bigtiff
+        assert len(tif.series) == np.prod(split_shape)
+        for split_idx, series in zip(np.ndindex(*split_shape), tif.series):
+            assert series.axes == series_axes
+            assert series.dataoffset is not None  # (contiguous pages)
+            key = [slice(None)] * len(index_axes)
+            for i, j in zip(split, split_idx):
+                key[i] = j
+            np.testing.assert_array_equal(series.asarray(), expected[tuple(key)])
+        assert 'PhysicalSizeX="0.5"' in tif.ome_metadata
+    arr.close()
+
+
+def test_ome_tiff_layer_array_name(tmp_path: Path) -> None:
+    arr = OmeTiffLayerArray(
+        tmp_path / "exp.ome.tif", "DAPI_000", ["t"], [2], [4, 5], "uint8", [1, 1, 1]
+    )
+    assert arr.path == tmp_path / "exp_DAPI_000.ome.tif"
+    arr.close()
+
+
+def test_ome_tiff_path(tmp_path: Path) -> None:
+    seq = MDASequence(
+        metadata={
+            NMM_METADATA_KEY: {"direct_to_disk": True, "disk_format": "ome-tiff"},
+            PYMMCW_METADATA_KEY: {"save_dir": str(tmp_path), "save_name": "exp.tif"},
+        }
+    )
+    assert get_ome_tiff_path(seq) == tmp_path / "exp.ome.tif"
+    # no file of a previous sequence is overwritten (e.g. split channels files)
+    (tmp_path / "exp_DAPI_000.ome.tif").touch()
+    assert get_ome_tiff_path(seq) == tmp_path / "exp_000.ome.tif"
+    (tmp_path / "exp_000.ome.tif").touch()
+    assert get_ome_tiff_path(seq) == tmp_path / "exp_001.ome.tif"
+
+    seq.metadata[NMM_METADATA_KEY]["disk_format"] = "ome-zarr"
+    assert get_ome_tiff_path(seq) is None
+    seq.metadata[NMM_METADATA_KEY]["disk_format"] = "png"
+    with pytest.raises(ValueError, match="disk format"):
+        get_ome_tiff_path(seq)
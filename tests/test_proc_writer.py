@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from napari_micromanager._proc_writer import ProcessFrameWriter
+from napari_micromanager._storage import compression_kwargs, create_temp_zarr_array
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import zarr
+
+
+@pytest.fixture
+def arrays() -> Iterator[dict[str, zarr.Array]]:
+    tmps = []
+    arrays = {}
+    for name in ("a", "b"):
+        z, tmp = create_temp_zarr_array(
+            (6, 16, 16), "uint16", (1, 16, 16), **compression_kwargs("zstd", 5)
+        )
+        arrays[name] = z
+        tmps.append(tmp)
+    yield arrays
+    for tmp in tmps:
+        tmp.cleanup()
+
+
+def test_process_frame_writer(arrays: dict[str, zarr.Array]) -> None:
+    writer = ProcessFrameWriter(arrays, (16, 16), "uint16", n_slots=2, n_processes=2)
+    try:
+        # (more frames than slots: the writer has to wait for free slots)
+        for i in range(6):
+            for name in arrays:
+                value = i + 1 if name == "a" else 10 * (i + 1)
+                writer.write(name, (i,), np.full((16, 16), value, dtype="uint16"))
+        writer.flush()
+        assert writer.in_flight == 0
+    finally:
+        writer.close()
+    assert arrays["a"][:, 0, 0].tolist() == [1, 2, 3, 4, 5, 6]
+    assert arrays["b"][:, 0, 0].tolist() == [10, 20, 30, 40, 50, 60]
+
+
+def test_process_frame_writer_error(arrays: dict[str, zarr.Array]) -> None:
+    writer = ProcessFrameWriter(arrays, (16, 16), "uint16", n_slots=2, n_processes=1)
+    try:
+        writer.write("a", (10,), np.ones((16, 16), dtype="uint16"))  # out of bounds
+        writer.write("a", (1,), np.ones((16, 16), dtype="uint16"))
+        with pytest.raises(RuntimeError, match="1 frame"):
+            writer.flush()
+        writer.flush()  # (errors are only raised once)
+    finally:
+        writer.close()
+    assert arrays["a"][1, 0, 0] == 1